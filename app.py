@@ -9,24 +9,47 @@ if sys.platform == 'win32':
         sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
         sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
-import bcrypt
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 import jwt
 import os
+import base64
+import binascii
+import csv
+import hashlib
+import html
+import io
+import json
+import math
+import re
 import secrets
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
 from functools import wraps
+from json.encoder import encode_basestring_ascii as json_string
 from dotenv import load_dotenv
+from cache import RedisCacheBackend, TaskListCache, TokenCache
+from email_outbox import EmailOutbox, enqueue_email
+from email_transport import BrevoApiTransport, OutgoingEmail, SmtpTransport
+from maintenance import PeriodicJob
+from metrics import MetricsRegistry
+from password_hasher import PasswordHasher, PasswordHasherBusy
+from rate_limit import RedisRateLimitBackend, TokenBucketLimiter
+from slow_queries import SlowQueryLog
+from task_import import CopyStream, ImportFormatError, copy_row, read_task_records
 
 # Try to import PostgreSQL library
 try:
     import psycopg2
-    from psycopg2 import pool
+    from psycopg2.extras import execute_values
+    from db_pool import ConnectionPool, PoolTimeout, timed_cursor_factory
+    from migrations import SCHEMA_VERSION, migrate
+    from prepared_statements import PreparedStatements
+    from task_events import TaskEventBroker, TooManySubscribers
     POSTGRES_AVAILABLE = True
 except ImportError:
     POSTGRES_AVAILABLE = False
@@ -37,7 +60,7 @@ except ImportError:
 load_dotenv()
 
 app = Flask(__name__, static_folder='.')
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'X-Total-Count', 'ETag'])
 
 # Configuration
 PORT = int(os.getenv('PORT', 3001))
@@ -50,6 +73,133 @@ if not JWT_SECRET:
     print('⚠️  For production, please set JWT_SECRET as an environment variable in Railway.')
     print(f'⚠️  Generated secret: {JWT_SECRET[:20]}... (use this or set your own)')
 
+# Usernames allowed to use admin-only features (e.g. exporting every user's tasks)
+ADMIN_USERNAMES = frozenset(name.strip() for name in os.getenv('ADMIN_USERNAMES', '').split(',') if name.strip())
+
+# Task list cache (pages of each user's tasks, dropped on every write)
+TASK_CACHE_MAX_USERS = int(os.getenv('TASK_CACHE_MAX_USERS', 1000))  # 0 disables the cache
+TASK_CACHE_MAX_MB = float(os.getenv('TASK_CACHE_MAX_MB', 64))
+# Optional Redis URL so invalidations reach every worker process
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', '')
+
+cache_backend = None
+if CACHE_REDIS_URL:
+    try:
+        cache_backend = RedisCacheBackend(CACHE_REDIS_URL)
+    except ImportError as e:
+        print(f'⚠️  {str(e)}')
+        print('⚠️  Task cache disabled: without a shared backend workers could serve stale tasks')
+        TASK_CACHE_MAX_USERS = 0
+
+task_list_cache = TaskListCache(
+    max_users=TASK_CACHE_MAX_USERS,
+    max_bytes=int(TASK_CACHE_MAX_MB * 1024 * 1024),
+    backend=cache_backend
+)
+
+# Verified JWTs are cached until their exp so repeat requests skip signature checks
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', 10000))  # 0 disables the cache
+token_cache = TokenCache(maxsize=JWT_CACHE_SIZE)
+
+# Metrics (GET /api/metrics, Prometheus text format)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # when set, scrapers must send it as a Bearer token
+metrics = MetricsRegistry()
+http_requests = metrics.counter('http_requests_total', 'HTTP requests by route, method and status',
+                                ('route', 'method', 'status'))
+http_request_duration = metrics.histogram('http_request_duration_seconds',
+                                          'Time to produce a response (streams: until the first byte)',
+                                          ('route', 'method'))
+http_requests_in_flight = metrics.gauge('http_requests_in_flight', 'Requests being handled')
+db_query_duration = metrics.histogram('db_query_duration_seconds', 'PostgreSQL statement execution time',
+                                      ('operation',))
+db_pool_acquire_duration = metrics.histogram('db_pool_acquire_seconds', 'Time to check a connection out of the pool')
+bcrypt_duration = metrics.histogram('bcrypt_duration_seconds', 'Password hash/verify time including queueing',
+                                    ('operation', 'outcome'), buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+email_messages = metrics.counter('email_messages_total', 'Emails handed to a transport, by outcome',
+                                 ('transport', 'outcome'))
+email_send_duration = metrics.histogram('email_send_duration_seconds', 'Time to send one batch of emails',
+                                        ('transport',))
+
+@app.before_request
+def start_request_metrics():
+    if request.path == '/api/metrics':
+        # Scrapes every few seconds would drown out the real traffic in the per-route series
+        return
+    g.metrics_started = time.perf_counter()
+    http_requests_in_flight.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_started')
+    if started is not None:
+        # The rule, not the path, so /api/tasks/<int:task_id> is one series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_requests.inc(route, request.method, str(response.status_code))
+        http_request_duration.observe(time.perf_counter() - started, route, request.method)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if g.pop('metrics_started', None) is not None:
+        http_requests_in_flight.dec()
+
+# Password Hashing Configuration (bcrypt runs in a separate process pool)
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))  # stored hashes are upgraded to this cost on login
+BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', min(2, os.cpu_count() or 1)))
+BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 32))  # queued + running hashes before shedding load
+BCRYPT_TIMEOUT = float(os.getenv('BCRYPT_TIMEOUT', 10))
+
+password_hasher = PasswordHasher(
+    workers=BCRYPT_WORKERS,
+    max_pending=BCRYPT_MAX_PENDING,
+    rounds=BCRYPT_ROUNDS,
+    timeout=BCRYPT_TIMEOUT,
+    observer=lambda operation, outcome, seconds: bcrypt_duration.observe(seconds, operation, outcome)
+)
+
+# Login/registration throttling, applied before a DB connection or bcrypt time is spent
+AUTH_IP_RATE_PER_MINUTE = float(os.getenv('AUTH_IP_RATE_PER_MINUTE', 30))  # 0 disables
+AUTH_IP_BURST = int(os.getenv('AUTH_IP_BURST', 10))
+AUTH_USERNAME_RATE_PER_MINUTE = float(os.getenv('AUTH_USERNAME_RATE_PER_MINUTE', 10))  # 0 disables
+AUTH_USERNAME_BURST = int(os.getenv('AUTH_USERNAME_BURST', 5))
+# Auth requests in flight per process; by default a few per CPU doing bcrypt, so a burst
+# is answered with 429 at once instead of queueing behind hashes that take ~250 ms each
+AUTH_MAX_INFLIGHT = int(os.getenv('AUTH_MAX_INFLIGHT',
+                                  min(BCRYPT_MAX_PENDING, 4 * (BCRYPT_WORKERS or os.cpu_count() or 1))))
+# Optional Redis URL so every worker process shares the same buckets
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', CACHE_REDIS_URL)
+# Reverse proxies in front of the app (Railway, load balancers) whose X-Forwarded-For is trusted
+PROXY_HOPS = int(os.getenv('PROXY_HOPS', 0))
+
+if PROXY_HOPS:
+    # request.remote_addr becomes the client's address instead of the proxy's
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS)
+
+_forwarded_for_warned = False
+
+@app.before_request
+def warn_untrusted_forwarded_for():
+    """Log once if a proxy forwards requests while PROXY_HOPS is 0"""
+    global _forwarded_for_warned
+    if PROXY_HOPS or _forwarded_for_warned or 'X-Forwarded-For' not in request.headers:
+        return
+    _forwarded_for_warned = True
+    print('⚠️  Requests carry X-Forwarded-For but PROXY_HOPS=0: rate limits see the proxy\'s address, '
+          'so every client shares one bucket. Set PROXY_HOPS to the number of proxies in front of the app.')
+
+rate_limit_backend = None
+if RATE_LIMIT_REDIS_URL:
+    try:
+        rate_limit_backend = RedisRateLimitBackend(RATE_LIMIT_REDIS_URL)
+    except ImportError as e:
+        print(f'⚠️  {str(e)}')
+        print('⚠️  Rate limits are per worker process without a shared backend')
+
+auth_ip_limiter = TokenBucketLimiter(AUTH_IP_RATE_PER_MINUTE / 60, AUTH_IP_BURST, backend=rate_limit_backend)
+auth_username_limiter = TokenBucketLimiter(AUTH_USERNAME_RATE_PER_MINUTE / 60, AUTH_USERNAME_BURST,
+                                           backend=rate_limit_backend)
+auth_slots = threading.BoundedSemaphore(max(AUTH_MAX_INFLIGHT, 1))
+
 # Email Configuration
 # Method: 'api' for Brevo REST API (default), 'smtp_brevo' for Brevo SMTP, or 'smtp_gmail' for Gmail SMTP
 EMAIL_METHOD = os.getenv('EMAIL_METHOD', 'api').lower()
@@ -74,6 +224,17 @@ GMAIL_SMTP_PASSWORD = os.getenv('GMAIL_SMTP_PASSWORD')
 GMAIL_SENDER_EMAIL = os.getenv('GMAIL_SENDER_EMAIL')
 GMAIL_SENDER_NAME = os.getenv('GMAIL_SENDER_NAME', 'AutoOps Team')
 
+# Email Transport Configuration
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', 100))  # messages per Brevo API request
+EMAIL_SMTP_POOL_SIZE = int(os.getenv('EMAIL_SMTP_POOL_SIZE', 2))  # reusable SMTP sessions per server
+
+# Email Outbox Configuration (background delivery with retries)
+EMAIL_OUTBOX_WORKERS = int(os.getenv('EMAIL_OUTBOX_WORKERS', 2))
+EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', 5))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+EMAIL_OUTBOX_BACKOFF_BASE = float(os.getenv('EMAIL_OUTBOX_BACKOFF_BASE', 30))  # seconds before the first retry
+EMAIL_OUTBOX_BACKOFF_MAX = float(os.getenv('EMAIL_OUTBOX_BACKOFF_MAX', 3600))
+
 # PostgreSQL Configuration (Cloud Database)
 DB_HOST = os.getenv('DB_HOST', 'localhost')
 DB_PORT = os.getenv('DB_PORT', '5432')
@@ -83,152 +244,172 @@ DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 # Alternative: Use DATABASE_URL if provided (common in cloud platforms)
 DATABASE_URL = os.getenv('DATABASE_URL', '')
 
+# Database connection pool settings
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 20))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+DB_POOL_MAX_AGE = float(os.getenv('DB_POOL_MAX_AGE', 1800))  # seconds before a connection is recycled
+DB_POOL_PING_INTERVAL = float(os.getenv('DB_POOL_PING_INTERVAL', 10))  # idle seconds before a checkout is pinged
+MIGRATION_LOCK_TIMEOUT = os.getenv('MIGRATION_LOCK_TIMEOUT', '5s')  # max wait for a table lock while migrating
+# Prepare hot queries once per connection; set to false behind PgBouncer in transaction/statement mode
+DB_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'True').lower() == 'true'
+# When to connect and migrate: 'startup', 'lazy' (first API request) or 'off' (run `flask --app app migrate`)
+DB_INIT_MODE = os.getenv('DB_INIT_MODE', 'lazy').lower()
+# Slow query log (GET /api/admin/slow-queries)
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))  # statements slower than this are logged; 0 disables
+SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'True').lower() == 'true'  # capture a plan for slow statements
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 600))  # seconds between plans per statement
+SLOW_QUERY_EXPLAIN_TIMEOUT = os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT', '10s')  # statement_timeout for each EXPLAIN
+SLOW_QUERY_TOP = int(os.getenv('SLOW_QUERY_TOP', 20))  # statements listed by default
+
 # Database connection pool
 db_pool = None
+db_pool_lock = threading.Lock()
+# Checked-out connection -> the pool it came from (the global may be replaced meanwhile)
+db_pool_owners = weakref.WeakKeyDictionary()
+prepared = PreparedStatements(enabled=DB_PREPARED_STATEMENTS) if POSTGRES_AVAILABLE else None
 
-def get_db_connection():
-    """Get PostgreSQL database connection"""
+def observe_query(operation, seconds, query, params):
+    db_query_duration.observe(seconds, operation)
+    slow_query_log.record(query, params, seconds)
+
+# Every cursor reports its statement durations to db_query_duration and the slow query log
+TimedCursor = timed_cursor_factory(observe_query) if POSTGRES_AVAILABLE else None
+
+def connect_database():
+    """Open a new PostgreSQL connection"""
+    if DATABASE_URL:
+        # Use DATABASE_URL (common in cloud platforms like Railway, Heroku, etc.)
+        return psycopg2.connect(DATABASE_URL, cursor_factory=TimedCursor)
+    # Use individual connection parameters
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        cursor_factory=TimedCursor
+    )
+
+# Plans are captured on a connection of its own, outside the pool
+slow_query_log = SlowQueryLog(
+    connect_database,
+    threshold=SLOW_QUERY_MS / 1000,
+    explain=SLOW_QUERY_EXPLAIN,
+    explain_interval=SLOW_QUERY_EXPLAIN_INTERVAL,
+    explain_timeout=SLOW_QUERY_EXPLAIN_TIMEOUT,
+    resolve=prepared.source if prepared else None
+)
+
+def get_db_pool():
+    """Get the connection pool, creating it on first use"""
     global db_pool
     
+    if db_pool is None:
+        with db_pool_lock:
+            if db_pool is None:
+                db_pool = ConnectionPool(
+                    connect_database,
+                    minconn=DB_POOL_MIN,
+                    maxconn=DB_POOL_MAX,
+                    acquire_timeout=DB_POOL_TIMEOUT,
+                    max_age=DB_POOL_MAX_AGE,
+                    ping_interval=DB_POOL_PING_INTERVAL
+                )
+    return db_pool
+
+def get_db_connection():
+    """Get PostgreSQL database connection"""
     if not POSTGRES_AVAILABLE:
         print('[ERROR] PostgreSQL library not installed. Please install psycopg2-binary.')
         return None
     
     try:
-        # Initialize connection pool if not exists
-        if db_pool is None:
-            if DATABASE_URL:
-                # Use DATABASE_URL (common in cloud platforms like Railway, Heroku, etc.)
-                db_pool = psycopg2.pool.SimpleConnectionPool(1, 20, DATABASE_URL)
-            else:
-                # Use individual connection parameters
-                db_pool = psycopg2.pool.SimpleConnectionPool(
-                    1, 20,
-                    host=DB_HOST,
-                    port=DB_PORT,
-                    database=DB_NAME,
-                    user=DB_USER,
-                    password=DB_PASSWORD
-                )
-        
-        # Get connection from pool
-        conn = db_pool.getconn()
+        # Waits up to DB_POOL_TIMEOUT seconds when all connections are in use
+        started = time.perf_counter()
+        pool = get_db_pool()
+        conn = pool.getconn()
+        db_pool_owners[conn] = pool
+        db_pool_acquire_duration.observe(time.perf_counter() - started)
         return conn
+    except PoolTimeout as e:
+        print(f'[WARNING] Database pool exhausted: {str(e)}')
+        return None
     except Exception as e:
         print(f'[WARNING] Database connection error: {str(e)}')
         return None
 
 def return_db_connection(conn):
-    """Return connection to pool"""
+    """Return connection to the pool it came from
+    
+    After close_db_pool() that pool is closed and closes the connection; a
+    newer pool never sees it.
+    """
+    if not conn:
+        return
+    pool = db_pool_owners.pop(conn, None)
+    if pool is not None:
+        pool.putconn(conn)
+    elif not conn.closed:
+        conn.close()
+
+def close_db_pool():
+    """Close pooled connections; the next get_db_connection() builds a new pool"""
     global db_pool
-    if db_pool and conn:
-        db_pool.putconn(conn)
+    with db_pool_lock:
+        closing, db_pool = db_pool, None
+    if closing:
+        closing.closeall()
+
+def warmup_db_pool():
+    """Open DB_POOL_MIN connections ahead of the first request"""
+    if not POSTGRES_AVAILABLE:
+        return
+    try:
+        get_db_pool().warmup()
+        print(f'[OK] Database pool warmed up ({DB_POOL_MIN} connections)')
+    except Exception as e:
+        print(f'[WARNING] Database pool warmup failed: {str(e)}')
 
 def init_database():
-    """Initialize database and create tables if they don't exist"""
+    """Bring the database schema up to date (see migrations.py); True on success"""
     conn = get_db_connection()
     if not conn:
         print('[WARNING] Database connection unavailable. Tables will not be created.')
-        return
+        return False
     
     try:
-        cursor = conn.cursor()
-        
-        # Create Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS "Users" (
-                "Id" SERIAL PRIMARY KEY,
-                "Username" VARCHAR(50) NOT NULL UNIQUE,
-                "Email" VARCHAR(100) NOT NULL UNIQUE,
-                "Password" VARCHAR(255) NOT NULL,
-                "FullName" VARCHAR(100),
-                "CreatedAt" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                "LastLogin" TIMESTAMP
-            )
-        """)
-        
-        # Create indexes for Users
-        cursor.execute('CREATE INDEX IF NOT EXISTS "IX_Users_Username" ON "Users"("Username")')
-        cursor.execute('CREATE INDEX IF NOT EXISTS "IX_Users_Email" ON "Users"("Email")')
-        
-        # Create Tasks table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS "Tasks" (
-                "Id" SERIAL PRIMARY KEY,
-                "UserId" INTEGER NOT NULL,
-                "TaskId" VARCHAR(50),
-                "Type" VARCHAR(20) DEFAULT 'task',
-                "Title" VARCHAR(200) NOT NULL,
-                "Description" TEXT,
-                "Assignee" VARCHAR(100),
-                "Priority" VARCHAR(20) DEFAULT 'medium',
-                "Status" VARCHAR(20) DEFAULT 'todo',
-                "CreatedAt" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                "UpdatedAt" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY ("UserId") REFERENCES "Users"("Id") ON DELETE CASCADE
-            )
-        """)
-        
-        # Create indexes for Tasks
-        cursor.execute('CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId" ON "Tasks"("UserId")')
-        cursor.execute('CREATE INDEX IF NOT EXISTS "IX_Tasks_Status" ON "Tasks"("Status")')
-        
-        # Create function to update UpdatedAt timestamp
-        cursor.execute("""
-            CREATE OR REPLACE FUNCTION update_updated_at_column()
-            RETURNS TRIGGER AS $$
-            BEGIN
-                NEW."UpdatedAt" = CURRENT_TIMESTAMP;
-                RETURN NEW;
-            END;
-            $$ language 'plpgsql'
-        """)
-        
-        # Create trigger to auto-update UpdatedAt
-        cursor.execute("""
-            DROP TRIGGER IF EXISTS update_tasks_updated_at ON "Tasks";
-            CREATE TRIGGER update_tasks_updated_at
-                BEFORE UPDATE ON "Tasks"
-                FOR EACH ROW
-                EXECUTE FUNCTION update_updated_at_column()
-        """)
-        
-        # Add Type column if it doesn't exist (for existing tables)
-        cursor.execute("""
-            DO $$ 
-            BEGIN
-                IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
-                              WHERE table_name='Tasks' AND column_name='Type') THEN
-                    ALTER TABLE "Tasks" ADD COLUMN "Type" VARCHAR(20) DEFAULT 'task';
-                END IF;
-            END $$;
-        """)
-        
-        # Add TaskId column if it doesn't exist
-        cursor.execute("""
-            DO $$ 
-            BEGIN
-                IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
-                              WHERE table_name='Tasks' AND column_name='TaskId') THEN
-                    ALTER TABLE "Tasks" ADD COLUMN "TaskId" VARCHAR(50);
-                END IF;
-            END $$;
-        """)
-        
-        conn.commit()
-        print('[OK] Database tables created/verified')
+        applied = migrate(conn, MIGRATION_LOCK_TIMEOUT)
+        if applied:
+            print(f'[OK] Applied database migrations: {", ".join(str(v) for v in applied)}')
+        else:
+            print(f'[OK] Database schema is current (version {SCHEMA_VERSION})')
+        return True
     except Exception as e:
-        print(f'[WARNING] Error creating tables: {str(e)}')
-        conn.rollback()
+        print(f'[WARNING] Database migration failed: {str(e)}')
+        return False
     finally:
         return_db_connection(conn)
 
-# Initialize database on startup
-try:
-    init_database()
-except Exception as e:
-    print(f'[WARNING] Database initialization warning: {str(e)}')
-    print('[WARNING] Server will start but database features may be unavailable')
+def verify_token(token, scope=None):
+    """Return (claims, None) for a valid token, or (None, error response)
+    
+    scope: the token's "scope" claim must equal this; None accepts only login
+    tokens, so a narrow token (e.g. task_stream) can't be used as a login.
+    """
+    data = token_cache.get(token)
+    if data is None:
+        try:
+            data = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+            token_cache.put(token, data)
+        except jwt.ExpiredSignatureError:
+            return None, (jsonify({'message': 'Token has expired'}), 403)
+        except jwt.InvalidTokenError:
+            return None, (jsonify({'message': 'Invalid token'}), 403)
+    
+    if data.get('scope') != scope:
+        return None, (jsonify({'message': 'Invalid token'}), 403)
+    return data, None
 
 # Authentication decorator
 def token_required(f):
@@ -246,23 +427,133 @@ def token_required(f):
         if not token:
             return jsonify({'message': 'Token is missing'}), 401
         
-        try:
-            data = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-            request.user = data
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token has expired'}), 403
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Invalid token'}), 403
+        data, error = verify_token(token)
+        if error:
+            return error
+        request.user = data
         
         return f(*args, **kwargs)
     return decorated
 
+def too_many_requests(retry_after, message):
+    """429 telling the client how many seconds to wait"""
+    response = jsonify({'message': message})
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, 429
+
+def auth_throttle(f):
+    """Rate-limit by client IP and username, then cap auth requests in flight
+    
+    Runs before the view takes a DB connection, so a credential-stuffing burst
+    is shed without touching the pool or the bcrypt workers.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        wait = auth_ip_limiter.take(f'auth:ip:{request.remote_addr}')
+        if not wait:
+            data = request.get_json(silent=True)
+            username = data.get('username') if isinstance(data, dict) else None
+            if username and isinstance(username, str):
+                wait = auth_username_limiter.take(f'auth:user:{username.lower()}')
+        if wait:
+            return too_many_requests(wait, 'Too many attempts, please try again later')
+        
+        if not auth_slots.acquire(blocking=False):
+            return too_many_requests(1, 'Server is busy, please try again shortly')
+        try:
+            return f(*args, **kwargs)
+        finally:
+            auth_slots.release()
+    return decorated
+
+def is_admin(user):
+    """True if the token's user is listed in ADMIN_USERNAMES"""
+    return user.get('username') in ADMIN_USERNAMES
+
 # Routes
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'ok', 'message': 'Server is running'})
+    health = {'status': 'ok', 'message': 'Server is running'}
+    if db_pool:
+        health['dbPool'] = db_pool.stats()
+    if prepared:
+        health['preparedStatements'] = prepared.stats()
+    health['tokenCache'] = token_cache.stats()
+    health['taskCache'] = task_list_cache.stats()
+    health['authRateLimit'] = {'ip': auth_ip_limiter.stats(), 'username': auth_username_limiter.stats()}
+    if task_events:
+        health['taskStream'] = task_events.stats()
+    return jsonify(health)
+
+def pool_metric(key):
+    """Scrape callback for one db_pool.stats() field (no sample before the pool exists)"""
+    return lambda: [((), db_pool.stats()[key])] if db_pool else []
+
+def pool_connection_samples():
+    if not db_pool:
+        return []
+    stats = db_pool.stats()
+    return [(('in_use',), stats['inUse']), (('idle',), stats['idle']), (('opening',), stats['opening']),
+            (('checking',), stats['checking'])]
+
+def cache_lookup_samples():
+    samples = []
+    for cache, stats in (('token', token_cache.stats()), ('task_list', task_list_cache.stats())):
+        samples += [((cache, 'hit'), stats['hits']), ((cache, 'miss'), stats['misses'])]
+    return samples
+
+def auth_rate_limit_samples():
+    samples = []
+    for key, stats in (('ip', auth_ip_limiter.stats()), ('username', auth_username_limiter.stats())):
+        samples += [((key, 'allowed'), stats['allowed']), ((key, 'limited'), stats['limited'])]
+    return samples
+
+metrics.callback('db_pool_connections', 'Pooled connections by state', pool_connection_samples, ('state',))
+metrics.callback('db_pool_max_connections', 'Pool size limit', pool_metric('max'))
+metrics.callback('db_pool_waits_total', 'Checkouts that had to wait for a connection',
+                 pool_metric('waits'), kind='counter')
+metrics.callback('db_pool_wait_seconds_total', 'Time spent waiting for a free connection',
+                 pool_metric('waitTimeTotal'), kind='counter')
+metrics.callback('db_pool_timeouts_total', 'Checkouts that gave up (503)', pool_metric('timeouts'), kind='counter')
+metrics.callback('cache_requests_total', 'Token and task list cache lookups by result',
+                 cache_lookup_samples, ('cache', 'result'), kind='counter')
+metrics.callback('auth_rate_limit_total', 'Login/registration rate limit decisions',
+                 auth_rate_limit_samples, ('key', 'result'), kind='counter')
+metrics.callback('task_stream_clients', 'Connected task stream (SSE) clients',
+                 lambda: task_events.stats()['clients'] if task_events else 0)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Metrics of this worker process in the Prometheus text format"""
+    if METRICS_TOKEN and not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}'):
+        return jsonify({'message': 'Invalid metrics token'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/admin/slow-queries', methods=['GET'])
+@token_required
+def get_slow_queries():
+    """Slowest statements seen by this worker, grouped by normalized SQL (ADMIN_USERNAMES only)
+    
+    Query parameters:
+        limit: statements to return (default SLOW_QUERY_TOP, max 100)
+        sort: total (default), mean or max
+    """
+    if not is_admin(request.user):
+        return jsonify({'message': 'Admin access required'}), 403
+    try:
+        limit = min(max(int(request.args.get('limit', SLOW_QUERY_TOP)), 1), 100)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+    sort = request.args.get('sort', 'total').lower()
+    if sort not in ('total', 'mean', 'max'):
+        return jsonify({'message': 'sort must be total, mean or max'}), 400
+    return jsonify({
+        'thresholdMs': SLOW_QUERY_MS,
+        'sort': sort,
+        'statements': slow_query_log.top(limit, sort)
+    })
 
 def get_email_html(name):
     """Get HTML content for welcome email"""
@@ -303,162 +594,192 @@ def get_email_html(name):
     </html>
     """
 
-def send_welcome_email_via_api(email, name):
-    """Send welcome email using Brevo REST API"""
-    if not BREVO_API_KEY:
-        print('⚠️  Brevo API key not configured. Set BREVO_API_KEY in .env file')
-        return False
-    
-    try:
-        email_data = {
-            "sender": {
-                "name": BREVO_SENDER_NAME,
-                "email": BREVO_SENDER_EMAIL
-            },
-            "to": [
-                {
-                    "email": email,
-                    "name": name
-                }
-            ],
-            "subject": "Welcome to AutoOps Task Board!",
-            "htmlContent": get_email_html(name)
-        }
-        
-        headers = {
-            "accept": "application/json",
-            "api-key": BREVO_API_KEY,
-            "content-type": "application/json"
-        }
-        
-        response = requests.post(BREVO_API_URL, json=email_data, headers=headers)
-        
-        if response.status_code == 201:
-            print(f'✅ Welcome email sent to {email} via API')
-            return True
-        else:
-            print(f'⚠️  Email API response: {response.status_code} - {response.text}')
-            return False
-            
-    except Exception as e:
-        print(f'❌ Error sending email via API: {str(e)}')
-        return False
+# Email transports (connections are kept open and reused across messages)
+WELCOME_EMAIL_SUBJECT = 'Welcome to AutoOps Task Board!'
 
-def send_welcome_email_via_smtp_brevo(email, name):
-    """Send welcome email using Brevo SMTP"""
-    if not BREVO_SMTP_LOGIN or not BREVO_SMTP_PASSWORD:
-        print('⚠️  Brevo SMTP credentials not configured. Set BREVO_SMTP_LOGIN and BREVO_SMTP_PASSWORD in .env file')
-        return False
-    
-    try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = 'Welcome to AutoOps Task Board!'
-        msg['From'] = f'{BREVO_SENDER_NAME} <{BREVO_SENDER_EMAIL}>'
-        msg['To'] = email
-        
-        # Create HTML part
-        html_part = MIMEText(get_email_html(name), 'html')
-        msg.attach(html_part)
-        
-        # Send email via SMTP
-        with smtplib.SMTP(BREVO_SMTP_SERVER, BREVO_SMTP_PORT) as server:
-            server.starttls()
-            server.login(BREVO_SMTP_LOGIN, BREVO_SMTP_PASSWORD)
-            server.send_message(msg)
-        
-        print(f'✅ Welcome email sent to {email} via Brevo SMTP')
-        return True
-        
-    except Exception as e:
-        print(f'❌ Error sending email via Brevo SMTP: {str(e)}')
-        return False
+brevo_api_transport = BrevoApiTransport(
+    BREVO_API_KEY, BREVO_API_URL, BREVO_SENDER_NAME, BREVO_SENDER_EMAIL,
+    max_batch=EMAIL_BATCH_SIZE
+)
+brevo_smtp_transport = SmtpTransport(
+    'Brevo SMTP', BREVO_SMTP_SERVER, BREVO_SMTP_PORT, BREVO_SMTP_LOGIN, BREVO_SMTP_PASSWORD,
+    BREVO_SENDER_NAME, BREVO_SENDER_EMAIL, pool_size=EMAIL_SMTP_POOL_SIZE
+)
+gmail_smtp_transport = SmtpTransport(
+    'Gmail SMTP', GMAIL_SMTP_SERVER, GMAIL_SMTP_PORT, GMAIL_SMTP_USERNAME, GMAIL_SMTP_PASSWORD,
+    GMAIL_SENDER_NAME, GMAIL_SENDER_EMAIL, pool_size=EMAIL_SMTP_POOL_SIZE
+)
 
-def send_welcome_email_via_smtp_gmail(email, name):
-    """Send welcome email using Gmail SMTP"""
-    if not GMAIL_SMTP_USERNAME or not GMAIL_SMTP_PASSWORD:
-        print('⚠️  Gmail SMTP credentials not configured. Set GMAIL_SMTP_USERNAME and GMAIL_SMTP_PASSWORD in .env file')
-        return False
-    
-    try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = 'Welcome to AutoOps Task Board!'
-        msg['From'] = f'{GMAIL_SENDER_NAME} <{GMAIL_SENDER_EMAIL}>'
-        msg['To'] = email
-        
-        # Create HTML part
-        html_part = MIMEText(get_email_html(name), 'html')
-        msg.attach(html_part)
-        
-        # Send email via Gmail SMTP
-        with smtplib.SMTP(GMAIL_SMTP_SERVER, GMAIL_SMTP_PORT) as server:
-            server.starttls()
-            server.login(GMAIL_SMTP_USERNAME, GMAIL_SMTP_PASSWORD)
-            server.send_message(msg)
-        
-        print(f'✅ Welcome email sent to {email} via Gmail SMTP')
-        return True
-        
-    except Exception as e:
-        print(f'❌ Error sending email via Gmail SMTP: {str(e)}')
-        print('💡 Note: Gmail requires App Password, not regular password. Enable 2FA and generate App Password.')
-        return False
-
-def send_welcome_email(email, name):
-    """Send welcome email to new user (uses API or SMTP based on configuration)"""
-    success = False
-    
+def get_email_transports():
+    """Transports to try in order for the configured EMAIL_METHOD (primary, then fallback)"""
     if EMAIL_METHOD == 'smtp_gmail':
-        success = send_welcome_email_via_smtp_gmail(email, name)
         # Fallback to Brevo API if Gmail fails
-        if not success and BREVO_API_KEY:
-            print('⚠️  Gmail SMTP failed, trying Brevo API fallback...')
-            success = send_welcome_email_via_api(email, name)
+        return [gmail_smtp_transport, brevo_api_transport]
     elif EMAIL_METHOD == 'smtp_brevo' or EMAIL_METHOD == 'smtp':
-        success = send_welcome_email_via_smtp_brevo(email, name)
         # Fallback to API if SMTP fails
-        if not success and BREVO_API_KEY:
-            print('⚠️  Brevo SMTP failed, trying API fallback...')
-            success = send_welcome_email_via_api(email, name)
+        return [brevo_smtp_transport, brevo_api_transport]
     else:  # Default: API
-        success = send_welcome_email_via_api(email, name)
         # Fallback to Gmail SMTP if API fails
-        if not success and GMAIL_SMTP_USERNAME and GMAIL_SMTP_PASSWORD:
-            print('⚠️  Brevo API failed, trying Gmail SMTP fallback...')
-            success = send_welcome_email_via_smtp_gmail(email, name)
+        return [brevo_api_transport, gmail_smtp_transport]
+
+def send_welcome_emails(recipients):
+    """Send welcome emails to a list of (email, name) pairs in batches
+    
+    Messages the primary transport fails to deliver are retried as one batch on the
+    fallback transport. Returns a list of booleans, one per recipient.
+    """
+    messages = [OutgoingEmail(email, name, WELCOME_EMAIL_SUBJECT, get_email_html(name))
+                for email, name in recipients]
+    results = [False] * len(messages)
+    pending = list(range(len(messages)))
+    
+    primary, fallback = get_email_transports()
+    for transport in (primary, fallback):
+        if not pending:
+            break
+        if transport is fallback:
+            if not fallback.is_configured():
+                break
+            print(f'⚠️  {primary.name} failed for {len(pending)} email(s), trying {fallback.name} fallback...')
+        
+        batch = transport.send_batch([messages[i] for i in pending])
+        email_send_duration.observe(batch.elapsed, transport.name)
+        email_messages.inc(transport.name, 'sent', amount=batch.sent)
+        email_messages.inc(transport.name, 'failed', amount=batch.failed)
+        failed = []
+        for i, ok in zip(pending, batch.results):
+            if ok:
+                results[i] = True
+                print(f'✅ Welcome email sent to {messages[i].recipient} via {transport.name}')
+            else:
+                failed.append(i)
+        if failed and transport is gmail_smtp_transport:
+            print('💡 Note: Gmail requires App Password, not regular password. Enable 2FA and generate App Password.')
+        pending = failed
+    
+    return results
+
+def send_welcome_email(email, name):
+    """Send welcome email to new user (uses API or SMTP based on configuration)"""
+    return send_welcome_emails([(email, name)])[0]
+
+# Background delivery of queued emails
+email_outbox = EmailOutbox(
+    get_db_connection,
+    return_db_connection,
+    senders={'welcome': send_welcome_emails},
+    workers=EMAIL_OUTBOX_WORKERS,
+    poll_interval=EMAIL_OUTBOX_POLL_INTERVAL,
+    max_attempts=EMAIL_OUTBOX_MAX_ATTEMPTS,
+    backoff_base=EMAIL_OUTBOX_BACKOFF_BASE,
+    backoff_max=EMAIL_OUTBOX_BACKOFF_MAX
+)
+
+def get_collection_version(cursor, scope):
+    """Current version of a collection ("tasks:<userId>" or "users"), maintained by triggers"""
+    prepared.execute(cursor, """
+        SELECT "Version" FROM "CollectionVersions" WHERE "Scope" = %s
+    """, (scope,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+def collection_etag(scope, version, *variant):
+    """Strong ETag for a collection version and the query that produced the response"""
+    digest = hashlib.sha1(repr(variant).encode('utf-8')).hexdigest()[:16]
+    return f'{scope}.{version}.{digest}'
+
+def set_collection_etag(response, etag):
+    """Attach an ETag and make browsers revalidate it on every fetch"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def not_modified(etag):
+    """304 response for a matching If-None-Match"""
+    return set_collection_etag(app.response_class(status=304), etag)
+
+# Pagination settings for GET /api/users
+USERS_PAGE_SIZE = int(os.getenv('USERS_PAGE_SIZE', 100))
+USERS_MAX_PAGE_SIZE = int(os.getenv('USERS_MAX_PAGE_SIZE', 500))
+USERS_SUGGEST_LIMIT = 10
+
+USER_DIRECTORY_COLUMNS = '"Id", "Username", "Email", "FullName", "Initials", "CreatedAt"'
+
+def user_directory_entry(row):
+    """JSON for a row selected with USER_DIRECTORY_COLUMNS"""
+    return {
+        'id': row[0],
+        'username': row[1],
+        'email': row[2],
+        'fullName': row[3] or row[1],  # Use FullName or Username as fallback
+        'initials': row[4] or '?',
+        'createdAt': row[5].isoformat() if row[5] else None
+    }
 
 @app.route('/api/users', methods=['GET'])
 @token_required
 def get_users():
-    """Get all users for team display"""
+    """Get a page of users for team display (newest first)
+    
+    Query parameters:
+        limit: page size (default USERS_PAGE_SIZE, capped at USERS_MAX_PAGE_SIZE)
+        cursor: value of the X-Next-Cursor header from the previous page
+    
+    The first page also carries the number of users in X-Total-Count.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', USERS_PAGE_SIZE)), 1), USERS_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+    
+    cursor_value = request.args.get('cursor')
+    where = ''
+    params = []
+    if cursor_value:
+        try:
+            after_created_at, after_id = decode_keyset_cursor(cursor_value)
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        where = 'WHERE ("CreatedAt", "Id") < (%s, %s)'
+        params = [after_created_at, after_id]
+    
     conn = get_db_connection()
     if not conn:
         return jsonify({'message': 'Database connection unavailable'}), 503
     
     try:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT "Id", "Username", "Email", "FullName", "CreatedAt"
-            FROM "Users"
-            ORDER BY "CreatedAt" DESC
-        """)
         
-        users = []
-        for row in cursor.fetchall():
-            full_name = row[3] or row[1]  # Use FullName or Username as fallback
-            initials = ''.join([n[0].upper() for n in full_name.split()[:2]]) if full_name else '?'
-            
-            users.append({
-                'id': row[0],
-                'username': row[1],
-                'email': row[2],
-                'fullName': full_name,
-                'initials': initials,
-                'createdAt': row[4].isoformat() if row[4] else None
-            })
+        etag = collection_etag('users', get_collection_version(cursor, 'users'), limit, cursor_value)
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
         
-        return jsonify(users), 200
+        # Fetch one extra row to know whether another page exists
+        cursor.execute(f"""
+            SELECT {USER_DIRECTORY_COLUMNS}
+            FROM "Users"
+            {where}
+            ORDER BY "CreatedAt" DESC, "Id" DESC
+            LIMIT %s
+        """, (*params, limit + 1))
+        rows = cursor.fetchall()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_keyset_cursor(rows[-1][5], rows[-1][0])
+        
+        total = None
+        if not cursor_value:
+            cursor.execute('SELECT COUNT(*) FROM "Users"')
+            total = cursor.fetchone()[0]
+        
+        response = jsonify([user_directory_entry(row) for row in rows])
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        if total is not None:
+            response.headers['X-Total-Count'] = str(total)
+        return set_collection_etag(response, etag), 200
         
     except Exception as e:
         print(f'Error fetching users: {str(e)}')
@@ -466,7 +787,57 @@ def get_users():
     finally:
         return_db_connection(conn)
 
+@app.route('/api/users/suggest', methods=['GET'])
+@token_required
+def suggest_users():
+    """Typeahead for assignee selection: users matching q by substring or fuzzily
+    
+    Prefix matches on the username come first, then closer trigram matches.
+    """
+    query = (request.args.get('q') or '').strip().lower()
+    if not query:
+        return jsonify([]), 200
+    if len(query) > 100:
+        return jsonify({'message': 'q must be at most 100 characters'}), 400
+    
+    # Treat the user's text literally inside LIKE patterns
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    try:
+        cursor = conn.cursor()
+        
+        # Both predicates are served by the trigram index "IX_Users_Search_Trgm"
+        cursor.execute(f"""
+            SELECT {USER_DIRECTORY_COLUMNS}
+            FROM "Users"
+            WHERE lower("Username" || ' ' || COALESCE("FullName", '')) LIKE %s
+               OR %s <%% lower("Username" || ' ' || COALESCE("FullName", ''))
+            ORDER BY lower("Username") LIKE %s DESC,
+                     word_similarity(%s, lower("Username" || ' ' || COALESCE("FullName", ''))) DESC,
+                     "Username"
+            LIMIT %s
+        """, (f'%{escaped}%', query, f'{escaped}%', query, USERS_SUGGEST_LIMIT))
+        
+        return jsonify([user_directory_entry(row) for row in cursor.fetchall()]), 200
+        
+    except Exception as e:
+        print(f'Error suggesting users: {str(e)}')
+        return jsonify({'message': 'Server error'}), 500
+    finally:
+        return_db_connection(conn)
+
+def busy_response():
+    """503 returned when password hashing is saturated"""
+    response = jsonify({'message': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @app.route('/api/auth/register', methods=['POST'])
+@auth_throttle
 def register():
     """Register a new user"""
     conn = get_db_connection()
@@ -499,7 +870,7 @@ def register():
             return jsonify({'message': 'Username or email already exists'}), 400
         
         # Hash password
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = password_hasher.hash(password)
         
         # Insert new user
         cursor.execute("""
@@ -509,6 +880,11 @@ def register():
         """, (username, email, hashed_password, full_name))
         
         result = cursor.fetchone()
+        
+        if result:
+            # Queue welcome email in the same transaction; the outbox workers deliver it
+            enqueue_email(cursor, 'welcome', result[2], result[3] or result[1])
+        
         conn.commit()
         
         if result:
@@ -519,12 +895,7 @@ def register():
                 'fullName': result[3]
             }
             
-            # Send welcome email
-            try:
-                send_welcome_email(user_data['email'], user_data['fullName'] or user_data['username'])
-            except Exception as e:
-                print(f'Email sending error (non-critical): {str(e)}')
-                # Don't fail registration if email fails
+            email_outbox.wake()
             
             return jsonify({
                 'message': 'User registered successfully',
@@ -533,6 +904,10 @@ def register():
         else:
             return jsonify({'message': 'Registration failed'}), 500
             
+    except PasswordHasherBusy as e:
+        print(f'Registration deferred: {str(e)}')
+        conn.rollback()
+        return busy_response()
     except Exception as e:
         print(f'Registration error: {str(e)}')
         conn.rollback()
@@ -541,6 +916,7 @@ def register():
         return_db_connection(conn)
 
 @app.route('/api/auth/login', methods=['POST'])
+@auth_throttle
 def login():
     """Login user"""
     conn = get_db_connection()
@@ -557,9 +933,10 @@ def login():
         
         cursor = conn.cursor()
         
-        # Find user
-        cursor.execute("""
-            SELECT * FROM "Users" 
+        # Find user (explicit columns: a prepared SELECT * breaks when columns are added)
+        prepared.execute(cursor, """
+            SELECT "Id", "Username", "Email", "Password", "FullName"
+            FROM "Users"
             WHERE "Username" = %s
         """, (username,))
         
@@ -569,15 +946,24 @@ def login():
             return jsonify({'message': 'Invalid username or password'}), 401
         
         # Verify password
-        if not bcrypt.checkpw(password.encode('utf-8'), user[3].encode('utf-8')):
+        if not password_hasher.verify(password, user[3]):
             return jsonify({'message': 'Invalid username or password'}), 401
         
+        # Upgrade hashes created with a different cost factor while we know the password
+        new_hash = None
+        if password_hasher.needs_rehash(user[3]):
+            try:
+                new_hash = password_hasher.hash(password)
+            except PasswordHasherBusy:
+                pass  # Try again on a later login
+        
         # Update last login
-        cursor.execute("""
+        prepared.execute(cursor, """
             UPDATE "Users" 
-            SET "LastLogin" = CURRENT_TIMESTAMP 
+            SET "LastLogin" = CURRENT_TIMESTAMP,
+                "Password" = COALESCE(%s, "Password")
             WHERE "Id" = %s
-        """, (user[0],))
+        """, (new_hash, user[0]))
         conn.commit()
         
         # Generate JWT token
@@ -599,6 +985,10 @@ def login():
             'fullName': user[4]
         }), 200
         
+    except PasswordHasherBusy as e:
+        print(f'Login deferred: {str(e)}')
+        conn.rollback()
+        return busy_response()
     except Exception as e:
         print(f'Login error: {str(e)}')
         conn.rollback()
@@ -616,7 +1006,7 @@ def get_current_user():
     
     try:
         cursor = conn.cursor()
-        cursor.execute("""
+        prepared.execute(cursor, """
             SELECT "Id", "Username", "Email", "FullName", "CreatedAt", "LastLogin" 
             FROM "Users" 
             WHERE "Id" = %s
@@ -646,40 +1036,291 @@ def get_current_user():
 
 # Task Management Routes
 
+# Real-time task change stream (GET /api/tasks/stream)
+# Per process; under gunicorn at most GUNICORN_THREADS - GUNICORN_REQUEST_THREADS (see gunicorn.conf.py)
+TASK_STREAM_MAX_CLIENTS = int(os.getenv('TASK_STREAM_MAX_CLIENTS', 500))
+TASK_STREAM_QUEUE_SIZE = int(os.getenv('TASK_STREAM_QUEUE_SIZE', 100))  # events buffered per client
+TASK_STREAM_REPLAY_SIZE = int(os.getenv('TASK_STREAM_REPLAY_SIZE', 1000))  # events kept for Last-Event-ID
+TASK_STREAM_HEARTBEAT = float(os.getenv('TASK_STREAM_HEARTBEAT', 15))
+# Seconds a stream token (POST /api/tasks/stream/token) can be used to open the stream
+TASK_STREAM_TOKEN_TTL = int(os.getenv('TASK_STREAM_TOKEN_TTL', 60))
+
+task_events = None
+if POSTGRES_AVAILABLE:
+    # Listener thread starts with the first subscriber and uses its own connection
+    task_events = TaskEventBroker(
+        connect_database,
+        max_clients=TASK_STREAM_MAX_CLIENTS,
+        client_queue_size=TASK_STREAM_QUEUE_SIZE,
+        replay_size=TASK_STREAM_REPLAY_SIZE
+    )
+
+@app.route('/api/tasks/stream/token', methods=['POST'])
+@token_required
+def create_stream_token():
+    """Short-lived token that only opens the task stream
+    
+    EventSource can't send headers, so the stream token travels in the URL,
+    where proxies and access logs record it; the login token must never go there.
+    """
+    token = jwt.encode(
+        {
+            'userId': request.user['userId'],
+            'username': request.user['username'],
+            'scope': 'task_stream',
+            'exp': datetime.utcnow() + timedelta(seconds=TASK_STREAM_TOKEN_TTL)
+        },
+        JWT_SECRET,
+        algorithm='HS256'
+    )
+    return jsonify({'token': token, 'expiresIn': TASK_STREAM_TOKEN_TTL}), 200
+
+@app.route('/api/tasks/stream', methods=['GET'])
+def stream_tasks():
+    """Server-Sent Events stream of the current user's task changes
+    
+    Authenticate with the Authorization header or, for EventSource, with
+    ?token= from POST /api/tasks/stream/token (login tokens are refused there).
+    Emits "task" events ({"seq", "op", "id", "userId"}; one "import" event with no
+    id per bulk import) and "reset" events when the client must reload the full
+    list (resume point no longer buffered).
+    """
+    auth_header = request.headers.get('Authorization', '')
+    if ' ' in auth_header:
+        data, error = verify_token(auth_header.split(' ')[1])
+    elif request.args.get('token'):
+        data, error = verify_token(request.args['token'], scope='task_stream')
+    else:
+        return jsonify({'message': 'Token is missing'}), 401
+    if error:
+        return error
+    
+    if task_events is None:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    try:
+        subscription, replay = task_events.subscribe(data['userId'], last_event_id)
+    except TooManySubscribers as e:
+        print(f'Task stream rejected: {str(e)}')
+        response = jsonify({'message': 'Too many live connections, please retry later'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    return Response(
+        stream_with_context(task_events.stream(subscription, replay, heartbeat=TASK_STREAM_HEARTBEAT)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Don't let reverse proxies buffer the stream
+        }
+    )
+
+# Pagination settings for GET /api/tasks
+TASKS_PAGE_SIZE = int(os.getenv('TASKS_PAGE_SIZE', 100))
+TASKS_MAX_PAGE_SIZE = int(os.getenv('TASKS_MAX_PAGE_SIZE', 500))
+
+# Query parameter -> column for server-side task filters
+TASK_FILTERS = {
+    'status': '"Status"',
+    'priority': '"Priority"',
+    'type': '"Type"',
+    'assignee': '"Assignee"'
+}
+
+def encode_keyset_cursor(timestamp, row_id):
+    """Encode a (timestamp, Id) keyset position as an opaque cursor
+    
+    Used for tasks and users by "CreatedAt" and for sync tokens by "UpdatedAt".
+    """
+    raw = f'{timestamp.isoformat()}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_keyset_cursor(cursor_value):
+    """Decode a cursor produced by encode_keyset_cursor, raising ValueError if malformed"""
+    padded = cursor_value + '=' * (-len(cursor_value) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        timestamp, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (UnicodeError, binascii.Error) as e:
+        raise ValueError(f'Invalid cursor: {str(e)}')
+
+# JSON keys of a task, in the order of task_row_values()
+TASK_FIELDS = ('id', 'taskId', 'type', 'title', 'description', 'assignee', 'priority', 'status', 'createdAt', 'updatedAt')
+
+def task_row_values(row):
+    """Compact tuple of serialized task fields for a "Tasks" row (cached as-is)"""
+    return (
+        str(row[0]),
+        row[1] or f'AUTO-{str(row[0]).zfill(3)}',
+        row[2] or 'task',
+        row[3],
+        row[4] or '',
+        row[5] or '',
+        row[6] or 'medium',
+        row[7] or 'todo',
+        row[8].isoformat() if row[8] else None,
+        row[9].isoformat() if row[9] else None
+    )
+
+# Task JSON is written field by field, keys sorted, with the C string encoder json.dumps
+# uses for ensure_ascii, so it is byte for byte what jsonify() would produce for the dict
+TASK_JSON_ORDER = tuple(sorted(range(len(TASK_FIELDS)), key=TASK_FIELDS.__getitem__))
+TASK_JSON_TEMPLATE = '{' + ','.join(f'{json_string(TASK_FIELDS[i])}:%s' for i in TASK_JSON_ORDER) + '}'
+
+def task_json(values):
+    """Compact JSON object for a task_row_values() tuple"""
+    return TASK_JSON_TEMPLATE % tuple('null' if values[i] is None else json_string(values[i]) for i in TASK_JSON_ORDER)
+
+# Where task list JSON is built: 'python' (task_json) or 'sql' (TASK_JSON_SQL, PostgreSQL writes it)
+TASK_JSON_SOURCE = os.getenv('TASK_JSON_SOURCE', 'python').lower()
+
+def _sql_isoformat(column):
+    # datetime.isoformat(): microseconds only when non-zero
+    return (f"""to_char({column}, 'YYYY-MM-DD"T"HH24:MI:SS') || """
+            f"""CASE WHEN date_trunc('second', {column}) = {column} THEN '' ELSE to_char({column}, '.US') END""")
+
+# Same JSON as task_json(task_row_values(row)), apart from non-ASCII characters (see ascii_json)
+TASK_JSON_SQL = f"""
+    '{{"assignee":' || to_json(COALESCE("Assignee", ''))::text
+    || ',"createdAt":' || COALESCE(to_json({_sql_isoformat('"CreatedAt"')})::text, 'null')
+    || ',"description":' || to_json(COALESCE("Description", ''))::text
+    || ',"id":' || to_json("Id"::text)::text
+    || ',"priority":' || to_json(COALESCE(NULLIF("Priority", ''), 'medium'))::text
+    || ',"status":' || to_json(COALESCE(NULLIF("Status", ''), 'todo'))::text
+    || ',"taskId":' || to_json(COALESCE(NULLIF("TaskId", ''),
+                                        'AUTO-' || CASE WHEN "Id" >= 100 THEN "Id"::text ELSE lpad("Id"::text, 3, '0') END))::text
+    || ',"title":' || COALESCE(to_json("Title")::text, 'null')
+    || ',"type":' || to_json(COALESCE(NULLIF("Type", ''), 'task'))::text
+    || ',"updatedAt":' || COALESCE(to_json({_sql_isoformat('"UpdatedAt"')})::text, 'null')
+    || '}}'
+"""
+
+JSON_NON_ASCII = re.compile(r'[^\x00-\x7e]')
+
+def _escape_json_char(match):
+    code = ord(match.group())
+    if code < 0x10000:
+        return f'\\u{code:04x}'
+    code -= 0x10000
+    return f'\\u{0xd800 | (code >> 10):04x}\\u{0xdc00 | (code & 0x3ff):04x}'
+
+def ascii_json(text):
+    """Escape what PostgreSQL's JSON leaves raw (non-ASCII, DEL) exactly as ensure_ascii does"""
+    if text.isascii() and '\x7f' not in text:
+        return text
+    return JSON_NON_ASCII.sub(_escape_json_char, text)
+
+def json_body_response(body, status=200):
+    """Response for an already serialized compact JSON document, as jsonify() would send it"""
+    if app.json.compact is False or (app.json.compact is None and app.debug):
+        # Debug mode pretty-prints; re-encode so output still matches jsonify()
+        return jsonify(json.loads(body)), status
+    return app.response_class(body + '\n', mimetype=app.json.mimetype), status
+
+def task_response(row, status=200):
+    """JSON response for one "Tasks" row (columns as in TASK_COLUMNS)"""
+    return json_body_response(task_json(task_row_values(row)), status)
+
+def task_page_response(rows, next_cursor, etag):
+    """JSON response for a page of task JSON objects (task_json() strings)"""
+    response, status = json_body_response('[' + ','.join(rows) + ']')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return set_collection_etag(response, etag), status
+
 @app.route('/api/tasks', methods=['GET'])
 @token_required
 def get_tasks():
-    """Get all tasks for the current user"""
+    """Get a page of tasks for the current user (newest first)
+    
+    Query parameters:
+        limit: page size (default TASKS_PAGE_SIZE, capped at TASKS_MAX_PAGE_SIZE)
+        cursor: value of the X-Next-Cursor header from the previous page
+        status, priority, type, assignee: optional exact-match filters
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', TASKS_PAGE_SIZE)), 1), TASKS_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+    
+    user_id = request.user['userId']
+    where = ['"UserId" = %s']
+    params = [user_id]
+    
+    filters = []
+    for arg, column in TASK_FILTERS.items():
+        value = request.args.get(arg)
+        filters.append(value or None)
+        if value:
+            where.append(f'{column} = %s')
+            params.append(value)
+    
+    cursor_value = request.args.get('cursor')
+    cache_key = (limit, cursor_value, *filters)
+    cache_token = task_list_cache.begin(user_id)
+    
+    if cursor_value:
+        try:
+            after_created_at, after_id = decode_keyset_cursor(cursor_value)
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        where.append('("CreatedAt", "Id") < (%s, %s)')
+        params.extend([after_created_at, after_id])
+    
     conn = get_db_connection()
     if not conn:
         return jsonify({'message': 'Database connection unavailable'}), 503
     
     try:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT "Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt"
+        
+        # Answer revalidations from the version counter without touching "Tasks"
+        scope = f'tasks:{user_id}'
+        version = get_collection_version(cursor, scope)
+        etag = collection_etag(scope, version, *cache_key)
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
+        
+        # Serve the page from the per-user cache if it was built from this version
+        cached = task_list_cache.get(user_id, cache_key, cache_token, version)
+        if cached is not None:
+            return task_page_response(*cached)
+        
+        if TASK_JSON_SOURCE == 'sql':
+            columns = f'"Id", "CreatedAt", {TASK_JSON_SQL}'
+        else:
+            columns = '"Id", "CreatedAt", "Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt"'
+        
+        # Fetch one extra row to know whether another page exists (one prepared statement per filter combination)
+        prepared.execute(cursor, f"""
+            SELECT {columns}
             FROM "Tasks"
-            WHERE "UserId" = %s
-            ORDER BY "CreatedAt" DESC
-        """, (request.user['userId'],))
+            WHERE {' AND '.join(where)}
+            ORDER BY "CreatedAt" DESC, "Id" DESC
+            LIMIT %s
+        """, (*params, limit + 1))
+        
+        rows = cursor.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_keyset_cursor(rows[-1][1], rows[-1][0])
+        
+        if TASK_JSON_SOURCE == 'sql':
+            objects = tuple(ascii_json(row[2]) for row in rows)
+        else:
+            objects = tuple(task_json(task_row_values(row[2:])) for row in rows)
+        page = (objects, next_cursor, etag)
+        task_list_cache.put(user_id, cache_key, page, cache_token, version)
         
-        tasks = []
-        for row in cursor.fetchall():
-            task_id = row[1] or f'AUTO-{str(row[0]).zfill(3)}'
-            tasks.append({
-                'id': str(row[0]),
-                'taskId': task_id,
-                'type': row[2] or 'task',
-                'title': row[3],
-                'description': row[4] or '',
-                'assignee': row[5] or '',
-                'priority': row[6] or 'medium',
-                'status': row[7] or 'todo',
-                'createdAt': row[8].isoformat() if row[8] else None,
-                'updatedAt': row[9].isoformat() if row[9] else None
-            })
-        
-        return jsonify(tasks), 200
+        return task_page_response(*page)
         
     except Exception as e:
         print(f'Get tasks error: {str(e)}')
@@ -687,6 +1328,305 @@ def get_tasks():
     finally:
         return_db_connection(conn)
 
+# Full-text search settings for GET /api/tasks/search
+TASK_SEARCH_PAGE_SIZE = int(os.getenv('TASK_SEARCH_PAGE_SIZE', 20))
+TASK_SEARCH_MAX_PAGE_SIZE = 100
+TASK_SEARCH_MAX_QUERY_LENGTH = 200
+
+# ts_headline options; only the <mark> tags survive escaping in search_highlight()
+TASK_HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=" ... "'
+
+def encode_search_cursor(rank, row_id):
+    """Encode the (rank, Id) keyset position of a search result as an opaque cursor"""
+    raw = f'{rank!r}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_search_cursor(cursor_value):
+    """Decode a cursor produced by encode_search_cursor, raising ValueError if malformed"""
+    padded = cursor_value + '=' * (-len(cursor_value) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        rank, row_id = raw.rsplit('|', 1)
+        return float(rank), int(row_id)
+    except (UnicodeError, binascii.Error) as e:
+        raise ValueError(f'Invalid cursor: {str(e)}')
+
+def search_highlight(fragment):
+    """HTML-escape a ts_headline fragment, keeping only its <mark> tags"""
+    parts = re.split(r'(</?mark>)', fragment or '')
+    return ''.join(part if part in ('<mark>', '</mark>') else html.escape(part) for part in parts)
+
+@app.route('/api/tasks/search', methods=['GET'])
+@token_required
+def search_tasks():
+    """Full-text search over the current user's task IDs, titles and descriptions
+    
+    Query parameters:
+        q: search text (web search syntax: "exact phrase", -excluded, or)
+        limit: page size (default TASK_SEARCH_PAGE_SIZE, capped at TASK_SEARCH_MAX_PAGE_SIZE)
+        cursor: value of the X-Next-Cursor header from the previous page
+    
+    Results are ordered by relevance and carry HTML-safe highlights.
+    """
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'message': 'q is required'}), 400
+    if len(query) > TASK_SEARCH_MAX_QUERY_LENGTH:
+        return jsonify({'message': f'q must be at most {TASK_SEARCH_MAX_QUERY_LENGTH} characters'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', TASK_SEARCH_PAGE_SIZE)), 1), TASK_SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+    
+    where = ['"UserId" = %s', '"SearchVector" @@ query.q']
+    params = [request.user['userId']]
+    
+    cursor_value = request.args.get('cursor')
+    if cursor_value:
+        try:
+            after_rank, after_id = decode_search_cursor(cursor_value)
+        except ValueError:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        # ts_rank() is a real; compare as real so the boundary row matches exactly
+        where.append('(ts_rank("SearchVector", query.q), "Id") < (%s::real, %s)')
+        params.extend([after_rank, after_id])
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    try:
+        cursor = conn.cursor()
+        
+        # The GIN index finds the matches; headlines are only built for the returned page
+        cursor.execute(f"""
+            WITH query AS (SELECT websearch_to_tsquery('english', %s) AS q)
+            SELECT page."Id", page."TaskId", page."Type", page."Title", page."Description",
+                   page."Assignee", page."Priority", page."Status", page."CreatedAt", page."UpdatedAt",
+                   page.rank,
+                   ts_headline('english', page."Title", query.q, %s),
+                   ts_headline('english', coalesce(page."Description", ''), query.q, %s)
+            FROM (
+                SELECT "Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status",
+                       "CreatedAt", "UpdatedAt", ts_rank("SearchVector", query.q) AS rank
+                FROM "Tasks", query
+                WHERE {' AND '.join(where)}
+                ORDER BY rank DESC, "Id" DESC
+                LIMIT %s
+            ) page, query
+            ORDER BY page.rank DESC, page."Id" DESC
+        """, (query, TASK_HEADLINE_OPTIONS, TASK_HEADLINE_OPTIONS, *params, limit + 1))
+        
+        rows = cursor.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_search_cursor(rows[-1][10], rows[-1][0])
+        
+        results = []
+        for row in rows:
+            task = dict(zip(TASK_FIELDS, task_row_values(row)))
+            task['rank'] = row[10]
+            task['highlights'] = {
+                'title': search_highlight(row[11]),
+                'description': search_highlight(row[12])
+            }
+            results.append(task)
+        
+        response = jsonify(results)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+        
+    except Exception as e:
+        print(f'Search tasks error: {str(e)}')
+        return jsonify({'message': 'Server error'}), 500
+    finally:
+        return_db_connection(conn)
+
+# Where GET /api/tasks/summary reads from: 'counters' ("TaskCounts", kept by triggers) or 'query'
+TASK_SUMMARY_SOURCE = os.getenv('TASK_SUMMARY_SOURCE', 'counters').lower()
+TASK_SUMMARY_DIMENSIONS = ('status', 'priority', 'type', 'assignee')
+
+def empty_task_summary():
+    """Summary with no tasks counted"""
+    summary = {'total': 0}
+    for dimension in TASK_SUMMARY_DIMENSIONS:
+        summary[dimension] = {}
+    return summary
+
+@app.route('/api/tasks/summary', methods=['GET'])
+@token_required
+def get_task_summary():
+    """Task counts for the current user: total and per status, priority, type and assignee"""
+    user_id = request.user['userId']
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    try:
+        cursor = conn.cursor()
+        
+        scope = f'tasks:{user_id}'
+        etag = collection_etag(scope, get_collection_version(cursor, scope), 'summary')
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
+        
+        summary = empty_task_summary()
+        if TASK_SUMMARY_SOURCE == 'counters':
+            # O(number of distinct values), however many tasks the user has
+            cursor.execute("""
+                SELECT "Dimension", "Value", "Count"
+                FROM "TaskCounts"
+                WHERE "UserId" = %s AND "Count" > 0
+            """, (user_id,))
+            for dimension, value, count in cursor.fetchall():
+                if dimension == 'total':
+                    summary['total'] = count
+                elif dimension in summary:
+                    summary[dimension][value] = count
+        else:
+            # One pass over the covering index "IX_Tasks_UserId_Summary"
+            cursor.execute("""
+                SELECT status, priority, type, assignee, COUNT(*),
+                       GROUPING(status), GROUPING(priority), GROUPING(type), GROUPING(assignee)
+                FROM (
+                    SELECT COALESCE(NULLIF("Status", ''), 'todo') AS status,
+                           COALESCE(NULLIF("Priority", ''), 'medium') AS priority,
+                           COALESCE(NULLIF("Type", ''), 'task') AS type,
+                           COALESCE("Assignee", '') AS assignee
+                    FROM "Tasks"
+                    WHERE "UserId" = %s
+                ) t
+                GROUP BY GROUPING SETS ((status), (priority), (type), (assignee), ())
+            """, (user_id,))
+            for row in cursor.fetchall():
+                values, count, grouped = row[:4], row[4], row[5:]
+                if all(grouped):
+                    summary['total'] = count
+                    continue
+                for dimension, value, is_grouped in zip(TASK_SUMMARY_DIMENSIONS, values, grouped):
+                    if not is_grouped:
+                        summary[dimension][value] = count
+        
+        return set_collection_etag(jsonify(summary), etag), 200
+        
+    except Exception as e:
+        print(f'Task summary error: {str(e)}')
+        return jsonify({'message': 'Server error'}), 500
+    finally:
+        return_db_connection(conn)
+
+# Streaming export settings for GET /api/tasks/export
+TASK_EXPORT_ITERSIZE = int(os.getenv('TASK_EXPORT_ITERSIZE', 2000))  # rows per server-side cursor fetch
+TASK_EXPORT_CHUNK_BYTES = 64 * 1024
+TASK_EXPORT_MAX_CONCURRENT = int(os.getenv('TASK_EXPORT_MAX_CONCURRENT', 2))  # exports per process
+TASK_EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+task_export_slots = threading.BoundedSemaphore(max(TASK_EXPORT_MAX_CONCURRENT, 1))
+
+def export_task_chunks(conn, user_id, export_format):
+    """Yield an export in ~TASK_EXPORT_CHUNK_BYTES chunks, reading a named cursor TASK_EXPORT_ITERSIZE rows at a time
+    
+    user_id None exports every user's tasks, with the owner's "userId" in each record.
+    """
+    try:
+        # A named cursor keeps the result on the server; only itersize rows are in memory at once
+        cursor = conn.cursor(name='task_export')
+        cursor.itersize = TASK_EXPORT_ITERSIZE
+        if user_id is None:
+            cursor.execute("""
+                SELECT "Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt", "UserId"
+                FROM "Tasks"
+                ORDER BY "Id"
+            """)
+        else:
+            cursor.execute("""
+                SELECT "Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt", "UserId"
+                FROM "Tasks"
+                WHERE "UserId" = %s
+                ORDER BY "Id"
+            """, (user_id,))
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if export_format == 'csv' else None
+        if writer:
+            writer.writerow(TASK_FIELDS + ('userId',) if user_id is None else TASK_FIELDS)
+        
+        for row in cursor:
+            values = task_row_values(row)
+            if writer:
+                writer.writerow((*values, row[10]) if user_id is None else values)
+            elif user_id is None:
+                buffer.write(f'{{"userId":{row[10]},{task_json(values)[1:]}\n')
+            else:
+                buffer.write(task_json(values) + '\n')
+            
+            if buffer.tell() >= TASK_EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+        cursor.close()
+    except Exception as e:
+        # Headers are already sent; cutting the stream short is the only way to signal failure
+        print(f'Task export error: {str(e)}')
+        raise
+
+@app.route('/api/tasks/export', methods=['GET'])
+@token_required
+def export_tasks():
+    """Stream all of the current user's tasks as NDJSON or CSV
+    
+    Query parameters:
+        format: ndjson (default, one task object per line) or csv
+        scope: mine (default) or all (every user's tasks; ADMIN_USERNAMES only)
+    """
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in TASK_EXPORT_FORMATS:
+        return jsonify({'message': f'format must be one of: {", ".join(TASK_EXPORT_FORMATS)}'}), 400
+    
+    scope = request.args.get('scope', 'mine').lower()
+    if scope not in ('mine', 'all'):
+        return jsonify({'message': 'scope must be mine or all'}), 400
+    if scope == 'all' and not is_admin(request.user):
+        return jsonify({'message': 'Admin access required'}), 403
+    
+    # Each export holds a pool connection for its whole duration
+    if not task_export_slots.acquire(blocking=False):
+        response = jsonify({'message': 'Too many exports in progress, please retry later'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    conn = get_db_connection()
+    if not conn:
+        task_export_slots.release()
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    def release():
+        # Runs when the server closes the response: finished, failed or client gone
+        return_db_connection(conn)
+        task_export_slots.release()
+    
+    user_id = None if scope == 'all' else request.user['userId']
+    filename = f'tasks-{scope}-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}'
+    response = Response(
+        export_task_chunks(conn, user_id, export_format),
+        mimetype=TASK_EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+    response.call_on_close(release)
+    return response
+
 @app.route('/api/tasks', methods=['POST'])
 @token_required
 def create_task():
@@ -701,7 +1641,7 @@ def create_task():
         
         task_id = data.get('taskId') or f'AUTO-{int(datetime.now().timestamp() * 1000) % 10000}'
         
-        cursor.execute("""
+        prepared.execute(cursor, """
             INSERT INTO "Tasks" ("UserId", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status")
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING "Id", "TaskId", "Type", "Title", "Description", 
@@ -720,21 +1660,9 @@ def create_task():
         
         row = cursor.fetchone()
         conn.commit()
+        task_list_cache.invalidate(request.user['userId'])
         
-        task = {
-            'id': str(row[0]),
-            'taskId': row[1] or task_id,
-            'type': row[2] or 'task',
-            'title': row[3],
-            'description': row[4] or '',
-            'assignee': row[5] or '',
-            'priority': row[6] or 'medium',
-            'status': row[7] or 'todo',
-            'createdAt': row[8].isoformat() if row[8] else None,
-            'updatedAt': row[9].isoformat() if row[9] else None
-        }
-        
-        return jsonify(task), 201
+        return task_response(row, 201)
         
     except Exception as e:
         print(f'Create task error: {str(e)}')
@@ -755,16 +1683,8 @@ def update_task(task_id):
         data = request.get_json()
         cursor = conn.cursor()
         
-        # Check if task belongs to user
-        cursor.execute("""
-            SELECT "UserId" FROM "Tasks" WHERE "Id" = %s
-        """, (task_id,))
-        
-        task = cursor.fetchone()
-        if not task or task[0] != request.user['userId']:
-            return jsonify({'message': 'Task not found'}), 404
-        
-        cursor.execute("""
+        # Ownership is enforced by the WHERE clause; no row back means not found
+        prepared.execute(cursor, """
             UPDATE "Tasks"
             SET "Type" = %s, "Title" = %s, "Description" = %s, "Assignee" = %s, 
                 "Priority" = %s, "Status" = %s
@@ -789,20 +1709,9 @@ def update_task(task_id):
         if not row:
             return jsonify({'message': 'Task not found'}), 404
         
-        task = {
-            'id': str(row[0]),
-            'taskId': row[1] or f'AUTO-{str(row[0]).zfill(3)}',
-            'type': row[2] or 'task',
-            'title': row[3],
-            'description': row[4] or '',
-            'assignee': row[5] or '',
-            'priority': row[6] or 'medium',
-            'status': row[7] or 'todo',
-            'createdAt': row[8].isoformat() if row[8] else None,
-            'updatedAt': row[9].isoformat() if row[9] else None
-        }
+        task_list_cache.invalidate(request.user['userId'])
         
-        return jsonify(task), 200
+        return task_response(row)
         
     except Exception as e:
         print(f'Update task error: {str(e)}')
@@ -811,32 +1720,609 @@ def update_task(task_id):
     finally:
         return_db_connection(conn)
 
-@app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+# Delta sync settings (GET /api/tasks/changes)
+TASK_SYNC_PAGE_SIZE = int(os.getenv('TASK_SYNC_PAGE_SIZE', 500))
+# Changes committed by transactions that started up to this many seconds before a sync are re-sent
+TASK_SYNC_SAFETY_WINDOW = float(os.getenv('TASK_SYNC_SAFETY_WINDOW', 5))
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.getenv('TASK_TOMBSTONE_RETENTION_DAYS', 30))
+TASK_TOMBSTONE_COMPACT_INTERVAL = float(os.getenv('TASK_TOMBSTONE_COMPACT_INTERVAL', 3600))  # seconds, 0 disables
+
+@app.route('/api/tasks/changes', methods=['GET'])
 @token_required
-def delete_task(task_id):
-    """Delete a task"""
+def get_task_changes():
+    """Tasks created/updated and IDs of tasks deleted since a sync token
+    
+    Query parameters:
+        since: "next" token from the previous response (omit for a full initial sync)
+        limit: max tasks per response (default TASK_SYNC_PAGE_SIZE)
+    
+    Response: {"tasks": [...], "deleted": ["<id>", ...], "next": token, "hasMore": bool}
+    While hasMore is true, call again with next straight away. Items may repeat
+    across calls, so clients should upsert/delete idempotently. A token older than
+    the tombstone retention gets 410 and the client must reload everything.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', TASK_SYNC_PAGE_SIZE)), 1), TASK_SYNC_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+    
+    since = request.args.get('since')
+    after = None
+    if since:
+        try:
+            after = decode_keyset_cursor(since)
+        except ValueError:
+            return jsonify({'message': 'Invalid sync token'}), 400
+    
     conn = get_db_connection()
     if not conn:
         return jsonify({'message': 'Database connection unavailable'}), 503
     
     try:
         cursor = conn.cursor()
+        user_id = request.user['userId']
         
-        # Check if task belongs to user
+        # Taken before reading changes so nothing committed afterwards is skipped.
+        # The token's age is judged by the database clock, like compact_task_tombstones()
         cursor.execute("""
-            SELECT "UserId" FROM "Tasks" WHERE "Id" = %s
-        """, (task_id,))
+            SELECT (CURRENT_TIMESTAMP - make_interval(secs => %s))::timestamp,
+                   %s::timestamp < CURRENT_TIMESTAMP - make_interval(days => %s)
+        """, (TASK_SYNC_SAFETY_WINDOW, after[0] if after else None, TASK_TOMBSTONE_RETENTION_DAYS))
+        horizon, expired = cursor.fetchone()
+        if expired:
+            return jsonify({'message': 'Sync token expired; reload all tasks'}), 410
+        
+        where = '"UserId" = %s'
+        params = [user_id]
+        if after:
+            where += ' AND ("UpdatedAt", "Id") > (%s, %s)'
+            params.extend(after)
+        cursor.execute(f"""
+            SELECT {TASK_RETURNING}
+            FROM "Tasks"
+            WHERE {where}
+            ORDER BY "UpdatedAt", "Id"
+            LIMIT %s
+        """, (*params, limit + 1))
+        rows = cursor.fetchall()
+        
+        deleted = []
+        if after:
+            cursor.execute("""
+                SELECT DISTINCT "TaskId" FROM "TaskTombstones"
+                WHERE "UserId" = %s AND "DeletedAt" > %s
+            """, (user_id, after[0]))
+            deleted = [str(row[0]) for row in cursor.fetchall()]
+        
+        has_more = len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+            next_token = encode_keyset_cursor(rows[-1][9], rows[-1][0])
+        else:
+            # Start the next sync a little in the past; see TASK_SYNC_SAFETY_WINDOW
+            next_token = encode_keyset_cursor(horizon, 0)
+        
+        return jsonify({
+            'tasks': [dict(zip(TASK_FIELDS, task_row_values(row))) for row in rows],
+            'deleted': deleted,
+            'next': next_token,
+            'hasMore': has_more
+        }), 200
+        
+    except Exception as e:
+        print(f'Task changes error: {str(e)}')
+        return jsonify({'message': 'Server error'}), 500
+    finally:
+        return_db_connection(conn)
+
+def compact_task_tombstones():
+    """Delete tombstones older than the retention period (one process at a time)"""
+    conn = get_db_connection()
+    if not conn:
+        return
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT pg_try_advisory_xact_lock(hashtext(%s))', ('compact_task_tombstones',))
+        if cursor.fetchone()[0]:
+            cursor.execute("""
+                DELETE FROM "TaskTombstones"
+                WHERE "DeletedAt" < CURRENT_TIMESTAMP - make_interval(days => %s)
+            """, (TASK_TOMBSTONE_RETENTION_DAYS,))
+            if cursor.rowcount:
+                print(f'[OK] Compacted {cursor.rowcount} task tombstones')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        return_db_connection(conn)
+
+tombstone_compactor = PeriodicJob('tombstone-compactor', TASK_TOMBSTONE_COMPACT_INTERVAL, compact_task_tombstones)
+
+# Fields a PATCH may change -> column
+TASK_UPDATABLE_FIELDS = {
+    'type': '"Type"',
+    'title': '"Title"',
+    'description': '"Description"',
+    'assignee': '"Assignee"',
+    'priority': '"Priority"',
+    'status': '"Status"'
+}
+
+@app.route('/api/tasks/<int:task_id>', methods=['PATCH'])
+@token_required
+def patch_task(task_id):
+    """Update only the supplied fields of a task"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Request body must be a JSON object'}), 400
+    
+    fields = [field for field in TASK_UPDATABLE_FIELDS if field in data]
+    if not fields:
+        return jsonify({'message': f'Supply at least one of: {", ".join(TASK_UPDATABLE_FIELDS)}'}), 400
+    if 'title' in fields and not data['title']:
+        return jsonify({'message': 'Title cannot be empty'}), 400
+    # Same type and length checks as batch updates, so bad values are a 400 rather than a database error
+    error = validate_task_fields({field: data[field] for field in fields}, require_title=False)
+    if error:
+        return jsonify({'message': error}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    try:
+        cursor = conn.cursor()
+        
+        # Single statement: ownership check, partial update and the updated row
+        assignments = ', '.join(f'{TASK_UPDATABLE_FIELDS[field]} = %s' for field in fields)
+        cursor.execute(f"""
+            UPDATE "Tasks"
+            SET {assignments}
+            WHERE "Id" = %s AND "UserId" = %s
+            RETURNING "Id", "TaskId", "Type", "Title", "Description",
+                   "Assignee", "Priority", "Status",
+                   "CreatedAt", "UpdatedAt"
+        """, (*[data[field] for field in fields], task_id, request.user['userId']))
         
-        task = cursor.fetchone()
-        if not task or task[0] != request.user['userId']:
+        row = cursor.fetchone()
+        conn.commit()
+        
+        if not row:
             return jsonify({'message': 'Task not found'}), 404
         
+        task_list_cache.invalidate(request.user['userId'])
+        
+        return task_response(row)
+        
+    except Exception as e:
+        print(f'Patch task error: {str(e)}')
+        conn.rollback()
+        return jsonify({'message': 'Server error updating task'}), 500
+    finally:
+        return_db_connection(conn)
+
+# Bulk operations (POST /api/tasks/batch)
+TASKS_BATCH_MAX = int(os.getenv('TASKS_BATCH_MAX', 1000))
+
+# Max length of each writable task field (None = unlimited), matching the "Tasks" columns
+TASK_FIELD_LIMITS = {
+    'taskId': 50,
+    'type': 20,
+    'title': 200,
+    'description': None,
+    'assignee': 100,
+    'priority': 20,
+    'status': 20
+}
+
+# Columns returned for a task, in the order task_row_values() expects
+TASK_COLUMNS = ('"Id"', '"TaskId"', '"Type"', '"Title"', '"Description"', '"Assignee"', '"Priority"', '"Status"', '"CreatedAt"', '"UpdatedAt"')
+TASK_RETURNING = ', '.join(TASK_COLUMNS)
+
+def validate_task_fields(task, require_title):
+    """Error message for an invalid task payload, or None"""
+    if not isinstance(task, dict):
+        return 'task must be an object'
+    for field, limit in TASK_FIELD_LIMITS.items():
+        value = task.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            return f'{field} must be a string'
+        if limit and len(value) > limit:
+            return f'{field} must be at most {limit} characters'
+    if (require_title or 'title' in task) and not task.get('title'):
+        return 'title is required'
+    return None
+
+def batch_create_tasks(cursor, user_id, items):
+    """Insert tasks with one multi-row INSERT; returns {index: row}"""
+    rows = execute_values(cursor, f"""
+        INSERT INTO "Tasks" ("UserId", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status")
+        VALUES %s
+        RETURNING {TASK_RETURNING}
+    """, [
+        (
+            user_id,
+            # Left empty so the AUTO-<Id> fallback keeps batch-created IDs unique
+            task.get('taskId'),
+            task.get('type', 'task'),
+            task.get('title'),
+            task.get('description', ''),
+            task.get('assignee', ''),
+            task.get('priority', 'medium'),
+            task.get('status', 'todo')
+        )
+        for _, task in items
+    ], page_size=len(items), fetch=True)
+    # Multi-row INSERT ... RETURNING yields rows in VALUES order
+    return {index: row for (index, _), row in zip(items, rows)}
+
+def batch_update_tasks(cursor, user_id, items):
+    """Apply partial updates with one UPDATE ... FROM (VALUES ...); returns {index: row}"""
+    fields = list(TASK_UPDATABLE_FIELDS)
+    values = []
+    for _, (task_id, task) in items:
+        # Bit i of the mask is set when fields[i] was supplied
+        mask = sum(1 << i for i, field in enumerate(fields) if field in task)
+        values.append((task_id, user_id, mask, *[task.get(field) for field in fields]))
+    assignments = ',\n            '.join(
+        f'{TASK_UPDATABLE_FIELDS[field]} = CASE WHEN v.mask & {1 << i} <> 0 THEN v.{field} ELSE t.{TASK_UPDATABLE_FIELDS[field]} END'
+        for i, field in enumerate(fields)
+    )
+    returning = ', '.join(f't.{column}' for column in TASK_COLUMNS)
+    rows = execute_values(cursor, f"""
+        UPDATE "Tasks" AS t
+        SET {assignments}
+        FROM (VALUES %s) AS v(id, user_id, mask, {', '.join(fields)})
+        WHERE t."Id" = v.id AND t."UserId" = v.user_id
+        RETURNING {returning}
+    """, values,
+        template='(%s::integer, %s::integer, %s::integer, %s::varchar, %s::varchar, %s::text, %s::varchar, %s::varchar, %s::varchar)',
+        page_size=len(values), fetch=True)
+    by_id = {row[0]: row for row in rows}
+    return {index: by_id.get(task_id) for index, (task_id, _) in items}
+
+def batch_delete_tasks(cursor, user_id, items):
+    """Delete tasks with one statement; returns {index: deleted id or None}"""
+    cursor.execute("""
+        DELETE FROM "Tasks" WHERE "UserId" = %s AND "Id" = ANY(%s)
+        RETURNING "Id"
+    """, (user_id, [task_id for _, task_id in items]))
+    deleted = {row[0] for row in cursor.fetchall()}
+    return {index: task_id if task_id in deleted else None for index, task_id in items}
+
+@app.route('/api/tasks/batch', methods=['POST'])
+@token_required
+def batch_tasks():
+    """Create, update and delete many tasks in one transaction
+    
+    Body: {"mode": "atomic" | "best_effort",
+           "operations": [{"op": "create", "task": {...}},
+                          {"op": "update", "id": 7, "task": {...partial...}},
+                          {"op": "delete", "id": 7}]}
+    
+    Operations are applied grouped by kind (creates, then updates, then deletes),
+    each group as a single statement. In atomic mode any failing item rolls back
+    the whole batch; in best_effort mode failing items are reported and the rest
+    are committed. Results are returned per item, in request order.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('operations'), list):
+        return jsonify({'message': 'Body must be an object with an operations list'}), 400
+    
+    mode = data.get('mode', 'atomic')
+    if mode not in ('atomic', 'best_effort'):
+        return jsonify({'message': 'mode must be atomic or best_effort'}), 400
+    
+    operations = data['operations']
+    if not operations:
+        return jsonify({'message': 'operations must not be empty'}), 400
+    if len(operations) > TASKS_BATCH_MAX:
+        return jsonify({'message': f'At most {TASKS_BATCH_MAX} operations per batch'}), 400
+    
+    user_id = request.user['userId']
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+    seen_ids = set()
+    
+    # Validate everything before touching the database
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        error = None
+        if op == 'create':
+            error = validate_task_fields(operation.get('task'), require_title=True)
+            if not error:
+                creates.append((index, operation['task']))
+        elif op in ('update', 'delete'):
+            task_id = operation.get('id')
+            if not isinstance(task_id, int) or isinstance(task_id, bool):
+                error = 'id must be an integer'
+            elif task_id in seen_ids:
+                error = 'task appears in more than one update/delete operation'
+            elif op == 'update':
+                task = operation.get('task')
+                error = validate_task_fields(task, require_title=False)
+                if not error and not any(field in task for field in TASK_UPDATABLE_FIELDS):
+                    error = f'task must contain at least one of: {", ".join(TASK_UPDATABLE_FIELDS)}'
+                if not error:
+                    updates.append((index, (task_id, task)))
+            else:
+                deletes.append((index, task_id))
+            if isinstance(task_id, int):
+                seen_ids.add(task_id)
+        else:
+            error = 'op must be create, update or delete'
+        if error:
+            results[index] = {'index': index, 'status': 400, 'error': error}
+    
+    if mode == 'atomic' and any(results):
+        for index, result in enumerate(results):
+            results[index] = result or {'index': index, 'status': 424, 'error': 'Not applied: batch rejected'}
+        return jsonify({'mode': mode, 'applied': False, 'results': results}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    try:
+        cursor = conn.cursor()
+        
+        def run_group(apply, items):
+            """Run one group; in best_effort mode isolate failures with savepoints"""
+            if not items:
+                return {}
+            if mode == 'atomic':
+                return apply(cursor, user_id, items)
+            try:
+                cursor.execute('SAVEPOINT batch_group')
+                outcome = apply(cursor, user_id, items)
+                cursor.execute('RELEASE SAVEPOINT batch_group')
+                return outcome
+            except psycopg2.Error:
+                cursor.execute('ROLLBACK TO SAVEPOINT batch_group')
+            # Retry item by item so one bad row doesn't sink the group
+            outcome = {}
+            for item in items:
+                try:
+                    cursor.execute('SAVEPOINT batch_item')
+                    outcome.update(apply(cursor, user_id, [item]))
+                    cursor.execute('RELEASE SAVEPOINT batch_item')
+                except psycopg2.Error as e:
+                    cursor.execute('ROLLBACK TO SAVEPOINT batch_item')
+                    results[item[0]] = {'index': item[0], 'status': 400, 'error': str(e).strip().split('\n')[0]}
+            return outcome
+        
+        for index, row in run_group(batch_create_tasks, creates).items():
+            results[index] = {'index': index, 'status': 201, 'task': dict(zip(TASK_FIELDS, task_row_values(row)))}
+        for index, row in run_group(batch_update_tasks, updates).items():
+            if row:
+                results[index] = {'index': index, 'status': 200, 'task': dict(zip(TASK_FIELDS, task_row_values(row)))}
+            else:
+                results[index] = {'index': index, 'status': 404, 'error': 'Task not found'}
+        for index, task_id in run_group(batch_delete_tasks, deletes).items():
+            if task_id:
+                results[index] = {'index': index, 'status': 200, 'id': str(task_id)}
+            else:
+                results[index] = {'index': index, 'status': 404, 'error': 'Task not found'}
+        
+        if mode == 'atomic' and any(result['status'] >= 400 for result in results):
+            conn.rollback()
+            for index, result in enumerate(results):
+                if result['status'] < 400:
+                    results[index] = {'index': index, 'status': 424, 'error': 'Not applied: batch rolled back'}
+            return jsonify({'mode': mode, 'applied': False, 'results': results}), 400
+        
+        conn.commit()
+        if any(result['status'] < 400 for result in results):
+            task_list_cache.invalidate(user_id)
+        
+        return jsonify({'mode': mode, 'applied': True, 'results': results}), 200
+        
+    except Exception as e:
+        print(f'Batch tasks error: {str(e)}')
+        conn.rollback()
+        return jsonify({'message': 'Server error applying batch; no changes were made'}), 500
+    finally:
+        return_db_connection(conn)
+
+# Bulk import settings for POST /api/tasks/import
+TASK_IMPORT_MAX_MB = float(os.getenv('TASK_IMPORT_MAX_MB', 512))
+# The largest body any route accepts; also enforced while reading chunked uploads (no Content-Length)
+app.config['MAX_CONTENT_LENGTH'] = int(TASK_IMPORT_MAX_MB * 1024 * 1024)
+TASK_IMPORT_MAX_ERRORS = 100  # per-line errors listed in the response
+TASK_IMPORT_MIMETYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+}
+
+def copy_import_tasks(cursor, user_id, records, atomic):
+    """COPY valid records into a staging table, then merge them into "Tasks" with one INSERT
+    
+    records: (line number, record or error message) pairs from read_task_records().
+    Returns (tasks imported, lines rejected, first TASK_IMPORT_MAX_ERRORS (line, error) pairs).
+    Nothing is merged when atomic and a line was rejected. Runs in the caller's transaction.
+    """
+    errors = []
+    rejected = 0
+    read_error = None
+    
+    def valid_rows():
+        nonlocal rejected, read_error
+        try:
+            for line_number, record in records:
+                error = record if isinstance(record, str) else validate_task_fields(record, require_title=True)
+                if not error and any('\x00' in value for value in record.values()):
+                    error = 'values must not contain NUL characters'
+                if error:
+                    rejected += 1
+                    if len(errors) < TASK_IMPORT_MAX_ERRORS:
+                        errors.append((line_number, error))
+                    continue
+                yield copy_row(line_number, record)
+        except (ImportFormatError, RequestEntityTooLarge) as e:
+            # psycopg2 would turn an exception inside COPY's read() into a generic COPY error
+            read_error = e
+    
+    cursor.execute("""
+        CREATE TEMP TABLE task_import (
+            "Line" INTEGER,
+            "TaskId" TEXT,
+            "Type" TEXT,
+            "Title" TEXT,
+            "Description" TEXT,
+            "Assignee" TEXT,
+            "Priority" TEXT,
+            "Status" TEXT
+        ) ON COMMIT DROP
+    """)
+    # The upload is parsed while COPY reads it; neither the file nor the rows are held in memory
+    cursor.copy_expert('COPY task_import FROM STDIN', CopyStream(valid_rows()))
+    if read_error:
+        raise read_error
+    if atomic and rejected:
+        return 0, rejected, errors
+    
+    # Skip the per-row version bump and NOTIFY triggers; done once below instead
+    cursor.execute("SELECT set_config('autoops.bulk_task_write', 'on', true)")
+    # Ids are drawn in line order so missing TaskIds can be stored as AUTO-<Id>.
+    # Rows are stamped with clock_timestamp(), not the transaction start: an upload
+    # that took longer than TASK_SYNC_SAFETY_WINDOW would otherwise commit rows
+    # already behind the sync tokens handed out meanwhile by /api/tasks/changes
+    cursor.execute("""
+        INSERT INTO "Tasks" ("Id", "UserId", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status",
+                             "CreatedAt", "UpdatedAt")
+        SELECT id, %s,
+               COALESCE(NULLIF("TaskId", ''), 'AUTO-' || CASE WHEN id >= 100 THEN id::text ELSE lpad(id::text, 3, '0') END),
+               COALESCE("Type", 'task'), "Title", COALESCE("Description", ''), COALESCE("Assignee", ''),
+               COALESCE("Priority", 'medium'), COALESCE("Status", 'todo'),
+               stamped, stamped
+        FROM (
+            SELECT nextval(pg_get_serial_sequence('"Tasks"', 'Id')) AS id, clock_timestamp()::timestamp AS stamped, staged.*
+            FROM (SELECT * FROM task_import ORDER BY "Line") AS staged
+        ) AS numbered
+    """, (user_id,))
+    imported = cursor.rowcount
+    cursor.execute("SELECT set_config('autoops.bulk_task_write', 'off', true)")
+    
+    if imported:
+        cursor.execute("""
+            INSERT INTO "CollectionVersions" ("Scope", "Version")
+            VALUES (%s, 1)
+            ON CONFLICT ("Scope") DO UPDATE SET "Version" = "CollectionVersions"."Version" + 1
+        """, (f'tasks:{user_id}',))
+        # One event for the whole import; clients reload their list
+        cursor.execute("""
+            SELECT pg_notify('task_changes', json_build_object(
+                'seq', nextval('"TaskEventSeq"'), 'op', 'import', 'id', NULL, 'userId', %s
+            )::text)
+        """, (user_id,))
+    return imported, rejected, errors
+
+def upload_too_large():
+    """413 for an upload over TASK_IMPORT_MAX_MB"""
+    return jsonify({'message': f'Upload must be at most {TASK_IMPORT_MAX_MB:g} MB'}), 413
+
+@app.route('/api/tasks/import', methods=['POST'])
+@token_required
+def import_tasks():
+    """Import tasks from a CSV or NDJSON upload
+    
+    Body: the file itself, or multipart/form-data with a "file" part.
+    Query parameters:
+        format: csv or ndjson (default: from the Content-Type or file name)
+        mode: atomic (default; any bad line imports nothing) or best_effort
+    
+    CSV needs a header row; both formats use the task JSON field names
+    (taskId, type, title, description, assignee, priority, status) and ignore
+    other fields, so an export can be imported again. Missing taskIds become
+    AUTO-<id>. Rejected lines are reported by line number.
+    """
+    mode = request.args.get('mode', 'atomic')
+    if mode not in ('atomic', 'best_effort'):
+        return jsonify({'message': 'mode must be atomic or best_effort'}), 400
+    
+    if request.content_length and request.content_length > TASK_IMPORT_MAX_MB * 1024 * 1024:
+        return upload_too_large()
+    
+    try:
+        upload = request.files.get('file')
+    except RequestEntityTooLarge:
+        return upload_too_large()
+    mimetype = upload.mimetype if upload else request.mimetype
+    import_format = request.args.get('format') or TASK_IMPORT_MIMETYPES.get(mimetype)
+    if not import_format and upload and upload.filename:
+        import_format = upload.filename.rsplit('.', 1)[-1].lower().replace('jsonl', 'ndjson')
+    if import_format not in ('csv', 'ndjson'):
+        return jsonify({'message': 'format must be csv or ndjson'}), 400
+    
+    user_id = request.user['userId']
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    try:
+        cursor = conn.cursor()
+        records = read_task_records(upload.stream if upload else request.stream, import_format)
+        imported, rejected, errors = copy_import_tasks(cursor, user_id, records, mode == 'atomic')
+        
+        result = {
+            'mode': mode,
+            'applied': not (mode == 'atomic' and rejected),
+            'imported': imported,
+            'rejected': rejected,
+            'errors': [{'line': line_number, 'error': error} for line_number, error in errors]
+        }
+        if not result['applied']:
+            conn.rollback()
+            return jsonify(result), 400
+        
+        conn.commit()
+        if imported:
+            task_list_cache.invalidate(user_id)
+        return jsonify(result), 200
+        
+    except ImportFormatError as e:
+        conn.rollback()
+        return jsonify({'message': str(e)}), 400
+    except RequestEntityTooLarge:
+        # A chunked upload ran past MAX_CONTENT_LENGTH while it was being read
+        conn.rollback()
+        return upload_too_large()
+    except Exception as e:
+        print(f'Import tasks error: {str(e)}')
+        conn.rollback()
+        return jsonify({'message': 'Server error importing tasks; no changes were made'}), 500
+    finally:
+        return_db_connection(conn)
+
+@app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+@token_required
+def delete_task(task_id):
+    """Delete a task"""
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'message': 'Database connection unavailable'}), 503
+    
+    try:
+        cursor = conn.cursor()
+        
+        # Ownership is enforced by the WHERE clause; no row back means not found
         cursor.execute("""
             DELETE FROM "Tasks" WHERE "Id" = %s AND "UserId" = %s
+            RETURNING "Id"
         """, (task_id, request.user['userId']))
         
+        deleted = cursor.fetchone()
         conn.commit()
         
+        if not deleted:
+            return jsonify({'message': 'Task not found'}), 404
+        
+        task_list_cache.invalidate(request.user['userId'])
+        
         return jsonify({'message': 'Task deleted successfully'}), 200
         
     except Exception as e:
@@ -867,7 +2353,109 @@ def serve_static(path):
     """Serve static files"""
     return send_from_directory('.', path)
 
+# Process lifecycle
+#
+# Importing this module starts nothing, so a pre-fork server (see gunicorn.conf.py)
+# can load it once in the master process. Every serving process then calls
+# init_app() itself: the dev server below, run.py, or gunicorn's post_fork hook.
+
+_initialized_pid = None
+_init_lock = threading.Lock()
+_schema_ready = False
+_schema_retry_at = 0.0
+_schema_lock = threading.Lock()
+SCHEMA_RETRY_INTERVAL = 5.0
+
+# Requests that must answer without touching the database
+SCHEMA_EXEMPT_PATHS = ('/api/health', '/api/metrics')
+
+def start_background_jobs():
+    """Start the threads that poll the database (email outbox, tombstone compaction)"""
+    email_outbox.start()
+    tombstone_compactor.start()
+
+def init_app(create_schema=None):
+    """Start this process's services: bcrypt workers, DB pool and background threads
+    
+    With DB_INIT_MODE=lazy nothing touches the database here; the first API
+    request migrates (see ensure_schema) and starts the background jobs.
+    create_schema defaults to DB_INIT_MODE == 'startup'.
+    """
+    global _initialized_pid, _schema_ready
+    
+    if create_schema is None:
+        create_schema = DB_INIT_MODE == 'startup'
+    
+    with _init_lock:
+        if _initialized_pid == os.getpid():
+            return
+        
+        # Start bcrypt worker processes before any background threads or DB sockets exist
+        try:
+            password_hasher.warmup()
+        except Exception as e:
+            print(f'[WARNING] Password hashing pool warmup failed: {str(e)}')
+        
+        if DB_INIT_MODE == 'startup':
+            try:
+                warmup_db_pool()
+                if create_schema:
+                    init_database()
+            except Exception as e:
+                print(f'[WARNING] Database initialization warning: {str(e)}')
+                print('[WARNING] Server will start but database features may be unavailable')
+        
+        if DB_INIT_MODE != 'lazy':
+            _schema_ready = True
+            start_background_jobs()
+        _initialized_pid = os.getpid()
+
+@app.before_request
+def ensure_schema():
+    """DB_INIT_MODE=lazy: apply pending migrations before the first API request"""
+    global _schema_ready, _schema_retry_at
+    
+    if _schema_ready or DB_INIT_MODE != 'lazy':
+        return
+    if not request.path.startswith('/api/') or request.path in SCHEMA_EXEMPT_PATHS:
+        return
+    
+    with _schema_lock:
+        if _schema_ready or time.monotonic() < _schema_retry_at:
+            return
+        if init_database():
+            _schema_ready = True
+            start_background_jobs()
+        else:
+            # Don't make every request wait on an unreachable database
+            _schema_retry_at = time.monotonic() + SCHEMA_RETRY_INTERVAL
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations and exit (for DB_INIT_MODE=off)"""
+    if not init_database():
+        raise SystemExit(1)
+
+def begin_drain():
+    """Start a graceful shutdown: end live task streams so clients reconnect elsewhere"""
+    if task_events:
+        task_events.stop()
+
+def shutdown_app():
+    """Stop background work and close connections held by this process"""
+    begin_drain()
+    email_outbox.stop()
+    tombstone_compactor.stop()
+    slow_query_log.stop()
+    password_hasher.shutdown(wait=False)
+    for transport in (brevo_api_transport, brevo_smtp_transport, gmail_smtp_transport):
+        transport.close()
+    close_db_pool()
+
 if __name__ == '__main__':
+    # Development server only; production runs gunicorn (see gunicorn.conf.py)
+    init_app()
+    
     # Get port from environment (Railway sets this automatically)
     port = int(os.getenv('PORT', PORT))
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
@@ -0,0 +1,382 @@
+"""
+AutoOps Task Board - Benchmarks
+
+Usage:
+    python benchmark.py http --url http://localhost:3001/api/health --concurrency 32 --duration 10
+    python benchmark.py startup --runs 5 [--save | --baseline startup-baseline.json]
+    python benchmark.py prepared --iterations 2000   (uses the database configured in .env)
+    python benchmark.py export --format ndjson [--user-id 42] [--max-peak-mb 32]   (same database)
+    python benchmark.py import --rows 1000000 [--max-seconds 60]   (same database, rolled back)
+"""
+import argparse
+import csv
+import http.client
+import io
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def http_worker(url, deadline, headers, latencies, errors, lock):
+    """Issue requests over one keep-alive connection until the deadline"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    conn = None
+    mine, failed = [], 0
+    while time.perf_counter() < deadline:
+        if conn is None:
+            conn = connection_class(parts.netloc, timeout=30)
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                failed += 1
+            else:
+                mine.append(time.perf_counter() - started)
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+    with lock:
+        latencies.extend(mine)
+        errors.append(failed)
+
+
+def run_http(args):
+    headers = {'Connection': 'keep-alive'}
+    if args.token:
+        headers['Authorization'] = f'Bearer {args.token}'
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    workers = [
+        threading.Thread(target=http_worker, args=(args.url, deadline, headers, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    ok = len(latencies)
+    print(f'{args.url}  concurrency={args.concurrency}  duration={elapsed:.1f}s')
+    print(f'  requests: {ok} ok, {sum(errors)} failed')
+    print(f'  throughput: {ok / elapsed:.1f} req/s')
+    if latencies:
+        print(f'  latency ms: mean {statistics.mean(latencies) * 1000:.1f}  '
+              f'p50 {percentile(latencies, 0.50) * 1000:.1f}  '
+              f'p99 {percentile(latencies, 0.99) * 1000:.1f}  '
+              f'max {max(latencies) * 1000:.1f}')
+    return 0 if ok else 1
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_import(module):
+    """Seconds for a fresh interpreter to import module, minus bare interpreter startup"""
+    def run(code):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return time.perf_counter() - started
+    return max(0.0, run(f'import {module}') - run('pass'))
+
+
+def time_first_health(command, timeout):
+    """Seconds from spawning the server until /api/health first answers 200"""
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), FLASK_DEBUG='false')
+    started = time.perf_counter()
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f'server exited with status {server.returncode}')
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            try:
+                conn.request('GET', '/api/health')
+                if conn.getresponse().status == 200:
+                    return time.perf_counter() - started
+            except OSError:
+                pass
+            finally:
+                conn.close()
+            time.sleep(0.01)
+        raise RuntimeError(f'no healthy response within {timeout}s')
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def run_startup(args):
+    command = args.command.split()
+    imports, healths = [], []
+    for _ in range(args.runs):
+        imports.append(time_import('app'))
+        healths.append(time_first_health(command, args.timeout))
+    result = {
+        'importSeconds': round(statistics.median(imports), 4),
+        'firstHealthSeconds': round(statistics.median(healths), 4)
+    }
+    print(f'startup ({args.runs} runs, median): import app {result["importSeconds"] * 1000:.0f} ms, '
+          f'first /api/health {result["firstHealthSeconds"] * 1000:.0f} ms  [{args.command}]')
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(result, f, indent=2)
+            f.write('\n')
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save to record one')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failed = False
+    for key, value in result.items():
+        limit = baseline[key] * (1 + args.tolerance)
+        status = 'OK' if value <= limit else 'REGRESSION'
+        failed = failed or value > limit
+        print(f'  {key}: {value:.3f}s vs baseline {baseline[key]:.3f}s (limit {limit:.3f}s) {status}')
+    return 1 if failed else 0
+
+
+def time_queries(conn, run, iterations):
+    """Per-call latencies of run(cursor), each call in its own transaction"""
+    cursor = conn.cursor()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run(cursor)
+        cursor.fetchall()
+        conn.rollback()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_prepared(args):
+    import app
+    from prepared_statements import PreparedStatements
+
+    conn = app.connect_database()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT "UserId" FROM "Tasks" GROUP BY "UserId" ORDER BY COUNT(*) DESC LIMIT 1')
+        row = cursor.fetchone()
+        conn.rollback()
+        if not row:
+            print('No tasks in the database; create some first')
+            return 1
+        user_id = row[0]
+
+        # The GET /api/tasks page query, first page, no filters
+        sql = """
+            SELECT "Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt"
+            FROM "Tasks"
+            WHERE "UserId" = %s
+            ORDER BY "CreatedAt" DESC, "Id" DESC
+            LIMIT %s
+        """
+        params = (user_id, args.limit + 1)
+        registry = PreparedStatements()
+
+        results = {}
+        for label, run in (('plain', lambda cursor: cursor.execute(sql, params)),
+                           ('prepared', lambda cursor: registry.execute(cursor, sql, params))):
+            time_queries(conn, run, min(args.iterations, 50))   # warm caches (and the prepared statement's plan)
+            results[label] = time_queries(conn, run, args.iterations)
+    finally:
+        conn.close()
+
+    print(f'GET /api/tasks page query, user {user_id}, limit {args.limit}, {args.iterations} iterations')
+    for label, timings in results.items():
+        print(f'  {label:<9} mean {statistics.mean(timings) * 1000:.3f} ms  '
+              f'p50 {percentile(timings, 0.50) * 1000:.3f} ms  p99 {percentile(timings, 0.99) * 1000:.3f} ms')
+    gain = 1 - statistics.mean(results['prepared']) / statistics.mean(results['plain'])
+    print(f'  prepared is {gain * 100:.1f}% faster per query')
+    return 0
+
+
+def measure_peak(run):
+    """(result, peak bytes allocated by Python while run() executes)"""
+    tracemalloc.start()
+    try:
+        result = run()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_export(args):
+    import app
+
+    conn = app.connect_database()
+    try:
+        def streamed():
+            lines = size = 0
+            for chunk in app.export_task_chunks(conn, args.user_id, args.format):
+                size += len(chunk.encode('utf-8'))
+                lines += chunk.count('\n')
+            return lines, size
+
+        def buffered():
+            # What a fetchall()-based export would hold in memory
+            where, params = ('WHERE "UserId" = %s', (args.user_id,)) if args.user_id else ('', ())
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT "Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt"
+                FROM "Tasks" {where}
+                ORDER BY "Id"
+            """, params)
+            body = ''.join(app.task_json(app.task_row_values(row)) + '\n' for row in cursor.fetchall())
+            conn.rollback()
+            return len(body)
+
+        started = time.perf_counter()
+        (lines, size), streamed_peak = measure_peak(streamed)
+        elapsed = time.perf_counter() - started
+        conn.rollback()
+        buffered_peak = None if args.skip_buffered else measure_peak(buffered)[1]
+    finally:
+        conn.close()
+
+    scope = f'user {args.user_id}' if args.user_id else 'all users'
+    print(f'export {args.format}, {scope}: {lines} lines, {size / 1048576:.1f} MiB in {elapsed:.2f}s '
+          f'({lines / elapsed if elapsed else 0:.0f} lines/s)')
+    print(f'  streamed peak memory: {streamed_peak / 1048576:.2f} MiB  (itersize {app.TASK_EXPORT_ITERSIZE})')
+    if buffered_peak is not None:
+        print(f'  fetchall peak memory: {buffered_peak / 1048576:.2f} MiB')
+    if args.max_peak_mb and streamed_peak > args.max_peak_mb * 1048576:
+        print(f'  REGRESSION: streamed peak above {args.max_peak_mb} MiB')
+        return 1
+    return 0
+
+
+def synthetic_import(rows, import_format):
+    """Byte lines of an upload with rows tasks, like read_task_records() gets from a request"""
+    from task_import import IMPORT_FIELDS
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if import_format == 'csv':
+        yield (','.join(IMPORT_FIELDS) + '\n').encode('utf-8')
+    for i in range(rows):
+        task = (f'IMP-{i}', 'task', f'Imported task {i}', 'Migrated from another tracker, ' * 3,
+                f'user{i % 50}', ('low', 'medium', 'high')[i % 3], ('todo', 'in-progress', 'done')[i % 3])
+        if import_format == 'csv':
+            writer.writerow(task)
+        else:
+            buffer.write(json.dumps(dict(zip(IMPORT_FIELDS, task))) + '\n')
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def run_import(args):
+    import app
+    from task_import import read_task_records
+
+    conn = app.connect_database()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT "Id" FROM "Users" ORDER BY "Id" LIMIT 1')
+        row = cursor.fetchone()
+        if not row:
+            print('No users in the database; register one first')
+            return 1
+
+        started = time.perf_counter()
+        records = read_task_records(synthetic_import(args.rows, args.format), args.format)
+        imported, rejected, _ = app.copy_import_tasks(cursor, row[0], records, atomic=True)
+        elapsed = time.perf_counter() - started
+    finally:
+        # Leave the database as it was
+        conn.rollback()
+        conn.close()
+
+    print(f'import {args.format}: {imported} tasks ({rejected} rejected) in {elapsed:.1f}s '
+          f'({imported / elapsed if elapsed else 0:.0f} tasks/s), rolled back')
+    if args.max_seconds and elapsed > args.max_seconds:
+        print(f'  REGRESSION: slower than {args.max_seconds:g}s')
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AutoOps Task Board benchmarks')
+    commands = parser.add_subparsers(dest='benchmark', required=True)
+
+    http_parser = commands.add_parser('http', help='concurrent keep-alive GET load against a running server')
+    http_parser.add_argument('--url', default='http://localhost:3001/api/health')
+    http_parser.add_argument('--concurrency', type=int, default=32)
+    http_parser.add_argument('--duration', type=float, default=10.0)
+    http_parser.add_argument('--token', help='JWT sent as a Bearer token')
+    http_parser.set_defaults(run=run_http)
+
+    startup_parser = commands.add_parser('startup', help='import time and time to first /api/health; fails on regression')
+    startup_parser.add_argument('--runs', type=int, default=5)
+    startup_parser.add_argument('--command', default=f'{sys.executable} app.py', help='server command line')
+    startup_parser.add_argument('--timeout', type=float, default=30.0)
+    startup_parser.add_argument('--baseline', default='startup-baseline.json')
+    startup_parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown, e.g. 0.25 = 25%%')
+    startup_parser.add_argument('--save', action='store_true', help='record the result as the new baseline')
+    startup_parser.set_defaults(run=run_startup)
+
+    prepared_parser = commands.add_parser('prepared', help='plain vs prepared latency of the task page query')
+    prepared_parser.add_argument('--iterations', type=int, default=2000)
+    prepared_parser.add_argument('--limit', type=int, default=100)
+    prepared_parser.set_defaults(run=run_prepared)
+
+    export_parser = commands.add_parser('export', help='peak memory of the streaming task export vs fetchall()')
+    export_parser.add_argument('--format', choices=('ndjson', 'csv'), default='ndjson')
+    export_parser.add_argument('--user-id', type=int, help='export one user (default: every user, like scope=all)')
+    export_parser.add_argument('--max-peak-mb', type=float, help='fail if the streamed peak exceeds this')
+    export_parser.add_argument('--skip-buffered', action='store_true', help="don't run the fetchall() comparison")
+    export_parser.set_defaults(run=run_export)
+
+    import_parser = commands.add_parser('import', help='COPY-based bulk task import throughput (rolled back)')
+    import_parser.add_argument('--rows', type=int, default=1000000)
+    import_parser.add_argument('--format', choices=('ndjson', 'csv'), default='ndjson')
+    import_parser.add_argument('--max-seconds', type=float, help='fail if the import takes longer than this')
+    import_parser.set_defaults(run=run_import)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
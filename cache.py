@@ -0,0 +1,251 @@
+"""
+AutoOps Task Board - In-Process Caches
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# Redis is optional; it lets several worker processes share cache invalidations
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class TokenCache:
+    """Bounded LRU cache of already-verified JWT claims
+
+    Entries are keyed by a SHA-256 digest of the token (the raw token is never
+    stored) and expire at the token's own exp claim.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # digest -> (claims, exp)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token):
+        """Claims of a previously verified, unexpired token, or None"""
+        if not self.maxsize:
+            return None
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, exp = entry
+                if exp > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token, claims):
+        """Remember the claims of a token that passed verification"""
+        exp = claims.get('exp')
+        if not self.maxsize or not isinstance(exp, (int, float)):
+            # Tokens without exp stay on the full verification path
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxSize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class LocalCacheBackend:
+    """In-memory stand-in for a shared backend (single process, tests)"""
+
+    def __init__(self):
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get_generation(self, key):
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def bump_generation(self, key):
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+
+class RedisCacheBackend:
+    """Generation counters in Redis, shared by every worker process"""
+
+    def __init__(self, url, prefix='autoops:'):
+        if not REDIS_AVAILABLE:
+            raise ImportError('redis library not installed. Please install it: pip install redis')
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.prefix = prefix
+
+    def get_generation(self, key):
+        value = self.client.get(self.prefix + key)
+        return int(value) if value else 0
+
+    def bump_generation(self, key):
+        self.client.incr(self.prefix + key)
+
+
+class TaskListCache:
+    """Per-user LRU cache of task list pages
+
+    Each page is stored as a tuple of pre-serialized task JSON strings followed
+    by strings such as the next-page cursor and ETag. Writes call invalidate(),
+    which drops every page of that user.
+
+    With a shared backend, each user also has a generation counter in the
+    backend; an invalidation in any process bumps it, and pages cached under an
+    older generation are ignored everywhere.
+
+    A page may also be stored with the collection version it was built from;
+    get() with a different version misses, so a missed invalidation (another
+    process, a write that bypassed invalidate()) can't keep serving old data.
+    """
+
+    def __init__(self, max_users=1000, max_bytes=64 * 1024 * 1024, backend=None, max_writes=10000):
+        """
+        max_writes: users whose last invalidation is remembered; a page begun
+        before the oldest forgotten invalidation is not cached
+        """
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.max_writes = max(max_writes, 1)
+        self._users = OrderedDict()   # user_id -> {query_key: (generation, page, size, version)}
+        self._user_bytes = {}
+        self._bytes = 0
+        self._epoch = 0
+        self._last_write = OrderedDict()   # user_id -> epoch of the last local invalidation, oldest first
+        self._write_floor = 0              # newest epoch dropped from _last_write
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _generation_key(user_id):
+        return f'tasks:gen:{user_id}'
+
+    @staticmethod
+    def _page_size(page):
+        rows = page[0]
+        size = 64 + sum(len(extra) for extra in page[1:] if isinstance(extra, str))
+        for row in rows:
+            if isinstance(row, str):
+                # Pre-serialized JSON object
+                size += 56 + len(row)
+            else:
+                size += 56 + 8 * len(row) + sum(len(value) for value in row if isinstance(value, str))
+        return size
+
+    def begin(self, user_id):
+        """Token to pass to get()/put() for one request, taken before querying the DB"""
+        shared = None
+        if self.backend is not None:
+            try:
+                shared = self.backend.get_generation(self._generation_key(user_id))
+            except Exception as e:
+                print(f'⚠️  Cache backend unavailable: {str(e)}')
+                return None
+        with self._lock:
+            return (self._epoch, shared)
+
+    def get(self, user_id, query_key, token, version=None):
+        """Cached page tuple, or None (also when it was built from another version)"""
+        if token is None or not self.max_users:
+            return None
+        with self._lock:
+            pages = self._users.get(user_id)
+            entry = pages.get(query_key) if pages else None
+            if entry is not None and entry[0] == token[1]:
+                if entry[3] == version:
+                    self._users.move_to_end(user_id)
+                    self.hits += 1
+                    return entry[1]
+                # Stale: the collection changed without an invalidate() reaching us
+                del pages[query_key]
+                self._bytes -= entry[2]
+                self._user_bytes[user_id] -= entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, user_id, query_key, page, token, version=None):
+        """Store a page unless the user's tasks changed since begin()"""
+        if token is None or not self.max_users:
+            return
+        size = self._page_size(page)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A user no longer in _last_write may have been written up to _write_floor
+            if self._last_write.get(user_id, self._write_floor) > token[0]:
+                return
+            pages = self._users.setdefault(user_id, {})
+            old = pages.get(query_key)
+            if old is not None:
+                self._bytes -= old[2]
+                self._user_bytes[user_id] -= old[2]
+            pages[query_key] = (token[1], page, size, version)
+            self._user_bytes[user_id] = self._user_bytes.get(user_id, 0) + size
+            self._bytes += size
+            self._users.move_to_end(user_id)
+            while self._users and (len(self._users) > self.max_users or self._bytes > self.max_bytes):
+                evicted, _ = self._users.popitem(last=False)
+                self._bytes -= self._user_bytes.pop(evicted)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        """Drop all cached pages of a user (call after committing a write)"""
+        with self._lock:
+            self._epoch += 1
+            self._last_write[user_id] = self._epoch
+            self._last_write.move_to_end(user_id)
+            while len(self._last_write) > self.max_writes:
+                _, self._write_floor = self._last_write.popitem(last=False)
+            if self._users.pop(user_id, None) is not None:
+                self._bytes -= self._user_bytes.pop(user_id)
+        if self.backend is not None:
+            try:
+                self.backend.bump_generation(self._generation_key(user_id))
+            except Exception as e:
+                print(f'⚠️  Cache backend unavailable, other workers may serve stale tasks: {str(e)}')
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'users': len(self._users),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'shared': self.backend is not None
+            }
@@ -0,0 +1,265 @@
+"""
+AutoOps Task Board - PostgreSQL Connection Pool
+
+Thread-safe replacement for psycopg2.pool.SimpleConnectionPool:
+- connections are checked before being handed out and recycled after a maximum age
+- callers wait (up to a timeout) for a free connection instead of failing immediately
+- in-use/idle/wait-time counters are available through stats()
+- timed_cursor_factory() reports per-query durations (e.g. to metrics)
+"""
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became available within the acquire timeout"""
+
+
+# Leading keywords reported as the operation of a timed query; anything else is "other"
+QUERY_OPERATIONS = frozenset(['select', 'insert', 'update', 'delete', 'with', 'execute', 'prepare', 'copy'])
+
+
+def query_operation(query):
+    """Lower-cased first keyword of a SQL string, e.g. 'select'"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    if not isinstance(query, str):
+        return 'other'
+    words = query[:64].split(None, 1)
+    operation = words[0].lower() if words else ''
+    return operation if operation in QUERY_OPERATIONS else 'other'
+
+
+def timed_cursor_factory(observe):
+    """cursor_factory for psycopg2.connect() reporting each query as observe(operation, seconds, query, vars)"""
+
+    class TimedCursor(extensions.cursor):
+        def execute(self, query, vars=None):
+            started = time.perf_counter()
+            try:
+                return super().execute(query, vars)
+            finally:
+                observe(query_operation(query), time.perf_counter() - started, query, vars)
+
+        def executemany(self, query, vars_list):
+            started = time.perf_counter()
+            try:
+                return super().executemany(query, vars_list)
+            finally:
+                observe(query_operation(query), time.perf_counter() - started, query, None)
+
+        def copy_expert(self, sql, file, size=8192):
+            started = time.perf_counter()
+            try:
+                return super().copy_expert(sql, file, size)
+            finally:
+                observe('copy', time.perf_counter() - started, sql, None)
+
+    return TimedCursor
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of PostgreSQL connections"""
+
+    def __init__(self, connect, minconn=1, maxconn=20, acquire_timeout=10.0,
+                 max_age=1800.0, ping_interval=10.0):
+        """
+        connect: callable returning a new psycopg2 connection
+        minconn: connections opened by warmup() and kept open
+        maxconn: hard limit on open connections
+        acquire_timeout: seconds getconn() waits when the pool is exhausted
+        max_age: seconds after which a connection is closed and replaced
+        ping_interval: connections idle longer than this are checked with SELECT 1
+        """
+        self._connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self.max_age = max_age
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()    # (conn, created_at, returned_at)
+        self._in_use = {}       # id(conn) -> created_at
+        self._opening = 0       # connections being opened outside the lock
+        self._checking = 0      # idle connections being health-checked outside the lock
+        self._closed = False
+
+        # Counters reported by stats()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+
+    def _open(self):
+        return self._connect(), time.monotonic()
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, created_at, returned_at, now):
+        """Check an idle connection before handing it out"""
+        if conn.closed:
+            return False
+        if self.max_age and now - created_at > self.max_age:
+            return False
+        if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if now - returned_at >= self.ping_interval:
+            try:
+                cursor = conn.cursor()
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+                cursor.close()
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def warmup(self):
+        """Open connections until minconn are available"""
+        while True:
+            with self._cond:
+                total = len(self._idle) + len(self._in_use) + self._opening + self._checking
+                if self._closed or total >= min(self.minconn, self.maxconn):
+                    return
+                self._opening += 1
+            try:
+                conn, created_at = self._open()
+            finally:
+                with self._cond:
+                    self._opening -= 1
+            with self._cond:
+                self._idle.append((conn, created_at, time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self, timeout=None):
+        """Check out a healthy connection, waiting up to timeout seconds"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            candidate = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError('connection pool is closed')
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        self._checking += 1
+                        break
+                    if len(self._in_use) + self._opening + self._checking < self.maxconn:
+                        self._opening += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f'no database connection available after {timeout:.1f}s '
+                            f'({len(self._in_use)} in use)')
+                    waited = True
+                    self._cond.wait(remaining)
+
+            # Until it is in _in_use (or discarded) the connection stays counted
+            # in _checking/_opening, so other threads can't exceed maxconn meanwhile
+            if candidate is not None:
+                conn, created_at, returned_at = candidate
+                try:
+                    healthy = self._is_healthy(conn, created_at, returned_at, time.monotonic())
+                except Exception:
+                    healthy = False
+                if not healthy:
+                    self._close_quietly(conn)
+                    with self._cond:
+                        self._checking -= 1
+                        self._discarded += 1
+                        self._cond.notify()
+                    continue
+            else:
+                try:
+                    conn, created_at = self._open()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+
+            wait_time = time.monotonic() - started
+            with self._cond:
+                if candidate is not None:
+                    self._checking -= 1
+                else:
+                    self._opening -= 1
+                self._in_use[id(conn)] = created_at
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                    self._wait_time += wait_time
+                    self._max_wait_time = max(self._max_wait_time, wait_time)
+            return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection; broken or expired connections are closed"""
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+        if created_at is None:
+            raise PoolError('trying to put unkeyed connection')
+
+        if not conn.closed and not close:
+            try:
+                # Never hand out a connection with an open transaction
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        expired = self.max_age and time.monotonic() - created_at > self.max_age
+        with self._cond:
+            if conn.closed or close or expired or self._closed:
+                self._discarded += 1
+                keep = False
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+                keep = True
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(conn)
+
+    def closeall(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        """Snapshot of pool counters"""
+        with self._cond:
+            return {
+                'inUse': len(self._in_use),
+                'idle': len(self._idle),
+                'opening': self._opening,
+                'checking': self._checking,
+                'max': self.maxconn,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'waitTimeTotal': round(self._wait_time, 6),
+                'waitTimeMax': round(self._max_wait_time, 6),
+                'timeouts': self._timeouts,
+                'discarded': self._discarded
+            }
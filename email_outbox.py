@@ -0,0 +1,183 @@
+"""
+AutoOps Task Board - Email Outbox
+
+Emails are written to the "EmailOutbox" table in the same transaction as the
+change that triggers them (e.g. the user insert in register()) and delivered
+by background worker threads, so request latency never depends on the mail
+provider. Failed deliveries are retried with exponential backoff.
+"""
+import random
+import threading
+
+
+def enqueue_email(cursor, kind, recipient, name):
+    """Queue an email using the caller's cursor (commits with the caller's transaction)"""
+    cursor.execute("""
+        INSERT INTO "EmailOutbox" ("Kind", "Recipient", "Name")
+        VALUES (%s, %s, %s)
+    """, (kind, recipient, name))
+
+
+class EmailOutbox:
+    """Pool of worker threads draining the "EmailOutbox" table"""
+
+    def __init__(self, get_connection, return_connection, senders, workers=2,
+                 poll_interval=5.0, batch_size=10, max_attempts=8,
+                 backoff_base=30.0, backoff_max=3600.0, lease=300.0):
+        """
+        get_connection/return_connection: pool checkout functions (get returns None when unavailable)
+        senders: dict of kind -> callable(list of (recipient, name)) returning a list of
+                 booleans, so each claimed batch is sent over one transport session
+        poll_interval: seconds between polls when not woken up by wake()
+        max_attempts: deliveries are marked failed after this many attempts
+        backoff_base/backoff_max: retry delay is backoff_base * 2^(attempt-1), capped at backoff_max
+        lease: seconds a claimed email stays invisible to other workers before being retried
+        """
+        self.get_connection = get_connection
+        self.return_connection = return_connection
+        self.senders = senders
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads"""
+        if self._threads:
+            return
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'email-outbox-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        """Stop the worker threads, letting in-flight deliveries finish"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        """Tell idle workers that new emails were committed"""
+        self._wakeup.set()
+
+    def backoff(self, attempts):
+        """Seconds to wait before the next delivery attempt"""
+        delay = min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+        # Jitter so a provider outage doesn't produce synchronized retry bursts
+        return delay * random.uniform(0.8, 1.2)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                processed = self.process_batch()
+            except Exception as e:
+                print(f'⚠️  Email outbox worker error: {str(e)}')
+                processed = 0
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self):
+        """Claim due emails; the DB connection is released before sending"""
+        conn = self.get_connection()
+        if not conn:
+            return []
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE "EmailOutbox"
+                SET "Status" = 'sending',
+                    "Attempts" = "Attempts" + 1,
+                    "NextAttemptAt" = CURRENT_TIMESTAMP + make_interval(secs => %s)
+                WHERE "Id" IN (
+                    SELECT "Id" FROM "EmailOutbox"
+                    WHERE "Status" IN ('pending', 'sending')
+                      AND "NextAttemptAt" <= CURRENT_TIMESTAMP
+                    ORDER BY "NextAttemptAt"
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING "Id", "Kind", "Recipient", "Name", "Attempts"
+            """, (self.lease, self.batch_size))
+            rows = cursor.fetchall()
+            conn.commit()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def _record(self, results):
+        """Mark claimed emails as sent, rescheduled or failed"""
+        conn = self.get_connection()
+        if not conn:
+            # Unrecorded emails become due again once their lease expires
+            return
+        try:
+            cursor = conn.cursor()
+            for outbox_id, attempts, error in results:
+                if error is None:
+                    cursor.execute("""
+                        UPDATE "EmailOutbox"
+                        SET "Status" = 'sent', "SentAt" = CURRENT_TIMESTAMP, "LastError" = NULL
+                        WHERE "Id" = %s
+                    """, (outbox_id,))
+                elif attempts >= self.max_attempts:
+                    cursor.execute("""
+                        UPDATE "EmailOutbox"
+                        SET "Status" = 'failed', "LastError" = %s
+                        WHERE "Id" = %s
+                    """, (error, outbox_id))
+                else:
+                    cursor.execute("""
+                        UPDATE "EmailOutbox"
+                        SET "Status" = 'pending', "LastError" = %s,
+                            "NextAttemptAt" = CURRENT_TIMESTAMP + make_interval(secs => %s)
+                        WHERE "Id" = %s
+                    """, (error, self.backoff(attempts), outbox_id))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def process_batch(self):
+        """Deliver one batch of due emails, returning how many were processed"""
+        rows = self._claim()
+        by_kind = {}
+        for row in rows:
+            by_kind.setdefault(row[1], []).append(row)
+        
+        results = []
+        for kind, kind_rows in by_kind.items():
+            sender = self.senders.get(kind)
+            if not sender:
+                error = f'No sender registered for email kind {kind!r}'
+                results.extend((row[0], self.max_attempts, error) for row in kind_rows)
+                continue
+            try:
+                sent = sender([(row[2], row[3]) for row in kind_rows])
+                errors = [None if ok else 'All email transports failed' for ok in sent]
+            except Exception as e:
+                errors = [str(e)] * len(kind_rows)
+            for (outbox_id, _, _, _, attempts), error in zip(kind_rows, errors):
+                results.append((outbox_id, attempts, error))
+        
+        for outbox_id, attempts, error in results:
+            if error:
+                print(f'⚠️  Email {outbox_id} failed (attempt {attempts}): {error}')
+        if results:
+            self._record(results)
+        return len(rows)
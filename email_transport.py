@@ -0,0 +1,289 @@
+"""
+AutoOps Task Board - Email Transports
+
+Reusable connections for outgoing email:
+- BrevoApiTransport keeps one keep-alive HTTPS session to the Brevo REST API and
+  sends batches as a single multi-version request
+- SmtpTransport keeps a small pool of authenticated SMTP connections and sends
+  whole batches over one session
+
+send_batch() returns a BatchResult with per-message outcomes and throughput.
+
+requests, smtplib and email.mime are imported on first use: most processes
+start, serve and exit without sending any email, and importing them roughly
+doubles the app's import time.
+"""
+import threading
+import time
+from collections import namedtuple
+
+OutgoingEmail = namedtuple('OutgoingEmail', ['recipient', 'name', 'subject', 'html'])
+
+
+class BatchResult:
+    """Outcome of a send_batch() call"""
+
+    def __init__(self, transport, results, elapsed):
+        self.transport = transport
+        self.results = results   # list of bool, one per message
+        self.elapsed = elapsed
+
+    @property
+    def sent(self):
+        return sum(1 for ok in self.results if ok)
+
+    @property
+    def failed(self):
+        return len(self.results) - self.sent
+
+    @property
+    def messages_per_second(self):
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f'<BatchResult {self.transport}: {self.sent} sent, {self.failed} failed, '
+                f'{self.messages_per_second:.1f} msg/s>')
+
+
+class EmailTransport:
+    """Base class; subclasses implement _send_batch()"""
+
+    name = 'email'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._failed = 0
+        self._busy_time = 0.0
+
+    def is_configured(self):
+        return True
+
+    def send(self, message):
+        """Send a single OutgoingEmail, returning True on success"""
+        return self.send_batch([message]).results[0]
+
+    def send_batch(self, messages):
+        """Send a list of OutgoingEmail over one session"""
+        started = time.perf_counter()
+        results = self._send_batch(messages) if messages else []
+        result = BatchResult(self.name, results, time.perf_counter() - started)
+        with self._lock:
+            self._sent += result.sent
+            self._failed += result.failed
+            self._busy_time += result.elapsed
+        if len(messages) > 1:
+            print(f'📨 {result.sent}/{len(messages)} emails sent via {self.name} '
+                  f'in {result.elapsed:.2f}s ({result.messages_per_second:.1f} msg/s)')
+        return result
+
+    def stats(self):
+        """Lifetime counters and throughput while sending"""
+        with self._lock:
+            return {
+                'sent': self._sent,
+                'failed': self._failed,
+                'messagesPerSecond': round(self._sent / self._busy_time, 2) if self._busy_time else 0.0
+            }
+
+    def close(self):
+        pass
+
+
+class BrevoApiTransport(EmailTransport):
+    """Brevo REST API over a persistent keep-alive session"""
+
+    name = 'Brevo API'
+
+    def __init__(self, api_key, api_url, sender_name, sender_email,
+                 max_batch=100, timeout=30.0, pool_size=4):
+        super().__init__()
+        self.api_key = api_key
+        self.api_url = api_url
+        self.sender_name = sender_name
+        self.sender_email = sender_email
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def is_configured(self):
+        return bool(self.api_key)
+
+    def _get_session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.headers.update({
+                        'accept': 'application/json',
+                        'api-key': self.api_key,
+                        'content-type': 'application/json'
+                    })
+                    self._session = session
+        return self._session
+
+    def _payload(self, messages):
+        first = messages[0]
+        payload = {
+            'sender': {
+                'name': self.sender_name,
+                'email': self.sender_email
+            },
+            'subject': first.subject,
+            'htmlContent': first.html
+        }
+        if len(messages) == 1:
+            payload['to'] = [{'email': first.recipient, 'name': first.name}]
+        else:
+            # One request, one personalised version per recipient
+            payload['messageVersions'] = [
+                {
+                    'to': [{'email': m.recipient, 'name': m.name}],
+                    'subject': m.subject,
+                    'htmlContent': m.html
+                }
+                for m in messages
+            ]
+        return payload
+
+    def _send_batch(self, messages):
+        if not self.api_key:
+            print('⚠️  Brevo API key not configured. Set BREVO_API_KEY in .env file')
+            return [False] * len(messages)
+
+        results = []
+        session = self._get_session()
+        for start in range(0, len(messages), self.max_batch):
+            chunk = messages[start:start + self.max_batch]
+            try:
+                response = session.post(self.api_url, json=self._payload(chunk), timeout=self.timeout)
+                if response.status_code == 201:
+                    results.extend([True] * len(chunk))
+                    continue
+                print(f'⚠️  Email API response: {response.status_code} - {response.text}')
+            except Exception as e:
+                print(f'❌ Error sending email via API: {str(e)}')
+            results.extend([False] * len(chunk))
+        return results
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class SmtpTransport(EmailTransport):
+    """SMTP with a small pool of authenticated connections reused across messages"""
+
+    def __init__(self, name, host, port, username, password, sender_name, sender_email,
+                 pool_size=2, idle_timeout=60.0, timeout=30.0):
+        super().__init__()
+        self.name = name
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender_name = sender_name
+        self.sender_email = sender_email
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle = []   # (smtp, last_used)
+        self._idle_lock = threading.Lock()
+
+    def is_configured(self):
+        return bool(self.username and self.password)
+
+    def _connect(self):
+        import smtplib
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            self._quit(server)
+            raise
+        return server
+
+    def _quit(self, server):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self):
+        now = time.monotonic()
+        with self._idle_lock:
+            while self._idle:
+                server, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout:
+                    return server
+                # Servers drop idle sessions; don't bother probing old ones
+                self._quit(server)
+        return self._connect()
+
+    def _checkin(self, server):
+        with self._idle_lock:
+            self._idle.append((server, time.monotonic()))
+
+    def _build(self, message):
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = message.subject
+        msg['From'] = f'{self.sender_name} <{self.sender_email}>'
+        msg['To'] = message.recipient
+        msg.attach(MIMEText(message.html, 'html'))
+        return msg
+
+    def _send_batch(self, messages):
+        import smtplib
+        if not self.is_configured():
+            print(f'⚠️  {self.name} credentials not configured. Check SMTP settings in .env file')
+            return [False] * len(messages)
+
+        results = []
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._checkout()
+            for message in messages:
+                msg = self._build(message)
+                try:
+                    try:
+                        server.send_message(msg)
+                    except (smtplib.SMTPServerDisconnected, ConnectionError):
+                        # Pooled session went stale: reconnect once and retry
+                        self._quit(server)
+                        server = None
+                        server = self._connect()
+                        server.send_message(msg)
+                    results.append(True)
+                except smtplib.SMTPRecipientsRefused as e:
+                    print(f'❌ {self.name} refused {message.recipient}: {str(e)}')
+                    results.append(False)
+                except Exception as e:
+                    print(f'❌ Error sending email via {self.name}: {str(e)}')
+                    results.append(False)
+                    if server is None:
+                        break
+        except Exception as e:
+            print(f'❌ Error connecting to {self.name}: {str(e)}')
+        finally:
+            if server is not None:
+                self._checkin(server)
+            self._slots.release()
+        results.extend([False] * (len(messages) - len(results)))
+        return results
+
+    def close(self):
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._quit(server)
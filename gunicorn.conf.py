@@ -0,0 +1,100 @@
+"""
+AutoOps Task Board - Production Server Configuration
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+
+Worker processes run threaded (gthread) workers so a request waiting on
+PostgreSQL, bcrypt or an SSE client doesn't hold a whole process. Each worker
+builds its own DB pool, bcrypt pool and background threads after fork; nothing
+with sockets or threads is inherited from the master.
+"""
+import os
+import secrets
+import signal
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '3001')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 32))
+
+# Every open board holds a thread for the life of its task stream (SSE); cap the
+# streams so GUNICORN_REQUEST_THREADS per worker always remain for other requests
+request_threads = int(os.getenv('GUNICORN_REQUEST_THREADS', 8))
+stream_limit = max(threads - request_threads, 0)
+configured_streams = os.getenv('TASK_STREAM_MAX_CLIENTS')
+if configured_streams is None or int(configured_streams) > stream_limit:
+    if configured_streams is not None:
+        print(f'[WARNING] TASK_STREAM_MAX_CLIENTS lowered to {stream_limit} '
+              '(GUNICORN_THREADS - GUNICORN_REQUEST_THREADS)')
+    os.environ['TASK_STREAM_MAX_CLIENTS'] = str(stream_limit)
+
+# Keep-alive must outlast the load balancer's idle timeout (Railway/most proxies: 60s+)
+# or the proxy will reuse sockets the worker already closed
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 75))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 25))
+
+# Recycle workers periodically to cap slow memory growth; jitter avoids restarting all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+# Importing app in the master once makes worker boot fast and shares read-only pages
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Tokens signed by one worker must verify in every other worker
+if not os.getenv('JWT_SECRET'):
+    os.environ['JWT_SECRET'] = secrets.token_urlsafe(32)
+    print('⚠️  WARNING: JWT_SECRET not set. Generated a temporary secret shared by all workers.')
+    print('⚠️  Sessions will not survive a restart; set JWT_SECRET in production.')
+
+# The in-process task list cache can't see writes made by other workers; this
+# overrides TASK_CACHE_MAX_USERS from .env, where a copied template may have set it
+if workers > 1 and not os.getenv('CACHE_REDIS_URL') and os.getenv('TASK_CACHE_MAX_USERS') != '0':
+    os.environ['TASK_CACHE_MAX_USERS'] = '0'
+    print('[WARNING] Task list cache disabled: several workers and no CACHE_REDIS_URL')
+
+
+def on_starting(server):
+    """DB_INIT_MODE=startup: migrate once in the master, before any worker exists"""
+    if not preload_app:
+        # Without preload the master never imports the app; each worker migrates itself
+        return
+    import app
+    if app.DB_INIT_MODE != 'startup':
+        return
+    try:
+        app.init_database()
+    except Exception as e:
+        print(f'[WARNING] Database initialization warning: {str(e)}')
+    finally:
+        # Workers must not inherit the master's sockets
+        app.close_db_pool()
+
+
+def post_fork(server, worker):
+    import app
+    app.init_app(create_schema=False if preload_app else None)
+
+
+def post_worker_init(worker):
+    """Close SSE streams as soon as SIGTERM arrives so the drain isn't held up by them"""
+    import app
+    handle_exit = worker.handle_exit
+
+    def drain(sig, frame):
+        app.begin_drain()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, drain)
+
+
+def worker_exit(server, worker):
+    import app
+    app.shutdown_app()
@@ -0,0 +1,35 @@
+"""
+AutoOps Task Board - Scheduled Maintenance Jobs
+"""
+import threading
+
+
+class PeriodicJob:
+    """Run a function every interval seconds on a daemon thread"""
+
+    def __init__(self, name, interval, job):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or not self.interval:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.job()
+            except Exception as e:
+                print(f'⚠️  {self.name} failed: {str(e)}')
@@ -0,0 +1,201 @@
+"""
+AutoOps Task Board - Metrics
+
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format (GET /api/metrics). Each thread records into its own shard, a plain
+dict no other thread writes to, so recording never takes a lock; a scrape sums
+the shards. Shards of finished threads are folded into one retired shard so
+per-request threads (the development server) don't accumulate.
+
+Values are per process: with several gunicorn workers each scrape sees the
+worker that answered it, identified by the pid label of process_start_time_seconds.
+"""
+import bisect
+import os
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labelnames):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+
+class Counter(_Metric):
+    """Monotonic count per label combination"""
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(Counter):
+    """Value that goes up and down (e.g. requests in flight), summed over threads"""
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (seconds) over fixed buckets"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket (not cumulative) counts, the +Inf overflow, then the sum
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+
+class _Callback(_Metric):
+    """Samples read from fn() at scrape time: a number, or (label values, number) pairs"""
+
+    def __init__(self, registry, name, help, labelnames, kind, fn):
+        super().__init__(registry, name, help, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+
+class MetricsRegistry:
+    """All metrics of one process"""
+
+    def __init__(self, prefix='autoops_'):
+        self.prefix = prefix
+        self._metrics = []
+        self._local = threading.local()
+        self._shards = []        # (thread, shard)
+        self._retired = {}       # merged shards of finished threads
+        self._lock = threading.Lock()   # taken on a thread's first recording and by scrapes
+        self._started = time.time()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _register(self, metric):
+        metric.name = self.prefix + metric.name
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(self, name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(self, name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, help, labelnames, buckets))
+
+    def callback(self, name, help, fn, labelnames=(), kind='gauge'):
+        """Metric whose samples come from fn() when scraped (e.g. pool or cache stats)"""
+        return self._register(_Callback(self, name, help, labelnames, kind, fn))
+
+    @staticmethod
+    def _merge(into, shard):
+        for key, value in shard.items():
+            if isinstance(value, list):
+                total = into.get(key)
+                if total is None:
+                    into[key] = list(value)
+                else:
+                    for i, item in enumerate(value):
+                        total[i] += item
+            else:
+                into[key] = into.get(key, 0) + value
+
+    def _collect(self):
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    # The thread can no longer write, so its shard can be merged for good
+                    self._merge(self._retired, shard)
+            self._shards = live
+            totals = {}
+            self._merge(totals, self._retired)
+        for _, shard in live:
+            # dict.copy() is atomic under the GIL; the owning thread may keep writing
+            self._merge(totals, shard.copy())
+        return totals
+
+    def render(self):
+        """Every metric in the Prometheus text format (version 0.0.4)"""
+        totals = self._collect()
+        by_metric = {}
+        for (name, labels), value in totals.items():
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines = [
+            f'# HELP {self.prefix}process_start_time_seconds Start time of this worker process (Unix time)',
+            f'# TYPE {self.prefix}process_start_time_seconds gauge',
+            f'{self.prefix}process_start_time_seconds{{pid="{os.getpid()}"}} {_format_value(self._started)}'
+        ]
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            if isinstance(metric, _Callback):
+                try:
+                    samples = metric.fn()
+                except Exception as e:
+                    print(f'⚠️  Metric {metric.name} unavailable: {str(e)}')
+                    continue
+                if isinstance(samples, (int, float)):
+                    samples = [((), samples)]
+                for labels, value in samples:
+                    lines.append(f'{metric.name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}')
+                continue
+            for labels, value in sorted(by_metric.get(metric.name, ()), key=lambda sample: sample[0]):
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float('inf'),), value):
+                        cumulative += count
+                        label_text = _format_labels(metric.labelnames + ('le',), labels + (_format_value(float(bound)),))
+                        lines.append(f'{metric.name}_bucket{label_text} {cumulative}')
+                    label_text = _format_labels(metric.labelnames, labels)
+                    lines.append(f'{metric.name}_sum{label_text} {_format_value(value[-1])}')
+                    lines.append(f'{metric.name}_count{label_text} {cumulative}')
+                else:
+                    lines.append(f'{metric.name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
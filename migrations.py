@@ -0,0 +1,461 @@
+"""
+AutoOps Task Board - Schema Migrations
+
+Each migration is a numbered list of SQL statements. The versions applied to a
+database are recorded in "SchemaMigrations"; migrate() applies the missing ones
+in order, in one transaction, while holding an advisory lock so only one
+process migrates at a time. When the schema is already current it costs a
+single SELECT and takes no locks on application tables.
+
+Never edit a migration that has been deployed; append a new one.
+"""
+from collections import namedtuple
+
+from psycopg2 import errors
+
+Migration = namedtuple('Migration', ['version', 'name', 'statements'])
+
+MIGRATIONS = [
+    # Everything init_database() used to create on each startup; idempotent so it
+    # also applies cleanly to databases created before migrations existed
+    Migration(1, 'baseline', [
+        # Create Users table
+        """
+            CREATE TABLE IF NOT EXISTS "Users" (
+                "Id" SERIAL PRIMARY KEY,
+                "Username" VARCHAR(50) NOT NULL UNIQUE,
+                "Email" VARCHAR(100) NOT NULL UNIQUE,
+                "Password" VARCHAR(255) NOT NULL,
+                "FullName" VARCHAR(100),
+                "CreatedAt" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                "LastLogin" TIMESTAMP
+            )
+        """,
+
+        # Create indexes for Users
+        'CREATE INDEX IF NOT EXISTS "IX_Users_Username" ON "Users"("Username")',
+        'CREATE INDEX IF NOT EXISTS "IX_Users_Email" ON "Users"("Email")',
+
+        # Create Tasks table
+        """
+            CREATE TABLE IF NOT EXISTS "Tasks" (
+                "Id" SERIAL PRIMARY KEY,
+                "UserId" INTEGER NOT NULL,
+                "TaskId" VARCHAR(50),
+                "Type" VARCHAR(20) DEFAULT 'task',
+                "Title" VARCHAR(200) NOT NULL,
+                "Description" TEXT,
+                "Assignee" VARCHAR(100),
+                "Priority" VARCHAR(20) DEFAULT 'medium',
+                "Status" VARCHAR(20) DEFAULT 'todo',
+                "CreatedAt" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                "UpdatedAt" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY ("UserId") REFERENCES "Users"("Id") ON DELETE CASCADE
+            )
+        """,
+
+        # Create indexes for Tasks
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId" ON "Tasks"("UserId")',
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_Status" ON "Tasks"("Status")',
+
+        # Composite indexes for keyset pagination of GET /api/tasks (one per filter)
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId_CreatedAt" ON "Tasks"("UserId", "CreatedAt" DESC, "Id" DESC)',
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId_Status_CreatedAt" ON "Tasks"("UserId", "Status", "CreatedAt" DESC, "Id" DESC)',
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId_Priority_CreatedAt" ON "Tasks"("UserId", "Priority", "CreatedAt" DESC, "Id" DESC)',
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId_Type_CreatedAt" ON "Tasks"("UserId", "Type", "CreatedAt" DESC, "Id" DESC)',
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId_Assignee_CreatedAt" ON "Tasks"("UserId", "Assignee", "CreatedAt" DESC, "Id" DESC)',
+
+        # Create function to update UpdatedAt timestamp
+        """
+            CREATE OR REPLACE FUNCTION update_updated_at_column()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                NEW."UpdatedAt" = CURRENT_TIMESTAMP;
+                RETURN NEW;
+            END;
+            $$ language 'plpgsql'
+        """,
+
+        # Create trigger to auto-update UpdatedAt
+        """
+            DROP TRIGGER IF EXISTS update_tasks_updated_at ON "Tasks";
+            CREATE TRIGGER update_tasks_updated_at
+                BEFORE UPDATE ON "Tasks"
+                FOR EACH ROW
+                EXECUTE FUNCTION update_updated_at_column()
+        """,
+
+        # Add Type column if it doesn't exist (for existing tables)
+        """
+            DO $$ 
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                              WHERE table_name='Tasks' AND column_name='Type') THEN
+                    ALTER TABLE "Tasks" ADD COLUMN "Type" VARCHAR(20) DEFAULT 'task';
+                END IF;
+            END $$;
+        """,
+
+        # Add TaskId column if it doesn't exist
+        """
+            DO $$ 
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                              WHERE table_name='Tasks' AND column_name='TaskId') THEN
+                    ALTER TABLE "Tasks" ADD COLUMN "TaskId" VARCHAR(50);
+                END IF;
+            END $$;
+        """,
+
+        # Create CollectionVersions table (bumped by triggers, used for ETags)
+        """
+            CREATE TABLE IF NOT EXISTS "CollectionVersions" (
+                "Scope" VARCHAR(50) PRIMARY KEY,
+                "Version" BIGINT NOT NULL DEFAULT 0
+            )
+        """,
+
+        # Bump the owner's task collection version on every task write
+        """
+            CREATE OR REPLACE FUNCTION bump_tasks_version()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                owner_id INTEGER;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    owner_id := OLD."UserId";
+                ELSE
+                    owner_id := NEW."UserId";
+                END IF;
+                INSERT INTO "CollectionVersions" ("Scope", "Version")
+                VALUES ('tasks:' || owner_id, 1)
+                ON CONFLICT ("Scope") DO UPDATE SET "Version" = "CollectionVersions"."Version" + 1;
+                RETURN NULL;
+            END;
+            $$ language 'plpgsql'
+        """,
+        """
+            DROP TRIGGER IF EXISTS bump_tasks_version ON "Tasks";
+            CREATE TRIGGER bump_tasks_version
+                AFTER INSERT OR UPDATE OR DELETE ON "Tasks"
+                FOR EACH ROW
+                EXECUTE FUNCTION bump_tasks_version()
+        """,
+
+        # Bump the users collection version when a listed field changes (not on LastLogin)
+        """
+            CREATE OR REPLACE FUNCTION bump_users_version()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                INSERT INTO "CollectionVersions" ("Scope", "Version")
+                VALUES ('users', 1)
+                ON CONFLICT ("Scope") DO UPDATE SET "Version" = "CollectionVersions"."Version" + 1;
+                RETURN NULL;
+            END;
+            $$ language 'plpgsql'
+        """,
+        """
+            DROP TRIGGER IF EXISTS bump_users_version ON "Users";
+            CREATE TRIGGER bump_users_version
+                AFTER INSERT OR DELETE OR UPDATE OF "Username", "Email", "FullName" ON "Users"
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION bump_users_version()
+        """,
+
+        # Publish task changes for GET /api/tasks/stream (sequence numbers become SSE event ids)
+        'CREATE SEQUENCE IF NOT EXISTS "TaskEventSeq"',
+        """
+            CREATE OR REPLACE FUNCTION notify_task_change()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                rec RECORD;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    rec := OLD;
+                ELSE
+                    rec := NEW;
+                END IF;
+                PERFORM pg_notify('task_changes', json_build_object(
+                    'seq', nextval('"TaskEventSeq"'),
+                    'op', lower(TG_OP),
+                    'id', rec."Id",
+                    'userId', rec."UserId"
+                )::text);
+                RETURN NULL;
+            END;
+            $$ language 'plpgsql'
+        """,
+        """
+            DROP TRIGGER IF EXISTS notify_task_change ON "Tasks";
+            CREATE TRIGGER notify_task_change
+                AFTER INSERT OR UPDATE OR DELETE ON "Tasks"
+                FOR EACH ROW
+                EXECUTE FUNCTION notify_task_change()
+        """,
+
+        # Delta sync (GET /api/tasks/changes): changed tasks by UpdatedAt, deletions as tombstones
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId_UpdatedAt" ON "Tasks"("UserId", "UpdatedAt", "Id")',
+        """
+            CREATE TABLE IF NOT EXISTS "TaskTombstones" (
+                "TaskId" INTEGER NOT NULL,
+                "UserId" INTEGER NOT NULL,
+                "DeletedAt" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+        'CREATE INDEX IF NOT EXISTS "IX_TaskTombstones_UserId_DeletedAt" ON "TaskTombstones"("UserId", "DeletedAt")',
+        'CREATE INDEX IF NOT EXISTS "IX_TaskTombstones_DeletedAt" ON "TaskTombstones"("DeletedAt")',
+        """
+            CREATE OR REPLACE FUNCTION record_task_tombstone()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                INSERT INTO "TaskTombstones" ("TaskId", "UserId") VALUES (OLD."Id", OLD."UserId");
+                RETURN NULL;
+            END;
+            $$ language 'plpgsql'
+        """,
+        """
+            DROP TRIGGER IF EXISTS record_task_tombstone ON "Tasks";
+            CREATE TRIGGER record_task_tombstone
+                AFTER DELETE ON "Tasks"
+                FOR EACH ROW
+                EXECUTE FUNCTION record_task_tombstone()
+        """,
+
+        # Create EmailOutbox table (emails queued in the same transaction as the change that sends them)
+        """
+            CREATE TABLE IF NOT EXISTS "EmailOutbox" (
+                "Id" SERIAL PRIMARY KEY,
+                "Kind" VARCHAR(50) NOT NULL,
+                "Recipient" VARCHAR(100) NOT NULL,
+                "Name" VARCHAR(100),
+                "Status" VARCHAR(20) NOT NULL DEFAULT 'pending',
+                "Attempts" INTEGER NOT NULL DEFAULT 0,
+                "LastError" TEXT,
+                "NextAttemptAt" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                "CreatedAt" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                "SentAt" TIMESTAMP
+            )
+        """,
+        """
+            CREATE INDEX IF NOT EXISTS "IX_EmailOutbox_Due" ON "EmailOutbox"("NextAttemptAt")
+            WHERE "Status" IN ('pending', 'sending')
+        """,
+    ]),
+    # Full-text search (GET /api/tasks/search); PostgreSQL keeps the weighted document current
+    Migration(2, 'task_search', [
+        """
+            ALTER TABLE "Tasks" ADD COLUMN IF NOT EXISTS "SearchVector" tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce("TaskId", '')), 'A') ||
+                setweight(to_tsvector('english', coalesce("Title", '')), 'A') ||
+                setweight(to_tsvector('english', coalesce("Description", '')), 'B')
+            ) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_SearchVector" ON "Tasks" USING GIN ("SearchVector")',
+    ]),
+    # Board summary (GET /api/tasks/summary): per-user counters kept by statement triggers,
+    # plus a covering index so the GROUPING SETS fallback is an index-only scan
+    Migration(3, 'task_summary', [
+        """
+            CREATE TABLE IF NOT EXISTS "TaskCounts" (
+                "UserId" INTEGER NOT NULL,
+                "Dimension" VARCHAR(20) NOT NULL,
+                "Value" VARCHAR(100) NOT NULL,
+                "Count" INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ("UserId", "Dimension", "Value")
+            )
+        """,
+        # Values are normalized the way the API serializes tasks (NULL status reads as 'todo', ...)
+        """
+            CREATE OR REPLACE FUNCTION apply_task_counts()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                changes TEXT;
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    changes := 'SELECT "UserId", "Status", "Priority", "Type", "Assignee", 1 AS delta FROM new_rows';
+                ELSIF TG_OP = 'DELETE' THEN
+                    changes := 'SELECT "UserId", "Status", "Priority", "Type", "Assignee", -1 AS delta FROM old_rows';
+                ELSE
+                    changes := 'SELECT "UserId", "Status", "Priority", "Type", "Assignee", 1 AS delta FROM new_rows
+                                UNION ALL
+                                SELECT "UserId", "Status", "Priority", "Type", "Assignee", -1 AS delta FROM old_rows';
+                END IF;
+                -- Updates that don't move a task between groups net to zero and touch no counter;
+                -- ORDER BY gives concurrent writers the same row lock order
+                EXECUTE format($sql$
+                    INSERT INTO "TaskCounts" ("UserId", "Dimension", "Value", "Count")
+                    SELECT c."UserId", d.dimension, d.value, SUM(c.delta)
+                    FROM (%s) c
+                    CROSS JOIN LATERAL (VALUES
+                        ('total', ''),
+                        ('status', COALESCE(NULLIF(c."Status", ''), 'todo')),
+                        ('priority', COALESCE(NULLIF(c."Priority", ''), 'medium')),
+                        ('type', COALESCE(NULLIF(c."Type", ''), 'task')),
+                        ('assignee', COALESCE(c."Assignee", ''))
+                    ) AS d(dimension, value)
+                    GROUP BY c."UserId", d.dimension, d.value
+                    HAVING SUM(c.delta) <> 0
+                    ORDER BY c."UserId", d.dimension, d.value
+                    ON CONFLICT ("UserId", "Dimension", "Value")
+                    DO UPDATE SET "Count" = "TaskCounts"."Count" + EXCLUDED."Count"
+                $sql$, changes);
+                RETURN NULL;
+            END;
+            $$ language 'plpgsql'
+        """,
+        # Transition tables need one trigger per event
+        """
+            DROP TRIGGER IF EXISTS task_counts_insert ON "Tasks";
+            CREATE TRIGGER task_counts_insert
+                AFTER INSERT ON "Tasks"
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION apply_task_counts()
+        """,
+        """
+            DROP TRIGGER IF EXISTS task_counts_update ON "Tasks";
+            CREATE TRIGGER task_counts_update
+                AFTER UPDATE ON "Tasks"
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION apply_task_counts()
+        """,
+        """
+            DROP TRIGGER IF EXISTS task_counts_delete ON "Tasks";
+            CREATE TRIGGER task_counts_delete
+                AFTER DELETE ON "Tasks"
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION apply_task_counts()
+        """,
+        # Backfill after the triggers exist: CREATE TRIGGER holds off writers until commit
+        'DELETE FROM "TaskCounts"',
+        """
+            INSERT INTO "TaskCounts" ("UserId", "Dimension", "Value", "Count")
+            SELECT t."UserId", d.dimension, d.value, COUNT(*)
+            FROM "Tasks" t
+            CROSS JOIN LATERAL (VALUES
+                ('total', ''),
+                ('status', COALESCE(NULLIF(t."Status", ''), 'todo')),
+                ('priority', COALESCE(NULLIF(t."Priority", ''), 'medium')),
+                ('type', COALESCE(NULLIF(t."Type", ''), 'task')),
+                ('assignee', COALESCE(t."Assignee", ''))
+            ) AS d(dimension, value)
+            GROUP BY t."UserId", d.dimension, d.value
+        """,
+        # Same leading key as the old single-column index, plus the grouped columns
+        'DROP INDEX IF EXISTS "IX_Tasks_UserId"',
+        'CREATE INDEX IF NOT EXISTS "IX_Tasks_UserId_Summary" ON "Tasks"("UserId") INCLUDE ("Status", "Priority", "Type", "Assignee")',
+    ]),
+    # User directory: stored initials, keyset pagination and trigram typeahead (GET /api/users/suggest)
+    Migration(4, 'user_directory', [
+        # Initial of the first two words of FullName (or Username), like the old Python loop
+        r"""
+            ALTER TABLE "Users" ADD COLUMN IF NOT EXISTS "Initials" VARCHAR(2)
+            GENERATED ALWAYS AS (
+                COALESCE(NULLIF(
+                    upper(left((regexp_split_to_array(btrim(COALESCE(NULLIF("FullName", ''), "Username")), '\s+'))[1], 1)) ||
+                    upper(COALESCE(left((regexp_split_to_array(btrim(COALESCE(NULLIF("FullName", ''), "Username")), '\s+'))[2], 1), '')),
+                ''), '?')
+            ) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS "IX_Users_CreatedAt" ON "Users"("CreatedAt" DESC, "Id" DESC)',
+        # pg_trgm is a trusted extension (PostgreSQL 13+): the database owner can create it
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        """
+            CREATE INDEX IF NOT EXISTS "IX_Users_Search_Trgm" ON "Users"
+            USING GIN ((lower("Username" || ' ' || COALESCE("FullName", ''))) gin_trgm_ops)
+        """,
+    ]),
+    # Bulk writes (POST /api/tasks/import) set autoops.bulk_task_write = 'on' for their
+    # transaction and bump the version / notify once themselves instead of once per row
+    Migration(5, 'bulk_task_writes', [
+        """
+            DROP TRIGGER IF EXISTS bump_tasks_version ON "Tasks";
+            CREATE TRIGGER bump_tasks_version
+                AFTER INSERT OR UPDATE OR DELETE ON "Tasks"
+                FOR EACH ROW
+                WHEN (current_setting('autoops.bulk_task_write', true) IS DISTINCT FROM 'on')
+                EXECUTE FUNCTION bump_tasks_version()
+        """,
+        """
+            DROP TRIGGER IF EXISTS notify_task_change ON "Tasks";
+            CREATE TRIGGER notify_task_change
+                AFTER INSERT OR UPDATE OR DELETE ON "Tasks"
+                FOR EACH ROW
+                WHEN (current_setting('autoops.bulk_task_write', true) IS DISTINCT FROM 'on')
+                EXECUTE FUNCTION notify_task_change()
+        """,
+    ]),
+    # btrim() in migration 4 only trimmed spaces, so a name starting with a tab or
+    # newline got no first initial. A generated column's expression can't be altered
+    # (before PostgreSQL 17), so it is recreated; "Users" is small and rewritten once
+    Migration(6, 'user_initials_whitespace', [
+        'ALTER TABLE "Users" DROP COLUMN IF EXISTS "Initials"',
+        r"""
+            ALTER TABLE "Users" ADD COLUMN "Initials" VARCHAR(2)
+            GENERATED ALWAYS AS (
+                COALESCE(NULLIF(
+                    upper(left((regexp_split_to_array(btrim(COALESCE(NULLIF("FullName", ''), "Username"), E' \t\n\r\f\x0b'), '\s+'))[1], 1)) ||
+                    upper(COALESCE(left((regexp_split_to_array(btrim(COALESCE(NULLIF("FullName", ''), "Username"), E' \t\n\r\f\x0b'), '\s+'))[2], 1), '')),
+                ''), '?')
+            ) STORED
+        """,
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+MIGRATION_LOCK_KEY = 'autoops_schema_migrations'
+
+
+def current_version(conn):
+    """Highest applied migration version, or 0 if the database was never migrated"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT COALESCE(MAX("Version"), 0) FROM "SchemaMigrations"')
+        return cursor.fetchone()[0]
+    except errors.UndefinedTable:
+        return 0
+    finally:
+        conn.rollback()
+
+
+def migrate(conn, lock_timeout='5s'):
+    """Apply pending migrations and return their versions (empty if the schema is current)
+
+    lock_timeout bounds how long each DDL statement waits for its table lock, so a
+    migration stuck behind a long transaction fails instead of blocking traffic.
+    """
+    if current_version(conn) >= SCHEMA_VERSION:
+        return []
+
+    cursor = conn.cursor()
+    try:
+        # Other processes wait here, then find the schema current
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', (MIGRATION_LOCK_KEY,))
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS "SchemaMigrations" (
+                "Version" INTEGER PRIMARY KEY,
+                "Name" VARCHAR(100) NOT NULL,
+                "AppliedAt" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute('SELECT "Version" FROM "SchemaMigrations"')
+        done = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT set_config('lock_timeout', %s, true)", (lock_timeout,))
+
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version in done:
+                continue
+            for statement in migration.statements:
+                cursor.execute(statement)
+            cursor.execute('INSERT INTO "SchemaMigrations" ("Version", "Name") VALUES (%s, %s)',
+                           (migration.version, migration.name))
+            applied.append(migration.version)
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
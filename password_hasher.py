@@ -0,0 +1,153 @@
+"""
+AutoOps Task Board - Password Hashing
+
+bcrypt work runs in a dedicated, size-bounded process pool so login/registration
+bursts can't monopolise the request threads. At most max_pending operations may
+be queued or running; beyond that PasswordHasherBusy is raised immediately so the
+caller can shed load instead of queueing indefinitely.
+"""
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or an operation timed out"""
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def _noop():
+    return None
+
+
+def get_hash_rounds(hashed):
+    """Cost factor of a bcrypt hash such as $2b$12$..., or None if unrecognised"""
+    try:
+        return int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """bcrypt hashing/verification on a bounded process pool"""
+
+    def __init__(self, workers=2, max_pending=32, rounds=12, timeout=10.0, observer=None):
+        """
+        workers: worker processes (0 runs bcrypt on the calling thread)
+        max_pending: operations allowed to be queued or running at once
+        rounds: bcrypt cost factor for new hashes
+        timeout: seconds to wait for a queued operation before giving up
+        observer: optional callable(operation, outcome, seconds) called after each
+                  hash/verify; outcome is 'ok', 'busy' (queue full), 'timeout' or
+                  'broken' (a worker process died)
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.timeout = timeout
+        self.observer = observer
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _discard_executor(self, broken):
+        """Drop a broken pool so the next call starts a new one (unless another thread already did)"""
+        with self._executor_lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        """(executor, future) for fn(*args)"""
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died; replace the pool and try once more
+            self._discard_executor(executor)
+            executor = self._get_executor()
+            return executor, executor.submit(fn, *args)
+
+    def warmup(self):
+        """Start the worker processes now rather than on the first login"""
+        if self.workers:
+            self._get_executor().submit(_noop).result()
+
+    def _observe(self, operation, outcome, started):
+        if self.observer is not None:
+            self.observer(operation, outcome, time.perf_counter() - started)
+
+    def _run(self, operation, fn, *args):
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            self._observe(operation, 'busy', started)
+            raise PasswordHasherBusy('password hashing queue is full')
+        if not self.workers:
+            try:
+                result = fn(*args)
+            finally:
+                self._slots.release()
+            self._observe(operation, 'ok', started)
+            return result
+
+        try:
+            executor, future = self._submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._observe(operation, 'broken', started)
+            raise PasswordHasherBusy('password hashing workers unavailable')
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the work finishes (or is cancelled), not until this
+        # caller stops waiting: cancel() can't stop a bcrypt call that already started
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._observe(operation, 'timeout', started)
+            raise PasswordHasherBusy(f'password hashing took longer than {self.timeout}s')
+        except BrokenProcessPool:
+            # A worker died mid-operation; the next call gets a new pool
+            self._discard_executor(executor)
+            self._observe(operation, 'broken', started)
+            raise PasswordHasherBusy('password hashing worker died')
+        self._observe(operation, 'ok', started)
+        return result
+
+    def hash(self, password):
+        """Hash a password with the configured cost factor"""
+        return self._run('hash', _hashpw, password.encode('utf-8'), self.rounds)
+
+    def verify(self, password, hashed):
+        """Check a password against a stored bcrypt hash"""
+        return self._run('verify', _checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        """True if a stored hash was created with a different cost factor"""
+        return get_hash_rounds(hashed) != self.rounds
+
+    def shutdown(self, wait=True):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,130 @@
+"""
+AutoOps Task Board - Prepared Statements
+
+Hot queries go through PreparedStatements.execute(cursor, sql, params) instead
+of cursor.execute(). The first time a connection sees a query it sends
+PREPARE; after that only EXECUTE and the parameter values cross the wire, and
+PostgreSQL skips parsing and (once it settles on a generic plan) planning.
+
+Which statements each connection has prepared is tracked per connection
+object, so connections opened by the pool after a reconnect or recycle simply
+prepare again. Statements the server lost (e.g. behind a pooler that resets
+sessions) are re-prepared and retried when that is safe.
+
+SQL-level prepared statements belong to a server session, so they can't be
+used behind PgBouncer in transaction or statement pooling mode; create the
+registry with enabled=False there and every call is a plain execute.
+"""
+import hashlib
+import re
+import threading
+import weakref
+
+from psycopg2 import errors, extensions
+
+_PLACEHOLDER = re.compile(r'%s')
+
+
+class PreparedStatements:
+    """Registry of prepared queries, prepared lazily on each pooled connection"""
+
+    def __init__(self, enabled=True, max_statements=200):
+        """
+        enabled: False runs every query as plain SQL (PgBouncer transaction mode)
+        max_statements: distinct queries that may be prepared; later ones run as plain SQL
+        """
+        self.enabled = enabled
+        self.max_statements = max_statements
+        self._statements = {}   # sql -> (name, PREPARE statement, EXECUTE template), or None
+        self._sources = {}      # name -> sql
+        self._prepared = weakref.WeakKeyDictionary()   # connection -> set of names
+        self._lock = threading.Lock()
+        self.prepares = 0
+        self.executions = 0
+
+    def _statement(self, sql):
+        if sql in self._statements:
+            return self._statements[sql]
+        with self._lock:
+            if sql in self._statements:
+                return self._statements[sql]
+            if len(self._statements) >= self.max_statements:
+                return None
+            if '%%' in sql or '%(' in sql:
+                statement = None
+            else:
+                name = 'autoops_' + hashlib.sha1(sql.encode('utf-8')).hexdigest()[:16]
+                count = len(_PLACEHOLDER.findall(sql))
+                numbers = iter(range(1, count + 1))
+                prepare = f'PREPARE {name} AS ' + _PLACEHOLDER.sub(lambda _: f'${next(numbers)}', sql)
+                execute = f'EXECUTE {name} ({", ".join(["%s"] * count)})' if count else f'EXECUTE {name}'
+                statement = (name, prepare, execute)
+                self._sources[name] = sql
+            self._statements[sql] = statement
+            return statement
+
+    def _names(self, conn):
+        with self._lock:
+            names = self._prepared.get(conn)
+            if names is None:
+                names = self._prepared[conn] = set()
+            return names
+
+    def execute(self, cursor, sql, params=()):
+        """cursor.execute(sql, params), using a prepared statement on this connection"""
+        statement = self._statement(sql) if self.enabled else None
+        if statement is None:
+            cursor.execute(sql, params)
+            return
+
+        name, prepare, execute = statement
+        conn = cursor.connection
+        names = self._names(conn)
+        # Recovering from a lost statement means rolling back, which is only
+        # harmless if this statement would have started the transaction
+        can_retry = conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        try:
+            if name not in names:
+                try:
+                    cursor.execute(prepare)
+                except (errors.IndeterminateDatatype, errors.AmbiguousParameter):
+                    # PostgreSQL can't infer a parameter type here; run this query unprepared from now on
+                    with self._lock:
+                        self._statements[sql] = None
+                    if not can_retry:
+                        raise
+                    conn.rollback()
+                    cursor.execute(sql, params)
+                    return
+                names.add(name)
+                self.prepares += 1
+            cursor.execute(execute, params)
+            self.executions += 1
+        except (errors.InvalidSqlStatementName, errors.DuplicatePreparedStatement,
+                errors.FeatureNotSupported):
+            # The server lost the statement, already had it, or its result type
+            # changed after a migration ("cached plan must not change result type")
+            names.clear()
+            if not can_retry:
+                raise
+            conn.rollback()
+            cursor.execute('DEALLOCATE ALL')
+            cursor.execute(prepare)
+            names.add(name)
+            self.prepares += 1
+            cursor.execute(execute, params)
+            self.executions += 1
+
+    def source(self, query):
+        """The original SQL of an EXECUTE issued by this registry, else None"""
+        if isinstance(query, str) and query.startswith('EXECUTE autoops_'):
+            return self._sources.get(query[8:].split(' ', 1)[0])
+        return None
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'statements': len(self._statements),
+            'prepares': self.prepares,
+            'executions': self.executions
+        }
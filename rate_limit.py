@@ -0,0 +1,120 @@
+"""
+AutoOps Task Board - Rate Limiting
+
+Token buckets keyed by client IP or username. Each key may make `burst`
+requests at once and then `rate` per second; a refused request is told how
+long to wait. Buckets live in process memory unless a shared backend (Redis)
+is configured, in which case every worker process draws from the same bucket.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Redis is optional; it lets several worker processes share buckets
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class RedisRateLimitBackend:
+    """Token buckets in Redis, updated atomically by a Lua script using the Redis clock"""
+
+    SCRIPT = """
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+        local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local tokens, at = tonumber(state[1]), tonumber(state[2])
+        if tokens == nil then
+            tokens, at = burst, now
+        end
+        tokens = math.min(burst, tokens + math.max(0, now - at) * rate)
+        local wait = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+        else
+            wait = (1 - tokens) / rate
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'at', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+        return tostring(wait)
+    """
+
+    def __init__(self, url, prefix='autoops:ratelimit:'):
+        if not REDIS_AVAILABLE:
+            raise ImportError('redis library not installed. Please install it: pip install redis')
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.prefix = prefix
+        self._take = self.client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst):
+        """Seconds to wait before key may proceed (0.0 = allowed, token taken)"""
+        return float(self._take(keys=[self.prefix + key], args=[rate, burst]))
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets: burst requests at once, then rate per second"""
+
+    def __init__(self, rate, burst, max_keys=100000, backend=None):
+        """
+        rate: tokens added per second (0 disables the limiter)
+        burst: bucket size
+        max_keys: buckets kept in memory; the least recently used are dropped (refilled)
+        backend: shared backend with take(key, rate, burst), e.g. RedisRateLimitBackend
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_keys = max_keys
+        self.backend = backend
+        self._buckets = OrderedDict()   # key -> (tokens, monotonic time of last update)
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, key):
+        """Seconds to wait before key may proceed; 0.0 means allowed (and counted)"""
+        if not self.rate:
+            return 0.0
+        wait = None
+        if self.backend is not None:
+            try:
+                wait = self.backend.take(key, self.rate, self.burst)
+            except Exception as e:
+                # Fall back to this process's buckets rather than failing open or closed
+                print(f'⚠️  Rate limit backend unavailable: {str(e)}')
+        if wait is None:
+            wait = self._take_local(key)
+        with self._lock:
+            if wait > 0:
+                self.limited += 1
+            else:
+                self.allowed += 1
+        return wait
+
+    def _take_local(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - at) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ratePerMinute': round(self.rate * 60, 2),
+                'burst': self.burst,
+                'keys': len(self._buckets),
+                'allowed': self.allowed,
+                'limited': self.limited,
+                'shared': self.backend is not None
+            }
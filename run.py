@@ -1,8 +1,14 @@
 """
-Run script for AutoOps Task Board
+Run script for AutoOps Task Board (development server)
 """
-from app import app
+import os
 
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=3001, debug=True)
+from app import app, init_app
 
+if __name__ == '__main__':
+    init_app()
+    app.run(
+        host='0.0.0.0',
+        port=int(os.getenv('PORT', 3001)),
+        debug=os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    )
@@ -9,6 +9,7 @@ document.addEventListener('DOMContentLoaded', () => {
     loadTeamMembers();
     setupEventListeners();
     renderTasks();
+    subscribeToTaskChanges();
 });
 
 // Check if user is authenticated
@@ -53,10 +54,10 @@ function getAuthHeaders() {
     };
 }
 
-// Load team members from API
+// Load team members from API (only the avatars shown; X-Total-Count gives the rest)
 async function loadTeamMembers() {
     try {
-        const response = await fetch(`${API_URL}/users`, {
+        const response = await fetch(`${API_URL}/users?limit=3`, {
             headers: getAuthHeaders()
         });
         
@@ -72,14 +73,15 @@ async function loadTeamMembers() {
         }
         
         const users = await response.json();
-        renderTeamMembers(users);
+        const total = parseInt(response.headers.get('X-Total-Count'), 10);
+        renderTeamMembers(users, Number.isNaN(total) ? users.length : total);
     } catch (error) {
         console.error('Error loading team members:', error);
     }
 }
 
 // Render team members in header
-function renderTeamMembers(users) {
+function renderTeamMembers(users, total) {
     const teamAvatarsContainer = document.querySelector('.team-avatars');
     if (!teamAvatarsContainer) return;
     
@@ -88,7 +90,7 @@ function renderTeamMembers(users) {
     
     // Show first 3 users
     const displayUsers = users.slice(0, 3);
-    const remainingCount = users.length - 3;
+    const remainingCount = total - displayUsers.length;
     
     displayUsers.forEach(user => {
         const avatar = document.createElement('div');
@@ -117,34 +119,185 @@ function renderTeamMembers(users) {
     }
 }
 
-// Load tasks from database
+// Suggest assignees while typing (server-side typeahead)
+let assigneeTimer = null;
+function setupAssigneeSuggestions() {
+    const input = document.getElementById('taskAssignee');
+    const list = document.getElementById('assigneeSuggestions');
+    if (!input || !list) return;
+    
+    input.addEventListener('input', () => {
+        clearTimeout(assigneeTimer);
+        const query = input.value.trim();
+        if (!query) return;
+        assigneeTimer = setTimeout(async () => {
+            try {
+                const response = await fetch(`${API_URL}/users/suggest?q=${encodeURIComponent(query)}`, {
+                    headers: getAuthHeaders()
+                });
+                if (!response.ok) return;
+                const users = await response.json();
+                list.innerHTML = '';
+                users.forEach(user => {
+                    const option = document.createElement('option');
+                    option.value = user.fullName || user.username;
+                    option.label = user.username;
+                    list.appendChild(option);
+                });
+            } catch (error) {
+                console.error('Error loading assignee suggestions:', error);
+            }
+        }, 200);
+    });
+}
+
+// Tasks are loaded a page at a time; "Load more" follows the X-Next-Cursor header
+let nextTaskCursor = null;
+let loadedTaskPages = 0;
+
+// One page of tasks, or null after redirecting to the login page
+async function fetchTaskPage(cursor) {
+    const url = cursor
+        ? `${API_URL}/tasks?cursor=${encodeURIComponent(cursor)}`
+        : `${API_URL}/tasks`;
+    const response = await fetch(url, {
+        headers: getAuthHeaders()
+    });
+    
+    if (response.status === 401 || response.status === 403) {
+        localStorage.removeItem('authToken');
+        localStorage.removeItem('userId');
+        localStorage.removeItem('username');
+        window.location.href = 'login.html';
+        return null;
+    }
+    
+    if (!response.ok) {
+        throw new Error('Failed to load tasks');
+    }
+    
+    return { tasks: await response.json(), cursor: response.headers.get('X-Next-Cursor') };
+}
+
+// Load tasks from database: the first page, or on a reload as many pages as were shown
 async function loadTasks() {
     try {
-        const response = await fetch(`${API_URL}/tasks`, {
+        const loadedTasks = [];
+        const pages = Math.max(loadedTaskPages, 1);
+        let cursor = null;
+        let count = 0;
+        
+        do {
+            const page = await fetchTaskPage(cursor);
+            if (!page) return;
+            loadedTasks.push(...page.tasks);
+            cursor = page.cursor;
+            count++;
+        } while (cursor && count < pages);
+        
+        tasks = loadedTasks;
+        nextTaskCursor = cursor;
+        loadedTaskPages = count;
+        renderTasks();
+    } catch (error) {
+        console.error('Error loading tasks:', error);
+        tasks = [];
+        nextTaskCursor = null;
+        renderTasks();
+    }
+}
+
+async function loadMoreTasks() {
+    if (!nextTaskCursor) return;
+    const button = document.getElementById('loadMoreBtn');
+    button.disabled = true;
+    try {
+        const page = await fetchTaskPage(nextTaskCursor);
+        if (!page) return;
+        // A reload (live update) may have fetched these tasks meanwhile
+        const shown = new Set(tasks.map(task => task.id));
+        tasks.push(...page.tasks.filter(task => !shown.has(task.id)));
+        nextTaskCursor = page.cursor;
+        loadedTaskPages++;
+        renderTasks();
+    } catch (error) {
+        console.error('Error loading more tasks:', error);
+    } finally {
+        button.disabled = false;
+    }
+}
+
+// Server-side full-text search; an empty query shows the whole board again
+let searchQuery = '';
+let searchTimer = null;
+
+function refreshTasks() {
+    return searchQuery ? searchTasks(searchQuery) : loadTasks();
+}
+
+async function searchTasks(query) {
+    try {
+        const response = await fetch(`${API_URL}/tasks/search?q=${encodeURIComponent(query)}&limit=100`, {
             headers: getAuthHeaders()
         });
         
-        if (response.status === 401 || response.status === 403) {
-            localStorage.removeItem('authToken');
-            localStorage.removeItem('userId');
-            localStorage.removeItem('username');
-            window.location.href = 'login.html';
-            return;
-        }
-        
         if (!response.ok) {
-            throw new Error('Failed to load tasks');
+            throw new Error('Failed to search tasks');
         }
         
-        tasks = await response.json();
+        const results = await response.json();
+        // Ignore responses to queries the user has already typed past
+        if (query !== searchQuery) return;
+        tasks = results;
         renderTasks();
     } catch (error) {
-        console.error('Error loading tasks:', error);
-        tasks = [];
-        renderTasks();
+        console.error('Error searching tasks:', error);
     }
 }
 
+// Reload the board when tasks change elsewhere (Server-Sent Events)
+let reloadTimer = null;
+let lastTaskEventId = null;
+async function subscribeToTaskChanges() {
+    if (!localStorage.getItem('authToken') || !window.EventSource) return;
+    
+    let token;
+    try {
+        // EventSource can't send headers and URLs end up in logs, so the stream
+        // gets a short-lived token of its own instead of the login token
+        const response = await fetch(`${API_URL}/tasks/stream/token`, {
+            method: 'POST',
+            headers: getAuthHeaders()
+        });
+        if (!response.ok) return;
+        token = (await response.json()).token;
+    } catch (error) {
+        console.error('Error opening task stream:', error);
+        setTimeout(subscribeToTaskChanges, 15000);
+        return;
+    }
+    
+    const resume = lastTaskEventId ? `&lastEventId=${encodeURIComponent(lastTaskEventId)}` : '';
+    const source = new EventSource(`${API_URL}/tasks/stream?token=${encodeURIComponent(token)}${resume}`);
+    const scheduleReload = () => {
+        // Coalesce bursts of changes into one reload
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(refreshTasks, 250);
+    };
+    source.addEventListener('task', (event) => {
+        lastTaskEventId = event.lastEventId;
+        scheduleReload();
+    });
+    source.addEventListener('reset', scheduleReload);
+    source.addEventListener('error', () => {
+        // EventSource retries by itself, but with the same token; once that has
+        // expired (or the server is full) it gives up and we start over
+        if (source.readyState === EventSource.CLOSED) {
+            setTimeout(subscribeToTaskChanges, 15000);
+        }
+    });
+}
+
 // Setup event listeners
 function setupEventListeners() {
     const modal = document.getElementById('taskModal');
@@ -157,6 +310,18 @@ function setupEventListeners() {
     closeBtn.addEventListener('click', () => closeModal());
     cancelBtn.addEventListener('click', () => closeModal());
     taskForm.addEventListener('submit', handleFormSubmit);
+    setupAssigneeSuggestions();
+    
+    const searchInput = document.getElementById('searchInput');
+    if (searchInput) {
+        searchInput.addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                searchQuery = searchInput.value.trim();
+                refreshTasks();
+            }, 250);
+        });
+    }
 
     // Close modal when clicking outside
     window.addEventListener('click', (e) => {
@@ -259,7 +424,7 @@ async function handleFormSubmit(e) {
             }
         }
         
-        await loadTasks();
+        await refreshTasks();
         closeModal();
     } catch (error) {
         console.error('Error saving task:', error);
@@ -296,7 +461,7 @@ async function deleteTask(taskId) {
             throw new Error('Failed to delete task');
         }
         
-        await loadTasks();
+        await refreshTasks();
     } catch (error) {
         console.error('Error deleting task:', error);
         alert('Failed to delete task. Please try again.');
@@ -338,6 +503,12 @@ function renderTasks() {
             countElement.textContent = taskList.length;
         }
     });
+    
+    // Search results aren't paged by cursor
+    const loadMore = document.getElementById('loadMore');
+    if (loadMore) {
+        loadMore.style.display = nextTaskCursor && !searchQuery ? 'block' : 'none';
+    }
 }
 
 // Create task card element
@@ -447,26 +618,19 @@ async function handleDrop(e) {
         if (task && task.status !== newStatus) {
             try {
                 const response = await fetch(`${API_URL}/tasks/${taskId}`, {
-                    method: 'PUT',
+                    method: 'PATCH',
                     headers: getAuthHeaders(),
-                    body: JSON.stringify({
-                        type: task.type,
-                        title: task.title,
-                        description: task.description,
-                        assignee: task.assignee,
-                        priority: task.priority,
-                        status: newStatus
-                    })
+                    body: JSON.stringify({ status: newStatus })
                 });
                 
                 if (!response.ok) {
                     throw new Error('Failed to update task status');
                 }
                 
-                await loadTasks();
+                await refreshTasks();
             } catch (error) {
                 console.error('Error updating task status:', error);
-                await loadTasks(); // Reload to show correct state
+                await refreshTasks(); // Reload to show correct state
             }
         }
     }
@@ -0,0 +1,243 @@
+"""
+AutoOps Task Board - Slow Query Log
+
+Every statement run through the app's cursors is recorded here with its
+duration and the shape of its parameters (types and lengths, never values).
+Statements are grouped by their normalized SQL so the slowest can be listed.
+
+A statement slower than the threshold is logged, and a background thread
+captures its plan on a dedicated connection: EXPLAIN (ANALYZE, BUFFERS) for
+reads, plain EXPLAIN for anything that could change data (EXPLAIN ANALYZE
+would run the write again). At most one plan per statement per explain_interval.
+
+Plans must not contain parameter values either, so the statement is prepared
+with $n placeholders and explained under plan_cache_mode = force_generic_plan:
+conditions then read "$1" instead of the value (PostgreSQL 12+). Values
+written into the SQL text itself are part of the query and show up as such.
+"""
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+# Statements whose execution has side effects only get a plain EXPLAIN
+_SIDE_EFFECTS = re.compile(
+    r'\b(insert|update|delete|merge|nextval|setval|pg_notify|pg_\w*advisory\w*|set_config|for\s+(no\s+key\s+)?update|for\s+(key\s+)?share)\b',
+    re.IGNORECASE)
+_EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete')
+_PLACEHOLDER = re.compile(r'%\((\w+)\)s|%s|%%')
+
+
+def generic_statement(query, params):
+    """(query with psycopg2 placeholders rewritten to $1, $2, ..., their values in order)"""
+    if params is None:
+        # psycopg2 only interpolates when parameters are given
+        return query, []
+    values = []
+    numbers = {}
+
+    def number(match):
+        if match.group(0) == '%%':
+            return '%'
+        name = match.group(1)
+        if name is None:
+            values.append(params[len(values)])
+            return f'${len(values)}'
+        if name not in numbers:
+            values.append(params[name])
+            numbers[name] = len(values)
+        return f'${numbers[name]}'
+
+    return _PLACEHOLDER.sub(number, query), values
+
+
+def parameter_shape(params):
+    """Types (and lengths) of query parameters, e.g. 'int, str[12], list[40]'"""
+    if params is None:
+        return ''
+    if isinstance(params, dict):
+        return ', '.join(f'{name}={_value_shape(value)}' for name, value in params.items())
+    return ', '.join(_value_shape(value) for value in params)
+
+
+def _value_shape(value):
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f'{type(value).__name__}[{len(value)}]'
+    return type(value).__name__
+
+
+class QueryStats:
+    """Aggregate timings of one normalized statement"""
+
+    __slots__ = ('sql', 'calls', 'total', 'max', 'slow_calls', 'shape', 'plan', 'explained_at')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow_calls = 0
+        self.shape = ''
+        self.plan = None
+        self.explained_at = None
+
+    def to_dict(self):
+        return {
+            'query': self.sql,
+            'calls': self.calls,
+            'totalMs': round(self.total * 1000, 3),
+            'meanMs': round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            'maxMs': round(self.max * 1000, 3),
+            'slowCalls': self.slow_calls,
+            'parameters': self.shape,
+            'plan': self.plan,
+            'explainedAt': datetime.fromtimestamp(self.explained_at, timezone.utc).isoformat() if self.explained_at else None
+        }
+
+
+class SlowQueryLog:
+    """Per-statement timings, slow statement logging and background EXPLAIN capture"""
+
+    def __init__(self, connect, threshold=0.2, explain=True, explain_interval=600.0,
+                 explain_timeout='10s', resolve=None, max_statements=500):
+        """
+        connect: callable returning a new psycopg2 connection for EXPLAIN (not from the pool)
+        threshold: seconds above which a statement is logged (0 disables logging and EXPLAIN)
+        explain_interval: minimum seconds between plans captured for the same statement
+        explain_timeout: statement_timeout for each EXPLAIN
+        resolve: callable(query) returning the original SQL of a prepared EXECUTE, or None
+        max_statements: distinct statements tracked; later ones are only logged
+        """
+        self.connect = connect
+        self.threshold = threshold
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.explain_timeout = explain_timeout
+        self.resolve = resolve
+        self.max_statements = max_statements
+
+        self._stats = {}         # normalized sql -> QueryStats
+        self._normalized = {}    # raw sql -> normalized sql
+        self._lock = threading.Lock()
+        self._pending = queue.Queue(maxsize=16)   # (stats, query as run, params) awaiting EXPLAIN
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def _normalize(self, query):
+        normalized = self._normalized.get(query)
+        if normalized is None:
+            if len(self._normalized) >= 4 * self.max_statements:
+                self._normalized.clear()
+            normalized = self._normalized[query] = ' '.join(query.split())
+        return normalized
+
+    def record(self, query, params, seconds):
+        """Account one executed statement; log it (and queue an EXPLAIN) if it was slow"""
+        if isinstance(query, bytes):
+            query = query.decode('utf-8', 'replace')
+        if not isinstance(query, str) or query.lstrip()[:7].upper() == 'EXPLAIN':
+            return
+        if self.resolve is not None:
+            query = self.resolve(query) or query
+        sql = self._normalize(query)
+        slow = self.threshold and seconds >= self.threshold
+
+        with self._lock:
+            stats = self._stats.get(sql)
+            if stats is None and len(self._stats) < self.max_statements:
+                stats = self._stats[sql] = QueryStats(sql)
+            if stats is not None:
+                stats.calls += 1
+                stats.total += seconds
+                stats.max = max(stats.max, seconds)
+                if slow:
+                    stats.slow_calls += 1
+                    stats.shape = parameter_shape(params)
+            if not slow:
+                return
+            # Claim the plan slot now so concurrent slow runs don't queue duplicates
+            now = time.time()
+            due = stats is not None and (stats.explained_at is None or now - stats.explained_at >= self.explain_interval)
+            if due:
+                stats.explained_at = now
+
+        print(f'🐢 Slow query ({seconds * 1000:.1f} ms; parameters: {parameter_shape(params) or "none"}): {sql[:1000]}')
+        if due and self.explain and sql.split(None, 1)[0].lower() in _EXPLAINABLE:
+            self._ensure_started()
+            try:
+                # The statement exactly as it ran: normalizing whitespace would also
+                # rewrite string literals, and the plan could be for another query
+                self._pending.put_nowait((stats, query, params))
+            except queue.Full:
+                pass
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._stopping.is_set():
+                return
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='slow-query-explain', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        conn = None
+        while not self._stopping.is_set():
+            try:
+                item = self._pending.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            stats, query, params = item
+            try:
+                if conn is None or conn.closed:
+                    conn = self.connect()
+                stats.plan = self._explain(conn, query, params)
+                for line in stats.plan.splitlines():
+                    print(f'   {line}')
+            except Exception as e:
+                # e.g. a temporary table of the original session; a broken connection is reopened next time
+                print(f'⚠️  EXPLAIN failed: {str(e)}')
+        if conn is not None:
+            conn.close()
+
+    def _explain(self, conn, query, params):
+        """Generic plan text for query (no parameter values); the transaction is always rolled back"""
+        options = 'ANALYZE, BUFFERS' if not _SIDE_EFFECTS.search(query) else 'COSTS'
+        sql, values = generic_statement(query, params)
+        arguments = f' ({", ".join(["%s"] * len(values))})' if values else ''
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT set_config('statement_timeout', %s, true)", (self.explain_timeout,))
+            cursor.execute("SELECT set_config('plan_cache_mode', 'force_generic_plan', true)")
+            cursor.execute(f'PREPARE slow_query_explain AS {sql}')
+            cursor.execute(f'EXPLAIN ({options}) EXECUTE slow_query_explain{arguments}', values)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+        finally:
+            conn.rollback()
+            # PREPARE outlives the transaction
+            conn.cursor().execute('DEALLOCATE ALL')
+            conn.rollback()
+
+    def stop(self):
+        self._stopping.set()
+        try:
+            self._pending.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def top(self, limit=20, sort='total'):
+        """The limit statements with the highest total, mean or max time"""
+        keys = {
+            'total': lambda stats: stats.total,
+            'mean': lambda stats: stats.total / stats.calls if stats.calls else 0.0,
+            'max': lambda stats: stats.max
+        }
+        with self._lock:
+            ranked = sorted(self._stats.values(), key=keys[sort], reverse=True)[:limit]
+            return [stats.to_dict() for stats in ranked]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
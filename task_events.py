@@ -0,0 +1,206 @@
+"""
+AutoOps Task Board - Task Change Events
+
+A single listener thread per process holds one dedicated PostgreSQL connection
+running LISTEN on the channel fed by the "Tasks" notify trigger, and fans each
+notification out to the Server-Sent Events clients of the task's owner. Clients
+never hold a pool connection while they wait.
+
+Every event carries the global sequence number assigned by the trigger, so a
+reconnecting client can resume with Last-Event-ID from any worker process as
+long as the event is still in that process's replay buffer.
+"""
+import json
+import queue
+import select
+import threading
+from collections import deque
+
+from psycopg2 import extensions
+
+
+class TooManySubscribers(Exception):
+    """Raised when the per-process client limit is reached"""
+
+
+class Subscription:
+    """One connected SSE client"""
+
+    def __init__(self, user_id, max_queue):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=max_queue)
+        # Set when the client fell behind and events were dropped
+        self.overflowed = False
+
+
+class TaskEventBroker:
+    """LISTEN/NOTIFY listener fanning task changes out to subscribers"""
+
+    def __init__(self, connect, channel='task_changes', max_clients=500,
+                 client_queue_size=100, replay_size=1000, reconnect_delay=5.0):
+        """
+        connect: callable returning a new psycopg2 connection (not from the pool)
+        max_clients: SSE clients allowed per process
+        client_queue_size: events buffered per client before it is told to reload
+        replay_size: recent events kept for Last-Event-ID resume
+        """
+        self.connect = connect
+        self.channel = channel
+        self.max_clients = max_clients
+        self.client_queue_size = client_queue_size
+        self.reconnect_delay = reconnect_delay
+
+        self._lock = threading.Lock()
+        self._subscribers = {}   # user_id -> set of Subscription
+        self._count = 0
+        self._replay = deque(maxlen=replay_size)   # (seq, user_id, event)
+        self._thread = None
+        self._stopping = threading.Event()
+        self.connected = False
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._stopping.is_set():
+                return
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='task-events', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop listening and end every open stream (clients reconnect elsewhere)"""
+        self._stopping.set()
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        for subscription in subscribers:
+            self._offer(subscription, None)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            conn = None
+            try:
+                conn = self.connect()
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                cursor.execute(f'LISTEN {self.channel}')
+                self.connected = True
+                print(f'[OK] Listening for task changes on "{self.channel}"')
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except Exception as e:
+                print(f'⚠️  Task event listener error: {str(e)}')
+            finally:
+                was_connected = self.connected
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            if was_connected:
+                # Events missed while disconnected can't be replayed; make clients reload
+                self._broadcast_reset()
+            self._stopping.wait(self.reconnect_delay)
+
+    def _dispatch(self, payload):
+        try:
+            event = json.loads(payload)
+            seq = int(event['seq'])
+            user_id = event['userId']
+        except (ValueError, KeyError, TypeError):
+            print(f'⚠️  Ignoring malformed task event: {payload!r}')
+            return
+        with self._lock:
+            self._replay.append((seq, user_id, event))
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            self._offer(subscription, (seq, event))
+
+    def _offer(self, subscription, item):
+        try:
+            subscription.queue.put_nowait(item)
+        except queue.Full:
+            subscription.overflowed = True
+
+    def _broadcast_reset(self):
+        with self._lock:
+            self._replay.clear()
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        for subscription in subscribers:
+            subscription.overflowed = True
+            self._offer(subscription, None)
+
+    def subscribe(self, user_id, last_event_id=None):
+        """Register a client; returns (subscription, events to replay or None if a reload is needed)"""
+        self._ensure_started()
+        subscription = Subscription(user_id, self.client_queue_size)
+        with self._lock:
+            if self._stopping.is_set():
+                raise TooManySubscribers('server is shutting down')
+            if self._count >= self.max_clients:
+                raise TooManySubscribers(f'{self._count} task stream clients connected')
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+
+            replay = []
+            if last_event_id is not None:
+                # Replay in arrival (commit) order everything after the client's last event
+                seqs = [seq for seq, _, _ in self._replay]
+                if last_event_id in seqs:
+                    position = seqs.index(last_event_id) + 1
+                    replay = [(seq, event) for seq, uid, event in list(self._replay)[position:]
+                              if uid == user_id]
+                else:
+                    replay = None
+        return subscription, replay
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            group = self._subscribers.get(subscription.user_id)
+            if group and subscription in group:
+                group.discard(subscription)
+                self._count -= 1
+                if not group:
+                    del self._subscribers[subscription.user_id]
+
+    def stream(self, subscription, replay, heartbeat=15.0, retry_ms=3000):
+        """Generator of SSE-formatted chunks for one client"""
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            if replay is None:
+                yield 'event: reset\ndata: {}\n\n'
+            else:
+                for seq, event in replay:
+                    yield f'id: {seq}\nevent: task\ndata: {json.dumps(event)}\n\n'
+            while True:
+                try:
+                    item = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+                    continue
+                if self._stopping.is_set():
+                    return
+                if subscription.overflowed:
+                    # Dropped events: drain and tell the client to reload instead
+                    subscription.overflowed = False
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    yield 'event: reset\ndata: {}\n\n'
+                    continue
+                if item is None:
+                    continue
+                seq, event = item
+                yield f'id: {seq}\nevent: task\ndata: {json.dumps(event)}\n\n'
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'connected': self.connected,
+                'clients': self._count,
+                'replayBuffer': len(self._replay)
+            }
@@ -0,0 +1,106 @@
+"""
+AutoOps Task Board - Bulk Task Import
+
+Reads an uploaded CSV or NDJSON file one record at a time and feeds the valid
+rows to PostgreSQL's COPY through a file-like object, so an import of any size
+is parsed, validated and sent without holding the file or the rows in memory.
+"""
+import csv
+import json
+
+# Fields read from an import, in staging table column order; anything else
+# (e.g. id, createdAt from an export) is ignored
+IMPORT_FIELDS = ('taskId', 'type', 'title', 'description', 'assignee', 'priority', 'status')
+
+
+class ImportFormatError(ValueError):
+    """The upload can't be read at all (bad header, not UTF-8)"""
+
+
+def read_task_records(stream, import_format):
+    """Yield (line number, record) from a binary upload stream
+
+    record is a dict of the IMPORT_FIELDS present, or an error message string
+    for a line that couldn't be parsed.
+    """
+    lines = _decode_lines(stream)
+    try:
+        if import_format == 'csv':
+            yield from _read_csv(lines)
+        else:
+            yield from _read_ndjson(lines)
+    except UnicodeDecodeError:
+        raise ImportFormatError('file must be UTF-8 encoded')
+
+
+def _decode_lines(stream):
+    # Split on b'\n' only: CSV rejoins quoted line breaks itself, and JSON strings may contain U+2028
+    encoding = 'utf-8-sig'
+    for line in stream:
+        yield line.decode(encoding)
+        encoding = 'utf-8'
+
+
+def _read_csv(lines):
+    reader = csv.reader(lines)
+    try:
+        header = next(reader, None)
+        if header is None:
+            return
+        if 'title' not in header:
+            raise ImportFormatError('CSV header must include a title column')
+        columns = [(field, header.index(field)) for field in IMPORT_FIELDS if field in header]
+        for values in reader:
+            if not values:
+                continue
+            # An empty or missing cell means the field wasn't given
+            yield reader.line_num, {field: values[i] for field, i in columns if i < len(values) and values[i]}
+    except csv.Error as e:
+        raise ImportFormatError(f'line {reader.line_num}: {str(e)}')
+
+
+def _read_ndjson(lines):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, 'invalid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, 'line must be a JSON object'
+            continue
+        yield line_number, {field: record[field] for field in IMPORT_FIELDS if field in record}
+
+
+def copy_row(line_number, record):
+    """One COPY text format line: line number, then IMPORT_FIELDS (missing = NULL)"""
+    values = [str(line_number)]
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if value is None:
+            values.append('\\N')
+        else:
+            # Chained replace() is several times faster than str.translate() with a mapping
+            values.append(value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r'))
+    return '\t'.join(values) + '\n'
+
+
+class CopyStream:
+    """Read-only file object over an iterator of COPY lines, for cursor.copy_expert()"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
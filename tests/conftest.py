@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+
+import pytest
+
+# The app modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests never need a real secret or an eager database connection
+os.environ.setdefault('JWT_SECRET', 'test-secret')
+os.environ.setdefault('DB_INIT_MODE', 'off')
+
+
+class FakeCursor:
+    """Records each statement and answers it from the connection's scripted responses"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+        self.rowcount = -1
+
+    def execute(self, query, params=None):
+        if isinstance(query, bytes):
+            query = query.decode('utf-8')
+        sql = ' '.join(query.split())
+        self.connection.statements.append((sql, params))
+        rows = self.connection.response(sql)
+        if isinstance(rows, Exception):
+            raise rows
+        self.rows = list(rows)
+        self.rowcount = len(self.rows)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def copy_expert(self, sql, file, size=8192):
+        """Read file the way psycopg2 does, in size-byte chunks; the data ends up in connection.copied"""
+        self.connection.statements.append((' '.join(sql.split()), None))
+        chunks = []
+        while True:
+            chunk = file.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self.connection.copied.append(''.join(chunks))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Stands in for a psycopg2 connection; respond() scripts the rows a statement returns"""
+
+    closed = 0
+
+    def __init__(self):
+        self.responses = []    # (SQL fragment, rows or exception to raise)
+        self.statements = []   # (whitespace-normalized SQL, params) in execution order
+        self.copied = []       # data read by each copy_expert()
+        self.commits = 0
+        self.rollbacks = 0
+
+    def respond(self, fragment, rows):
+        """Answer statements containing fragment with rows (the first matching fragment wins)"""
+        self.responses.append((fragment, rows))
+
+    def response(self, sql):
+        for fragment, rows in self.responses:
+            if fragment in sql:
+                return rows
+        return []
+
+    def executed(self, fragment):
+        """(sql, params) of the statements containing fragment"""
+        return [statement for statement in self.statements if fragment in statement[0]]
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def fake_connection():
+    return FakeConnection()
+
+
+@pytest.fixture
+def fake_db(monkeypatch, fake_connection):
+    """Every route gets fake_connection from the pool; prepared statements run as plain SQL"""
+    import app as app_module
+    monkeypatch.setattr(app_module, 'get_db_connection', lambda: fake_connection)
+    monkeypatch.setattr(app_module, 'return_db_connection', lambda conn: None)
+    if app_module.prepared is not None:
+        monkeypatch.setattr(app_module.prepared, 'enabled', False)
+    return fake_connection
+
+
+@pytest.fixture
+def client():
+    import app as app_module
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def auth_headers():
+    """Authorization header of a login token for user 1"""
+    import app as app_module
+    import jwt
+    token = jwt.encode({'userId': 1, 'username': 'tester', 'exp': int(time.time()) + 3600},
+                       app_module.JWT_SECRET, algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
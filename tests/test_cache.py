@@ -0,0 +1,118 @@
+import time
+
+from cache import LocalCacheBackend, TaskListCache, TokenCache
+
+
+def page(*objects):
+    """A cached task list page: (task JSON strings, next cursor, ETag)"""
+    return (tuple(objects), None, 'etag')
+
+
+def cached(cache, user_id, key='all'):
+    return cache.get(user_id, key, cache.begin(user_id))
+
+
+def test_put_then_get():
+    cache = TaskListCache()
+    cache.put(1, 'all', page('{"id":"1"}'), cache.begin(1))
+    assert cached(cache, 1) == page('{"id":"1"}')
+    assert cached(cache, 2) is None
+
+
+def test_invalidate_drops_every_page_of_the_user():
+    cache = TaskListCache()
+    for key in ('all', 'status=todo'):
+        cache.put(1, key, page('{"id":"1"}'), cache.begin(1))
+    cache.put(2, 'all', page('{"id":"2"}'), cache.begin(2))
+    cache.invalidate(1)
+    assert cached(cache, 1, 'all') is None
+    assert cached(cache, 1, 'status=todo') is None
+    assert cached(cache, 2) == page('{"id":"2"}')
+
+
+def test_page_built_during_a_write_is_not_cached():
+    cache = TaskListCache()
+    token = cache.begin(1)        # request starts reading the old rows
+    cache.invalidate(1)           # a write commits meanwhile
+    cache.put(1, 'all', page('{"title":"stale"}'), token)
+    assert cached(cache, 1) is None
+
+    cache.put(1, 'all', page('{"title":"fresh"}'), cache.begin(1))
+    assert cached(cache, 1) == page('{"title":"fresh"}')
+
+
+def test_write_by_another_user_does_not_block_caching():
+    cache = TaskListCache()
+    token = cache.begin(1)
+    cache.invalidate(2)
+    cache.put(1, 'all', page('{"id":"1"}'), token)
+    assert cached(cache, 1) == page('{"id":"1"}')
+
+
+def test_invalidation_history_is_bounded():
+    cache = TaskListCache(max_writes=10)
+    early = cache.begin(1)
+    for user_id in range(1000):
+        cache.invalidate(user_id)
+    assert len(cache._last_write) == 10
+
+    # User 1's write was forgotten, so a page begun before it must still be refused
+    cache.put(1, 'all', page('{"title":"stale"}'), early)
+    assert cached(cache, 1) is None
+    cache.put(1, 'all', page('{"title":"fresh"}'), cache.begin(1))
+    assert cached(cache, 1) == page('{"title":"fresh"}')
+
+
+def test_page_from_another_collection_version_is_a_miss():
+    cache = TaskListCache()
+    cache.put(1, 'all', page('{"title":"old"}'), cache.begin(1), version=3)
+    assert cache.get(1, 'all', cache.begin(1), 3) == page('{"title":"old"}')
+
+    # The tasks changed (version 4) but this process never saw the invalidation
+    assert cache.get(1, 'all', cache.begin(1), 4) is None
+    assert cache.get(1, 'all', cache.begin(1), 3) is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_least_recently_used_user_is_evicted():
+    cache = TaskListCache(max_users=2)
+    for user_id in (1, 2):
+        cache.put(user_id, 'all', page(f'{{"id":"{user_id}"}}'), cache.begin(user_id))
+    cached(cache, 1)
+    cache.put(3, 'all', page('{"id":"3"}'), cache.begin(3))
+    assert cached(cache, 2) is None
+    assert cached(cache, 1) is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_budget_is_enforced():
+    cache = TaskListCache(max_bytes=2000)
+    for user_id in range(10):
+        cache.put(user_id, 'all', page('x' * 500), cache.begin(user_id))
+    assert cache.stats()['bytes'] <= 2000
+    assert cached(cache, 9) is not None
+
+
+def test_shared_backend_invalidates_other_workers():
+    backend = LocalCacheBackend()
+    worker_a = TaskListCache(backend=backend)
+    worker_b = TaskListCache(backend=backend)
+    worker_a.put(1, 'all', page('{"title":"old"}'), worker_a.begin(1))
+    worker_b.invalidate(1)
+    assert cached(worker_a, 1) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TaskListCache(max_users=0)
+    cache.put(1, 'all', page('{"id":"1"}'), cache.begin(1))
+    assert cached(cache, 1) is None
+
+
+def test_token_cache_expires_entries():
+    cache = TokenCache()
+    cache.put('live', {'userId': 1, 'exp': time.time() + 60})
+    cache.put('expired', {'userId': 2, 'exp': time.time() - 1})
+    cache.put('no-exp', {'userId': 3})
+    assert cache.get('live')['userId'] == 1
+    assert cache.get('expired') is None
+    assert cache.get('no-exp') is None
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+extensions = pytest.importorskip('psycopg2.extensions')
+
+from db_pool import ConnectionPool
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def execute(self, query):
+        time.sleep(0.002)   # a slow ping widens the window between idle and in use
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeServer:
+    """Counts connections open at once"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = 0
+        self.max_open = 0
+
+    def connect(self):
+        server = self
+
+        class FakeConnection:
+            closed = 0
+            info = FakeInfo()
+
+            def cursor(self):
+                return FakeCursor()
+
+            def rollback(self):
+                pass
+
+            def close(self):
+                if not self.closed:
+                    self.closed = 1
+                    with server.lock:
+                        server.open -= 1
+
+        with self.lock:
+            self.open += 1
+            self.max_open = max(self.max_open, self.open)
+        return FakeConnection()
+
+
+def test_health_checks_never_exceed_maxconn():
+    server = FakeServer()
+    pool = ConnectionPool(server.connect, minconn=3, maxconn=3, ping_interval=0, acquire_timeout=30)
+    pool.warmup()
+
+    def work(seed):
+        for i in range(30):
+            conn = pool.getconn()
+            pool.putconn(conn, close=(i + seed) % 5 == 0)
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.max_open <= 3
+    stats = pool.stats()
+    assert stats['inUse'] == stats['opening'] == stats['checking'] == 0
+
+
+def test_connection_returned_after_the_pool_was_replaced(monkeypatch):
+    app_module = pytest.importorskip('app')
+    server = FakeServer()
+    monkeypatch.setattr(app_module, 'connect_database', server.connect)
+    monkeypatch.setattr(app_module, 'db_pool', None)
+
+    old = app_module.get_db_connection()
+    app_module.close_db_pool()
+    current = app_module.get_db_connection()
+    new_pool = app_module.db_pool
+
+    # Goes back to the closed pool, which closes it; the new pool never sees it
+    app_module.return_db_connection(old)
+    assert old.closed
+    assert new_pool.stats()['inUse'] == 1
+
+    app_module.return_db_connection(current)
+    assert not current.closed
+    assert new_pool.stats()['inUse'] == 0
+    app_module.close_db_pool()
+    assert server.open == 0
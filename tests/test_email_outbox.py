@@ -0,0 +1,64 @@
+from email_outbox import EmailOutbox, enqueue_email
+
+CLAIM = "SET \"Status\" = 'sending'"
+
+
+def outbox(conn, senders, **kwargs):
+    return EmailOutbox(lambda: conn, lambda _: None, senders, **kwargs)
+
+
+def test_enqueue_uses_the_callers_transaction(fake_connection):
+    enqueue_email(fake_connection.cursor(), 'welcome', 'a@example.com', 'Ann')
+    (sql, params), = fake_connection.statements
+    assert sql.startswith('INSERT INTO "EmailOutbox"')
+    assert params == ('welcome', 'a@example.com', 'Ann')
+    assert fake_connection.commits == 0
+
+
+def test_batch_is_sent_over_one_call_and_marked_sent(fake_connection):
+    fake_connection.respond(CLAIM, [(1, 'welcome', 'a@example.com', 'Ann', 1),
+                                    (2, 'welcome', 'b@example.com', 'Bob', 1)])
+    calls = []
+
+    def send(recipients):
+        calls.append(recipients)
+        return [True, True]
+
+    assert outbox(fake_connection, {'welcome': send}).process_batch() == 2
+    assert calls == [[('a@example.com', 'Ann'), ('b@example.com', 'Bob')]]
+    sent = fake_connection.executed("SET \"Status\" = 'sent'")
+    assert [params for _, params in sent] == [(1,), (2,)]
+    # Claim and results are committed separately; nothing is held open while sending
+    assert fake_connection.commits == 2
+
+
+def test_failed_delivery_is_rescheduled_with_backoff(fake_connection):
+    fake_connection.respond(CLAIM, [(1, 'welcome', 'a@example.com', 'Ann', 2)])
+    outbox(fake_connection, {'welcome': lambda recipients: [False]}, backoff_base=30.0).process_batch()
+    (sql, (error, delay, outbox_id)), = fake_connection.executed("SET \"Status\" = 'pending'")
+    assert outbox_id == 1
+    assert error == 'All email transports failed'
+    assert 60 * 0.8 <= delay <= 60 * 1.2
+
+
+def test_last_attempt_and_unknown_kinds_are_marked_failed(fake_connection):
+    fake_connection.respond(CLAIM, [(1, 'welcome', 'a@example.com', 'Ann', 8),
+                                    (2, 'digest', 'b@example.com', 'Bob', 1)])
+
+    def broken(recipients):
+        raise ConnectionError('provider down')
+
+    outbox(fake_connection, {'welcome': broken}, max_attempts=8).process_batch()
+    failed = {params[1]: params[0] for _, params in fake_connection.executed("SET \"Status\" = 'failed'")}
+    assert failed[1] == 'provider down'
+    assert 'digest' in failed[2]
+
+
+def test_backoff_is_capped():
+    box = outbox(None, {}, backoff_base=30.0, backoff_max=3600.0)
+    assert box.backoff(20) <= 3600.0 * 1.2
+
+
+def test_nothing_due_records_nothing(fake_connection):
+    assert outbox(fake_connection, {}).process_batch() == 0
+    assert len(fake_connection.statements) == 1
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+
+import app as app_module
+from app import validate_task_fields
+
+ROW = (7, 'AUTO-007', 'task', 'New title', 'desc', 'ann', 'high', 'todo',
+       datetime(2024, 3, 5, 7, 8, 9), datetime(2024, 3, 6, 7, 8, 9))
+
+
+@pytest.mark.parametrize('task, require_title, error', [
+    ({'title': 'ok'}, True, None),
+    ({'status': 'done'}, False, None),
+    ({'status': 'done'}, True, 'title is required'),
+    ({'title': ''}, False, 'title is required'),
+    ({'title': 5}, True, 'title must be a string'),
+    ({'title': 'ok', 'assignee': 'x' * 101}, True, 'assignee must be at most 100 characters'),
+    ({'title': 'ok', 'description': 'x' * 100000}, True, None),
+    ({'title': 'ok', 'assignee': None}, True, None),
+    (['title'], True, 'task must be an object'),
+])
+def test_validate_task_fields(task, require_title, error):
+    assert validate_task_fields(task, require_title=require_title) == error
+
+
+@pytest.mark.parametrize('body', [
+    {'title': 5},
+    {'assignee': 'x' * 101},
+    {'priority': ['high']},
+    {'title': ''},
+    {'unknown': 'field'},
+    [],
+])
+def test_invalid_patch_is_rejected_before_the_database(client, auth_headers, fake_db, body):
+    response = client.patch('/api/tasks/7', json=body, headers=auth_headers)
+    assert response.status_code == 400
+    assert fake_db.statements == []
+
+
+def test_patch_updates_only_the_supplied_fields(client, auth_headers, fake_db):
+    fake_db.respond('UPDATE "Tasks"', [ROW])
+    response = client.patch('/api/tasks/7', json={'title': 'New title', 'priority': 'high'}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'New title'
+
+    (sql, params), = fake_db.statements
+    assert sql.count(' = %s') == 4   # two fields, then "Id" and "UserId" in the same statement
+    assert '"Status"' not in sql.split('WHERE')[0]
+    assert params == ('New title', 'high', 7, 1)
+    assert fake_db.commits == 1
+
+
+def test_patch_of_another_users_task_is_not_found(client, auth_headers, fake_db):
+    response = client.patch('/api/tasks/7', json={'status': 'done'}, headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_patch_invalidates_the_task_list_cache(client, auth_headers, fake_db, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(app_module.task_list_cache, 'invalidate', invalidated.append)
+    fake_db.respond('UPDATE "Tasks"', [ROW])
+    client.patch('/api/tasks/7', json={'status': 'done'}, headers=auth_headers)
+    assert invalidated == [1]
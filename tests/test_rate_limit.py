@@ -0,0 +1,114 @@
+import pytest
+
+import app as app_module
+import rate_limit
+from rate_limit import TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the limiter"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_burst_then_wait_for_refill(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=3)
+    assert [limiter.take('ip') for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take('ip') == pytest.approx(1.0)
+
+    clock[0] += 0.5
+    assert limiter.take('ip') == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert limiter.take('ip') == 0.0
+    assert limiter.stats()['allowed'] == 4 and limiter.stats()['limited'] == 2
+
+
+def test_keys_have_separate_buckets(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1)
+    assert limiter.take('a') == 0.0
+    assert limiter.take('b') == 0.0
+    assert limiter.take('a') > 0
+
+
+def test_refill_is_capped_at_the_burst(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=2)
+    limiter.take('ip')
+    clock[0] += 3600
+    assert [limiter.take('ip') > 0 for _ in range(3)] == [False, False, True]
+
+
+def test_least_recently_used_buckets_are_dropped(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, max_keys=2)
+    for key in ('a', 'b', 'c'):
+        limiter.take(key)
+    assert limiter.stats()['keys'] == 2
+    assert limiter.take('a') == 0.0   # forgotten, so refilled
+
+
+def test_zero_rate_disables_the_limiter():
+    limiter = TokenBucketLimiter(rate=0, burst=1)
+    assert all(limiter.take('ip') == 0.0 for _ in range(100))
+
+
+class FakeBackend:
+    def __init__(self, wait=None, error=None):
+        self.wait = wait
+        self.error = error
+        self.calls = []
+
+    def take(self, key, rate, burst):
+        self.calls.append((key, rate, burst))
+        if self.error:
+            raise self.error
+        return self.wait
+
+
+def test_shared_backend_decides():
+    backend = FakeBackend(wait=2.5)
+    limiter = TokenBucketLimiter(rate=1.0, burst=3, backend=backend)
+    assert limiter.take('ip') == 2.5
+    assert backend.calls == [('ip', 1.0, 3)]
+    assert limiter.stats()['shared']
+
+
+def test_unreachable_backend_falls_back_to_local_buckets(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, backend=FakeBackend(error=ConnectionError('down')))
+    assert limiter.take('ip') == 0.0
+    assert limiter.take('ip') > 0
+
+
+@pytest.fixture
+def auth_limiters(monkeypatch, clock):
+    ip = TokenBucketLimiter(rate=1 / 60, burst=1)
+    username = TokenBucketLimiter(rate=1 / 60, burst=1)
+    monkeypatch.setattr(app_module, 'auth_ip_limiter', ip)
+    monkeypatch.setattr(app_module, 'auth_username_limiter', username)
+    return ip, username
+
+
+def test_login_is_refused_when_the_ip_bucket_is_empty(client, fake_db, auth_limiters):
+    ip, _ = auth_limiters
+    ip.take('auth:ip:127.0.0.1')
+    response = client.post('/api/auth/login', json={'username': 'ann', 'password': 'x'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == 60
+    assert fake_db.statements == []
+
+
+def test_login_is_refused_when_the_username_bucket_is_empty(client, fake_db, auth_limiters):
+    _, username = auth_limiters
+    username.take('auth:user:ann')
+    response = client.post('/api/auth/login', json={'username': 'Ann', 'password': 'x'},
+                           environ_base={'REMOTE_ADDR': '10.0.0.9'})
+    assert response.status_code == 429
+    assert fake_db.statements == []
+
+
+def test_forwarded_for_without_proxy_hops_is_logged_once(client, monkeypatch, capsys):
+    monkeypatch.setattr(app_module, 'PROXY_HOPS', 0)
+    monkeypatch.setattr(app_module, '_forwarded_for_warned', False)
+    for _ in range(2):
+        client.get('/api/unknown', headers={'X-Forwarded-For': '203.0.113.7'})
+    assert capsys.readouterr().out.count('PROXY_HOPS=0') == 1
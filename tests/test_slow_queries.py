@@ -0,0 +1,105 @@
+import pytest
+
+import app as app_module
+from slow_queries import _SIDE_EFFECTS, SlowQueryLog, generic_statement, parameter_shape
+
+
+@pytest.mark.parametrize('query', [
+    'INSERT INTO "Tasks" VALUES (1)',
+    'WITH moved AS (UPDATE "Tasks" SET "Status" = %s RETURNING 1) SELECT * FROM moved',
+    'delete from "Tasks"',
+    "SELECT nextval('\"TaskEventSeq\"')",
+    "SELECT pg_notify('task_changes', %s)",
+    'SELECT pg_advisory_xact_lock(1)',
+    'SELECT pg_try_advisory_lock(hashtext(%s))',
+    'SELECT pg_advisory_unlock_all()',
+    "SELECT set_config('autoops.bulk_task_write', 'on', true)",
+    'SELECT * FROM "Tasks" WHERE "Id" = %s FOR UPDATE',
+    'SELECT * FROM "Tasks" FOR NO KEY UPDATE SKIP LOCKED',
+    'SELECT * FROM "Tasks" FOR KEY SHARE',
+])
+def test_side_effects_get_a_plain_explain(query):
+    assert _SIDE_EFFECTS.search(query)
+
+
+@pytest.mark.parametrize('query', [
+    'SELECT "Id", "UpdatedAt" FROM "Tasks" WHERE "UserId" = %s ORDER BY "UpdatedAt"',
+    'SELECT "Inserted", "Updates" FROM "Deletions"',
+    'SELECT * FROM "Tasks" FOR SHAREHOLDERS',
+])
+def test_plain_reads_are_analyzed(query):
+    assert not _SIDE_EFFECTS.search(query)
+
+
+def test_parameter_shape_never_includes_values():
+    shape = parameter_shape((42, 'secret password', ['a', 'b'], None, b'xyz'))
+    assert shape == 'int, str[15], list[2], NoneType, bytes[3]'
+    assert parameter_shape({'name': 'secret'}) == 'name=str[6]'
+    assert parameter_shape(None) == ''
+
+
+@pytest.mark.parametrize('query, params, expected', [
+    ('SELECT %s, %s', (1, 'a'), ('SELECT $1, $2', [1, 'a'])),
+    ('SELECT %(a)s, %(b)s, %(a)s', {'a': 1, 'b': 2}, ('SELECT $1, $2, $1', [1, 2])),
+    ("SELECT * FROM t WHERE x LIKE '%%' || %s", ('y',), ("SELECT * FROM t WHERE x LIKE '%' || $1", ['y'])),
+    ('SELECT 100%', None, ('SELECT 100%', [])),
+])
+def test_generic_statement(query, params, expected):
+    assert generic_statement(query, params) == expected
+
+
+def test_statements_are_grouped_by_normalized_sql():
+    log = SlowQueryLog(connect=None, threshold=0)
+    log.record('SELECT 1\n  FROM "Tasks"', None, 0.010)
+    log.record('SELECT 1 FROM "Tasks"', None, 0.030)
+    log.record(b'SELECT 2', None, 0.005)
+    log.record('EXPLAIN SELECT 1', None, 1.0)
+    top = log.top(sort='max')
+    assert [stats['query'] for stats in top] == ['SELECT 1 FROM "Tasks"', 'SELECT 2']
+    assert top[0]['calls'] == 2 and top[0]['maxMs'] == 30.0 and top[0]['meanMs'] == 20.0
+
+
+def test_prepared_executes_are_reported_as_their_source():
+    sources = {'EXECUTE autoops_0123 (%s)': 'SELECT "Id" FROM "Tasks" WHERE "Id" = %s'}
+    log = SlowQueryLog(connect=None, threshold=0, resolve=sources.get)
+    log.record('EXECUTE autoops_0123 (%s)', (1,), 0.001)
+    assert log.top()[0]['query'] == 'SELECT "Id" FROM "Tasks" WHERE "Id" = %s'
+
+
+def test_slow_statement_is_logged_without_values(capsys):
+    log = SlowQueryLog(connect=None, threshold=0.1, explain=False)
+    log.record('SELECT * FROM "Users" WHERE "Username" = %s', ('alice',), 0.25)
+    out = capsys.readouterr().out
+    assert 'str[5]' in out and 'alice' not in out
+    stats, = log.top()
+    assert stats['slowCalls'] == 1 and stats['parameters'] == 'str[5]'
+
+
+def test_explain_prepares_a_generic_plan(fake_connection):
+    fake_connection.respond('EXPLAIN', [('Index Scan using "IX_Tasks" on "Tasks"',), ('  Index Cond: ("UserId" = $1)',)])
+    log = SlowQueryLog(connect=None, explain_timeout='3s')
+    plan = log._explain(fake_connection, 'SELECT * FROM "Tasks" WHERE "UserId" = %s AND "Title" = %s', (7, 'secret'))
+    assert plan == 'Index Scan using "IX_Tasks" on "Tasks"\n  Index Cond: ("UserId" = $1)'
+
+    sql = [statement for statement, _ in fake_connection.statements]
+    assert "force_generic_plan" in sql[1]
+    assert sql[2] == 'PREPARE slow_query_explain AS SELECT * FROM "Tasks" WHERE "UserId" = $1 AND "Title" = $2'
+    assert fake_connection.statements[3] == ('EXPLAIN (ANALYZE, BUFFERS) EXECUTE slow_query_explain (%s, %s)', [7, 'secret'])
+    # Rolled back, and the statement deallocated (PREPARE outlives the transaction)
+    assert sql[4] == 'DEALLOCATE ALL'
+    assert fake_connection.rollbacks == 2
+
+
+def test_writes_are_explained_without_running_them(fake_connection):
+    log = SlowQueryLog(connect=None)
+    log._explain(fake_connection, 'UPDATE "Tasks" SET "Status" = %s WHERE "Id" = %s', ('done', 1))
+    assert fake_connection.statements[3][0].startswith('EXPLAIN (COSTS) EXECUTE')
+
+
+def test_slow_query_list_is_for_admins_only(client, auth_headers, monkeypatch):
+    assert client.get('/api/admin/slow-queries', headers=auth_headers).status_code == 403
+    monkeypatch.setattr(app_module, 'ADMIN_USERNAMES', frozenset({'tester'}))
+    response = client.get('/api/admin/slow-queries?sort=max&limit=5', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['sort'] == 'max'
+    assert client.get('/api/admin/slow-queries?sort=median', headers=auth_headers).status_code == 400
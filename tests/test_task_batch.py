@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import psycopg2
+import pytest
+
+import app as app_module
+
+STAMP = datetime(2024, 3, 5, 7, 8, 9)
+
+
+def task_row(task_id, title):
+    return (task_id, f'AUTO-{task_id:03d}', 'task', title, '', '', 'medium', 'todo', STAMP, STAMP)
+
+
+@pytest.fixture
+def tasks(monkeypatch):
+    """In-memory stand-ins for the grouped statements; a title of 'bad' fails like a constraint"""
+    stored = {7: 'Seven'}
+    groups = []
+
+    def create(cursor, user_id, items):
+        groups.append(('create', len(items)))
+        if any(task['title'] == 'bad' for _, task in items):
+            raise psycopg2.DataError('value too long for type character varying(200)')
+        return {index: task_row(100 + index, task['title']) for index, task in items}
+
+    def update(cursor, user_id, items):
+        groups.append(('update', len(items)))
+        return {index: task_row(task_id, task.get('title', stored[task_id])) if task_id in stored else None
+                for index, (task_id, task) in items}
+
+    def delete(cursor, user_id, items):
+        groups.append(('delete', len(items)))
+        return {index: task_id if task_id in stored else None for index, task_id in items}
+
+    monkeypatch.setattr(app_module, 'batch_create_tasks', create)
+    monkeypatch.setattr(app_module, 'batch_update_tasks', update)
+    monkeypatch.setattr(app_module, 'batch_delete_tasks', delete)
+    return groups
+
+
+def post(client, auth_headers, operations, mode='atomic'):
+    response = client.post('/api/tasks/batch', json={'mode': mode, 'operations': operations}, headers=auth_headers)
+    return response.status_code, response.get_json()
+
+
+def test_each_kind_runs_as_one_group_and_results_keep_request_order(client, auth_headers, fake_db, tasks):
+    status, body = post(client, auth_headers, [
+        {'op': 'delete', 'id': 7},
+        {'op': 'create', 'task': {'title': 'A'}},
+        {'op': 'create', 'task': {'title': 'B'}},
+    ])
+    assert status == 200 and body['applied']
+    assert [result['status'] for result in body['results']] == [200, 201, 201]
+    assert tasks == [('create', 2), ('delete', 1)]
+    assert fake_db.commits == 1
+
+
+def test_atomic_batch_with_an_invalid_item_never_reaches_the_database(client, auth_headers, fake_db, tasks):
+    status, body = post(client, auth_headers, [
+        {'op': 'create', 'task': {'title': 'A'}},
+        {'op': 'create', 'task': {'title': 5}},
+        {'op': 'explode'},
+    ])
+    assert status == 400 and not body['applied']
+    assert [result['status'] for result in body['results']] == [424, 400, 400]
+    assert tasks == [] and fake_db.statements == []
+
+
+def test_atomic_batch_rolls_back_when_an_item_is_missing(client, auth_headers, fake_db, tasks):
+    status, body = post(client, auth_headers, [
+        {'op': 'create', 'task': {'title': 'A'}},
+        {'op': 'update', 'id': 8, 'task': {'title': 'B'}},
+    ])
+    assert status == 400 and not body['applied']
+    assert [result['status'] for result in body['results']] == [424, 404]
+    assert fake_db.rollbacks == 1 and fake_db.commits == 0
+
+
+def test_best_effort_batch_isolates_the_failing_item(client, auth_headers, fake_db, tasks):
+    status, body = post(client, auth_headers, [
+        {'op': 'create', 'task': {'title': 'A'}},
+        {'op': 'create', 'task': {'title': 'bad'}},
+        {'op': 'create', 'task': {'title': 'C'}},
+        {'op': 'update', 'id': 8, 'task': {'title': 'D'}},
+    ], mode='best_effort')
+    assert status == 200 and body['applied']
+    assert [result['status'] for result in body['results']] == [201, 400, 201, 404]
+    assert 'value too long' in body['results'][1]['error']
+    # The group failed as a whole, then each item was retried under its own savepoint
+    assert tasks[:4] == [('create', 3), ('create', 1), ('create', 1), ('create', 1)]
+    assert len(fake_db.executed('ROLLBACK TO SAVEPOINT batch_group')) == 1
+    assert len(fake_db.executed('ROLLBACK TO SAVEPOINT batch_item')) == 1
+    assert fake_db.commits == 1
+
+
+def test_a_task_may_appear_in_only_one_update_or_delete(client, auth_headers, fake_db, tasks):
+    status, body = post(client, auth_headers, [
+        {'op': 'update', 'id': 7, 'task': {'title': 'B'}},
+        {'op': 'delete', 'id': 7},
+    ], mode='best_effort')
+    assert [result['status'] for result in body['results']] == [200, 400]
+    assert tasks == [('update', 1)]
+
+
+@pytest.mark.parametrize('body', [
+    {'operations': []},
+    {'operations': 'create'},
+    {'mode': 'eventually', 'operations': [{'op': 'delete', 'id': 1}]},
+])
+def test_malformed_batches_are_rejected(client, auth_headers, fake_db, body):
+    response = client.post('/api/tasks/batch', json=body, headers=auth_headers)
+    assert response.status_code == 400
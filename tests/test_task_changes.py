@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+import app as app_module
+from app import decode_keyset_cursor, encode_keyset_cursor
+
+HORIZON = datetime(2024, 3, 5, 12, 0, 0)
+HORIZON_QUERY = 'make_interval(secs'
+
+
+def task_row(task_id, updated_at):
+    return (task_id, f'AUTO-{task_id:03d}', 'task', 'Title', '', '', 'medium', 'todo', updated_at, updated_at)
+
+
+def changes(client, auth_headers, **params):
+    response = client.get('/api/tasks/changes', query_string=params, headers=auth_headers)
+    return response.status_code, response.get_json()
+
+
+def test_keyset_cursor_round_trips():
+    stamp = datetime(2024, 2, 29, 23, 59, 59, 123456)
+    assert decode_keyset_cursor(encode_keyset_cursor(stamp, 42)) == (stamp, 42)
+    with pytest.raises(ValueError):
+        decode_keyset_cursor('not a cursor')
+
+
+def test_initial_sync_returns_everything_and_no_tombstones(client, auth_headers, fake_db):
+    fake_db.respond(HORIZON_QUERY, [(HORIZON, None)])
+    fake_db.respond('FROM "Tasks"', [task_row(1, HORIZON), task_row(2, HORIZON)])
+    status, body = changes(client, auth_headers)
+    assert status == 200
+    assert [task['id'] for task in body['tasks']] == ['1', '2']
+    assert body['deleted'] == [] and not body['hasMore']
+    assert fake_db.executed('"TaskTombstones"') == []
+    # The next sync starts at the horizon taken before reading
+    assert decode_keyset_cursor(body['next']) == (HORIZON, 0)
+
+
+def test_incremental_sync_reports_tombstones_since_the_token(client, auth_headers, fake_db):
+    since = datetime(2024, 3, 5, 11, 0, 0)
+    fake_db.respond(HORIZON_QUERY, [(HORIZON, False)])
+    fake_db.respond('"TaskTombstones"', [(3,), (4,)])
+    status, body = changes(client, auth_headers, since=encode_keyset_cursor(since, 9))
+    assert status == 200
+    assert body['deleted'] == ['3', '4']
+    (_, tombstone_params), = fake_db.executed('"TaskTombstones"')
+    assert tombstone_params == (1, since)
+    (_, task_params), = fake_db.executed('FROM "Tasks"')
+    assert task_params[1:3] == (since, 9)
+
+
+def test_expired_token_is_gone(client, auth_headers, fake_db):
+    fake_db.respond(HORIZON_QUERY, [(HORIZON, True)])
+    status, _ = changes(client, auth_headers, since=encode_keyset_cursor(datetime(2020, 1, 1), 1))
+    assert status == 410
+    # Judged by the database clock, with the purge job's retention
+    (_, params), = fake_db.executed(HORIZON_QUERY)
+    assert params == (app_module.TASK_SYNC_SAFETY_WINDOW, datetime(2020, 1, 1), app_module.TASK_TOMBSTONE_RETENTION_DAYS)
+    assert fake_db.executed('FROM "Tasks"') == []
+
+
+def test_full_page_continues_from_the_last_task(client, auth_headers, fake_db):
+    stamps = [datetime(2024, 3, 5, 10, minute) for minute in range(3)]
+    fake_db.respond(HORIZON_QUERY, [(HORIZON, None)])
+    fake_db.respond('FROM "Tasks"', [task_row(i + 1, stamp) for i, stamp in enumerate(stamps)])
+    status, body = changes(client, auth_headers, limit=2)
+    assert status == 200 and body['hasMore']
+    assert len(body['tasks']) == 2
+    assert decode_keyset_cursor(body['next']) == (stamps[1], 2)
+
+
+def test_malformed_token_is_rejected(client, auth_headers, fake_db):
+    status, _ = changes(client, auth_headers, since='garbage!')
+    assert status == 400
+    assert fake_db.statements == []
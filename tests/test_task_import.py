@@ -0,0 +1,121 @@
+import io
+
+import pytest
+
+import app as app_module
+from task_import import IMPORT_FIELDS, CopyStream, ImportFormatError, copy_row, read_task_records
+
+
+def records(data, import_format):
+    return list(read_task_records(io.BytesIO(data), import_format))
+
+
+def copy_values(line):
+    """Parse one COPY text format line back into values (None for \\N)"""
+    escapes = {'\\\\': '\\', '\\t': '\t', '\\n': '\n', '\\r': '\r'}
+    values = []
+    for field in line[:-1].split('\t'):
+        if field == '\\N':
+            values.append(None)
+            continue
+        out, i = [], 0
+        while i < len(field):
+            pair = field[i:i + 2]
+            if pair in escapes:
+                out.append(escapes[pair])
+                i += 2
+            else:
+                out.append(field[i])
+                i += 1
+        values.append(''.join(out))
+    return values
+
+
+def test_csv_reads_named_columns_and_skips_empty_cells():
+    data = '\ufefftitle,id,description,status\r\nFirst,9,"two\nlines",\r\nSecond,10,,done\r\n'.encode('utf-8')
+    assert records(data, 'csv') == [
+        (3, {'title': 'First', 'description': 'two\nlines'}),
+        (4, {'title': 'Second', 'status': 'done'}),
+    ]
+
+
+def test_csv_without_a_title_column_is_unreadable():
+    with pytest.raises(ImportFormatError):
+        records(b'name,status\nx,todo\n', 'csv')
+
+
+def test_non_utf8_upload_is_unreadable():
+    with pytest.raises(ImportFormatError):
+        records('title\nCafé\n'.encode('latin-1'), 'csv')
+
+
+def test_ndjson_reports_bad_lines_and_keeps_going():
+    data = b'{"title": "A", "id": 5, "status": "todo"}\n\nnot json\n[1, 2]\n{"title": "B\\u2028C"}\n'
+    assert records(data, 'ndjson') == [
+        (1, {'title': 'A', 'status': 'todo'}),
+        (3, 'invalid JSON'),
+        (4, 'line must be a JSON object'),
+        (5, {'title': 'B\u2028C'}),
+    ]
+
+
+@pytest.mark.parametrize('record', [
+    {'title': 'plain'},
+    {'title': 'tab\there', 'description': 'line\nbreak\r\n', 'assignee': 'back\\slash \\N'},
+    {'title': 'Café 日本 😀', 'taskId': '', 'status': 'done'},
+])
+def test_copy_row_round_trips(record):
+    line = copy_row(12, record)
+    assert line.endswith('\n') and line.count('\n') == 1
+    assert copy_values(line) == ['12', *[record.get(field) for field in IMPORT_FIELDS]]
+
+
+def test_copy_stream_serves_any_read_size():
+    lines = [copy_row(i, {'title': f'task {i}'}) for i in range(100)]
+    for size in (1, 7, 8192, -1):
+        stream = CopyStream(lines)
+        chunks = []
+        while True:
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            assert size < 0 or len(chunk) <= size
+            chunks.append(chunk)
+        assert ''.join(chunks) == ''.join(lines)
+
+
+def import_records(conn, records, atomic):
+    return app_module.copy_import_tasks(conn.cursor(), 1, iter(records), atomic)
+
+
+def test_import_copies_valid_lines_and_reports_the_rest(fake_connection):
+    fake_connection.respond('INSERT INTO "Tasks"', [()] * 2)
+    imported, rejected, errors = import_records(fake_connection, [
+        (2, {'title': 'A'}),
+        (3, {'status': 'todo'}),
+        (4, 'invalid JSON'),
+        (5, {'title': 'B\x00'}),
+        (6, {'title': 'C', 'description': 'x\ty'}),
+    ], atomic=False)
+    assert (imported, rejected) == (2, 3)
+    assert errors == [(3, 'title is required'), (4, 'invalid JSON'), (5, 'values must not contain NUL characters')]
+    assert fake_connection.copied == [copy_row(2, {'title': 'A'}) + copy_row(6, {'title': 'C', 'description': 'x\ty'})]
+    # One version bump and one notification for the whole import
+    assert len(fake_connection.executed('"CollectionVersions"')) == 1
+    assert len(fake_connection.executed('pg_notify')) == 1
+
+
+def test_atomic_import_with_a_bad_line_merges_nothing(fake_connection):
+    imported, rejected, _ = import_records(fake_connection, [(2, {'title': 'A'}), (3, {'title': 5})], atomic=True)
+    assert (imported, rejected) == (0, 1)
+    assert fake_connection.executed('INSERT INTO "Tasks"') == []
+
+
+def test_unreadable_upload_fails_the_import(fake_connection):
+    def broken():
+        yield 2, {'title': 'A'}
+        raise ImportFormatError('file must be UTF-8 encoded')
+
+    with pytest.raises(ImportFormatError):
+        app_module.copy_import_tasks(fake_connection.cursor(), 1, broken(), atomic=False)
+    assert fake_connection.executed('INSERT INTO "Tasks"') == []
@@ -0,0 +1,133 @@
+"""
+Task JSON written by task_json() / TASK_JSON_SQL must be byte for byte what
+jsonify() sends for the same task dict.
+
+The TASK_JSON_SQL tests run the expression in PostgreSQL; set TEST_DATABASE_URL
+to a database they may connect to (no tables are created), otherwise they skip.
+"""
+import json
+import os
+from datetime import datetime
+
+import pytest
+from flask import jsonify
+
+import app as app_module
+
+CREATED = datetime(2024, 3, 5, 7, 8, 9)
+UPDATED = datetime(2024, 3, 5, 7, 8, 9, 123456)
+
+# ("Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt")
+ROWS = [
+    (1, 'AUTO-001', 'task', 'Plain title', 'Plain description', 'alice', 'high', 'todo', CREATED, UPDATED),
+    (7, None, None, 'Null columns', None, None, None, None, None, None),
+    (8, '', '', 'Empty type and task id', '', '', '', '', CREATED, CREATED),
+    (123, 'X-1', 'bug', 'Café 日本 😀   ', 'naïve — “quoted”', 'Zoë', 'low', 'done', UPDATED, CREATED),
+    (4, 'CTRL', 'task', 'quote " backslash \\ slash /', 'tab\tnewline\nreturn\r\x00\x01\x1f\x7f\x80',
+     '\b\f', 'medium', 'in-progress', datetime(1999, 12, 31, 23, 59, 59, 1), datetime(2024, 1, 1)),
+    (1000, None, 'story', '', ' leading and trailing ', 'bob', 'medium', 'todo',
+     datetime(2024, 2, 29, 0, 0, 0, 500000), None),
+]
+
+
+@pytest.fixture
+def flask_app():
+    with app_module.app.test_request_context():
+        yield app_module.app
+
+
+def expected_object(row):
+    """What jsonify() writes for one task dict, without the trailing newline"""
+    return jsonify(dict(zip(app_module.TASK_FIELDS, app_module.task_row_values(row)))).get_data(as_text=True)[:-1]
+
+
+@pytest.mark.parametrize('row', ROWS)
+def test_task_json_matches_jsonify(flask_app, row):
+    assert app_module.task_json(app_module.task_row_values(row)) == expected_object(row)
+
+
+@pytest.mark.parametrize('row', ROWS)
+def test_task_response_matches_jsonify(flask_app, row):
+    response, status = app_module.task_response(row, 201)
+    expected = jsonify(dict(zip(app_module.TASK_FIELDS, app_module.task_row_values(row))))
+    assert status == 201
+    assert response.get_data() == expected.get_data()
+    assert response.mimetype == expected.mimetype
+
+
+def test_task_page_response_matches_jsonify(flask_app):
+    objects = tuple(app_module.task_json(app_module.task_row_values(row)) for row in ROWS)
+    response, status = app_module.task_page_response(objects, 'next', 'etag')
+    expected = jsonify([dict(zip(app_module.TASK_FIELDS, app_module.task_row_values(row))) for row in ROWS])
+    assert status == 200
+    assert response.get_data() == expected.get_data()
+    assert response.headers['X-Next-Cursor'] == 'next'
+
+
+def test_empty_page_matches_jsonify(flask_app):
+    response, _ = app_module.task_page_response((), None, 'etag')
+    assert response.get_data() == jsonify([]).get_data()
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_pretty_printing_still_matches_jsonify(flask_app):
+    flask_app.json.compact = False
+    try:
+        objects = tuple(app_module.task_json(app_module.task_row_values(row)) for row in ROWS)
+        response, _ = app_module.task_page_response(objects, None, 'etag')
+        expected = jsonify([dict(zip(app_module.TASK_FIELDS, app_module.task_row_values(row))) for row in ROWS])
+        assert response.get_data() == expected.get_data()
+    finally:
+        flask_app.json.compact = None
+
+
+def postgres_to_json(text):
+    """PostgreSQL's to_json(text) escaping (escape_json in src/backend/utils/adt/json.c)"""
+    escapes = {'\b': '\\b', '\f': '\\f', '\n': '\\n', '\r': '\\r', '\t': '\\t', '"': '\\"', '\\': '\\\\'}
+    out = []
+    for char in text:
+        if char in escapes:
+            out.append(escapes[char])
+        elif char < ' ':
+            out.append(f'\\u{ord(char):04x}')
+        else:
+            out.append(char)
+    return '"' + ''.join(out) + '"'
+
+
+@pytest.mark.parametrize('text', [
+    'plain', 'Café 日本 😀', '  ', '\x00\x01\x1f\x7f\x80\x9f', 'quote " backslash \\ /',
+    '\b\f\n\r\t', '\U0010ffff퟿￿', ''
+])
+def test_ascii_json_matches_ensure_ascii(text):
+    assert app_module.ascii_json(postgres_to_json(text)) == json.dumps(text)
+
+
+@pytest.fixture(scope='module')
+def pg_cursor():
+    url = os.getenv('TEST_DATABASE_URL')
+    if not url:
+        pytest.skip('TEST_DATABASE_URL not set')
+    psycopg2 = pytest.importorskip('psycopg2')
+    try:
+        conn = psycopg2.connect(url)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f'PostgreSQL unavailable: {e}')
+    cursor = conn.cursor()
+    yield cursor
+    conn.rollback()
+    conn.close()
+
+
+@pytest.mark.parametrize('row', ROWS)
+def test_task_json_sql_matches_jsonify(flask_app, pg_cursor, row):
+    if '\x00' in ''.join(value for value in row if isinstance(value, str)):
+        # PostgreSQL text can't hold NUL; such a task can't exist
+        row = tuple(value.replace('\x00', '') if isinstance(value, str) else value for value in row)
+    pg_cursor.execute(f"""
+        SELECT {app_module.TASK_JSON_SQL}
+        FROM (VALUES (%s::integer, %s::varchar, %s::varchar, %s::varchar, %s::text, %s::varchar,
+                      %s::varchar, %s::varchar, %s::timestamp, %s::timestamp))
+            AS task("Id", "TaskId", "Type", "Title", "Description", "Assignee", "Priority", "Status", "CreatedAt", "UpdatedAt")
+    """, row)
+    assert app_module.ascii_json(pg_cursor.fetchone()[0]) == expected_object(row)
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+
+import app as app_module
+from app import decode_search_cursor, encode_search_cursor, search_highlight
+
+STAMP = datetime(2024, 3, 5, 7, 8, 9)
+
+
+def result_row(task_id, rank, title_headline, description_headline=''):
+    return (task_id, f'AUTO-{task_id:03d}', 'task', 'Title', 'Description', '', 'medium', 'todo', STAMP, STAMP,
+            rank, title_headline, description_headline)
+
+
+def search(client, auth_headers, **params):
+    return client.get('/api/tasks/search', query_string=params, headers=auth_headers)
+
+
+@pytest.mark.parametrize('fragment, expected', [
+    ('fix <mark>login</mark> bug', 'fix <mark>login</mark> bug'),
+    ('<script>alert(1)</script> <mark>x</mark>', '&lt;script&gt;alert(1)&lt;/script&gt; <mark>x</mark>'),
+    ('<mark onclick="x">a</mark>', '&lt;mark onclick=&quot;x&quot;&gt;a</mark>'),
+    (None, ''),
+])
+def test_highlights_keep_only_mark_tags(fragment, expected):
+    assert search_highlight(fragment) == expected
+
+
+def test_search_cursor_round_trips_the_real_rank():
+    assert decode_search_cursor(encode_search_cursor(0.0607927, 12)) == (0.0607927, 12)
+
+
+def test_results_carry_rank_and_highlights(client, auth_headers, fake_db):
+    fake_db.respond('websearch_to_tsquery', [result_row(1, 0.5, '<mark>Login</mark> page'),
+                                             result_row(2, 0.25, 'Other')])
+    response = search(client, auth_headers, q='login')
+    assert response.status_code == 200
+    first, second = response.get_json()
+    assert first['rank'] == 0.5
+    assert first['highlights']['title'] == '<mark>Login</mark> page'
+    assert 'X-Next-Cursor' not in response.headers
+    (sql, params), = fake_db.statements
+    assert params[0] == 'login' and params[-1] == app_module.TASK_SEARCH_PAGE_SIZE + 1   # one extra row tells whether there is a next page
+
+
+def test_full_page_returns_a_cursor_from_the_last_result(client, auth_headers, fake_db):
+    fake_db.respond('websearch_to_tsquery', [result_row(3, 0.5, ''), result_row(2, 0.4, ''), result_row(1, 0.3, '')])
+    response = search(client, auth_headers, q='login', limit=2)
+    assert len(response.get_json()) == 2
+    assert decode_search_cursor(response.headers['X-Next-Cursor']) == (0.4, 2)
+
+    search(client, auth_headers, q='login', limit=2, cursor=response.headers['X-Next-Cursor'])
+    _, params = fake_db.statements[-1]
+    assert params[-3:] == (0.4, 2, 3)
+
+
+@pytest.mark.parametrize('params', [{}, {'q': '   '}, {'q': 'x' * (app_module.TASK_SEARCH_MAX_QUERY_LENGTH + 1)}, {'q': 'x', 'cursor': 'garbage!'}])
+def test_bad_requests_never_reach_the_database(client, auth_headers, fake_db, params):
+    assert search(client, auth_headers, **params).status_code == 400
+    assert fake_db.statements == []
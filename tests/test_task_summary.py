@@ -0,0 +1,62 @@
+import app as app_module
+
+
+def summary(client, auth_headers, **headers):
+    return client.get('/api/tasks/summary', headers={**auth_headers, **headers})
+
+
+def test_summary_from_counters(client, auth_headers, fake_db, monkeypatch):
+    monkeypatch.setattr(app_module, 'TASK_SUMMARY_SOURCE', 'counters')
+    fake_db.respond('"CollectionVersions"', [(4,)])
+    fake_db.respond('FROM "TaskCounts"', [
+        ('total', '', 3),
+        ('status', 'todo', 2), ('status', 'done', 1),
+        ('priority', 'high', 3),
+        ('type', 'bug', 3),
+        ('assignee', '', 1), ('assignee', 'ann', 2),
+    ])
+    response = summary(client, auth_headers)
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'total': 3,
+        'status': {'todo': 2, 'done': 1},
+        'priority': {'high': 3},
+        'type': {'bug': 3},
+        'assignee': {'': 1, 'ann': 2}
+    }
+    assert fake_db.executed('FROM "Tasks"') == []
+
+
+def test_summary_from_grouping_sets(client, auth_headers, fake_db, monkeypatch):
+    monkeypatch.setattr(app_module, 'TASK_SUMMARY_SOURCE', 'query')
+    # status, priority, type, assignee, count, then GROUPING() of each (1 = rolled up)
+    fake_db.respond('GROUPING SETS', [
+        ('todo', None, None, None, 2, 0, 1, 1, 1),
+        ('done', None, None, None, 1, 0, 1, 1, 1),
+        (None, 'medium', None, None, 3, 1, 0, 1, 1),
+        (None, None, 'task', None, 3, 1, 1, 0, 1),
+        (None, None, None, '', 3, 1, 1, 1, 0),
+        (None, None, None, None, 3, 1, 1, 1, 1),
+    ])
+    body = summary(client, auth_headers).get_json()
+    assert body == {
+        'total': 3,
+        'status': {'todo': 2, 'done': 1},
+        'priority': {'medium': 3},
+        'type': {'task': 3},
+        'assignee': {'': 3}
+    }
+
+
+def test_user_without_tasks_gets_empty_counts(client, auth_headers, fake_db):
+    assert summary(client, auth_headers).get_json() == app_module.empty_task_summary()
+
+
+def test_unchanged_summary_is_revalidated_from_the_version(client, auth_headers, fake_db):
+    fake_db.respond('"CollectionVersions"', [(4,)])
+    etag = summary(client, auth_headers).headers['ETag'].strip('"')
+    fake_db.statements.clear()
+
+    response = summary(client, auth_headers, **{'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert len(fake_db.statements) == 1   # only the version lookup